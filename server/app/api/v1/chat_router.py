@@ -1,8 +1,13 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from typing import Any, AsyncIterator, Callable, Dict
+import json
 import logging
 
-from app.schemas.chat_schema import ChatRequest, ChatResponse, ErrorResponse
+from app.schemas.chat_schema import ChatRequest, ChatResponse, ErrorResponse, BatchChatRequest
 from app.services.chat_service import ChatService
+from app.core.admission import AdmissionRejected, get_admission_controller
 
 # 로거 설정
 logger = logging.getLogger(__name__)
@@ -13,30 +18,65 @@ router = APIRouter()
 # 채팅 서비스 인스턴스
 chat_service = ChatService()
 
+def _client_key(http_request: Request) -> str:
+    """클라이언트별 동시 요청 한도에 사용할 키 (X-Client-Id 헤더, 없으면 접속 IP)"""
+    client_id = http_request.headers.get("x-client-id")
+    if client_id:
+        return client_id
+    return http_request.client.host if http_request.client else "unknown"
+
+def _admission_error(e: AdmissionRejected) -> HTTPException:
+    logger.warning(f"요청 거절 ({e.status_code}): {e.detail}")
+    return HTTPException(
+        status_code=e.status_code,
+        detail=e.detail,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """수락 제어 슬롯을 잡은 스트리밍 응답.
+
+    본문 제너레이터의 finally 는 제너레이터가 시작되지 않으면(본문 전송 전 연결 끊김 등)
+    실행되지 않으므로, 응답 처리가 끝나는 모든 경로에서 슬롯을 반납합니다.
+    """
+
+    def __init__(self, content: AsyncIterator[str], release: Callable[[], None], **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
 @router.post(
     "/chat", 
     response_model=ChatResponse,
     responses={
         400: {"model": ErrorResponse, "description": "잘못된 요청"},
-        500: {"model": ErrorResponse, "description": "서버 오류"}
+        429: {"model": ErrorResponse, "description": "클라이언트별 동시 요청 한도 초과 (Retry-After)"},
+        500: {"model": ErrorResponse, "description": "서버 오류"},
+        503: {"model": ErrorResponse, "description": "요청 대기열 포화 (Retry-After)"},
     },
     summary="채팅 메시지 처리",
     description="사용자의 채팅 메시지를 받아 제품 추천 AI 에이전트로 처리하고 응답을 반환합니다."
 )
-async def chat(request: ChatRequest) -> ChatResponse:
+async def chat(request: ChatRequest, http_request: Request) -> ChatResponse:
     """
     채팅 메시지를 처리합니다.
     
     - **message**: 사용자 메시지 (필수)
     - **thread_id**: 대화 스레드 ID (선택, 없으면 자동 생성)
-    - **max_search_queries**: 최대 검색어 수 (선택, 기본값: 3)
+    - **max_search_queries**: 최대 검색어 수 (선택, 기본값: 4 - 이 중 먼저 끝난 3개 결과 사용)
     - **max_search_loops**: 최대 검색 루프 수 (선택, 기본값: 2)
     """
     try:
         logger.info(f"채팅 요청 처리 시작: {request.message[:50]}...")
         
-        # 채팅 서비스를 통해 요청 처리
-        response = await chat_service.process_chat_request(request)
+        # 채팅 서비스를 통해 요청 처리 (동시 실행 수 제한, 초과 시 대기열에서 대기)
+        async with get_admission_controller().admit(_client_key(http_request)):
+            response = await chat_service.process_chat_request(request)
         
         # 응답 결과 로깅
         logger.info(f"=== API 응답 결과 (thread_id: {response.thread_id}) ===")
@@ -53,6 +93,8 @@ async def chat(request: ChatRequest) -> ChatResponse:
         
         return response
         
+    except AdmissionRejected as e:
+        raise _admission_error(e)
     except ValueError as e:
         logger.error(f"입력 검증 오류: {str(e)}")
         raise HTTPException(
@@ -66,4 +108,104 @@ async def chat(request: ChatRequest) -> ChatResponse:
             detail=f"채팅 처리 중 오류가 발생했습니다: {str(e)}"
         )
 
- 
\ No newline at end of file
+def _format_sse(event: Dict[str, Any]) -> str:
+    """서비스 이벤트를 Server-Sent Events 메시지 형식으로 직렬화합니다."""
+    data = json.dumps(event["data"], ensure_ascii=False, default=str)
+    return f"event: {event['event']}\ndata: {data}\n\n"
+
+@router.post(
+    "/chat/stream",
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "진행 이벤트 스트림"},
+        429: {"model": ErrorResponse, "description": "클라이언트별 동시 요청 한도 초과 (Retry-After)"},
+        503: {"model": ErrorResponse, "description": "요청 대기열 포화 (Retry-After)"},
+    },
+    summary="채팅 메시지 스트리밍 처리",
+    description="채팅 메시지를 처리하면서 노드별 진행 상황과 리포트 토큰을 Server-Sent Events로 전송합니다."
+)
+async def chat_stream(request: ChatRequest, http_request: Request) -> StreamingResponse:
+    """
+    채팅 메시지를 처리하고 진행 상황을 SSE로 스트리밍합니다.
+
+    - **node_start / node_end**: validate_request, generate_search_queries, web_search(브랜치별),
+      reflection, report_generation 의 시작과 종료
+    - **token**: 리포트 생성 토큰
+    - **done**: 최종 응답 (`/chat` 응답과 동일한 형식)
+    - **error**: 처리 중 오류
+    """
+    logger.info(f"스트리밍 채팅 요청 처리 시작: {request.message[:50]}...")
+
+    # 스트림 시작 전에 슬롯을 얻어야 거절 시 429/503 상태 코드로 응답할 수 있음
+    admission = get_admission_controller()
+    client_key = _client_key(http_request)
+    try:
+        started_at = await admission.acquire(client_key)
+    except AdmissionRejected as e:
+        raise _admission_error(e)
+    # 스트림이 끝날 때 바로 반납하고, 스트림이 시작되지 못한 경우에도 응답 종료 시 반납 (한 번만)
+    release = admission.releaser(client_key, started_at)
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event in chat_service.stream_chat_request(request):
+                if event["event"] == "done":
+                    logger.info(f"스트리밍 채팅 요청 처리 완료: thread_id={event['data']['thread_id']}")
+                yield _format_sse(event)
+        finally:
+            release()
+
+    try:
+        return AdmittedStreamingResponse(
+            event_stream(),
+            release=release,
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",  # 프록시 버퍼링 비활성화
+            },
+        )
+    except BaseException:
+        release()
+        raise
+
+
+@router.post(
+    "/chat/batch",
+    responses={
+        200: {"content": {"application/x-ndjson": {}}, "description": "항목별 결과 (NDJSON)"},
+        429: {"model": ErrorResponse, "description": "클라이언트별 동시 요청 한도 초과 (Retry-After)"},
+        503: {"model": ErrorResponse, "description": "요청 대기열 포화 (Retry-After)"},
+    },
+    summary="배치 채팅 처리",
+    description="여러 메시지를 동시에 처리하고, 끝나는 순서대로 결과를 NDJSON 으로 전송합니다."
+)
+async def chat_batch(batch: BatchChatRequest, http_request: Request) -> StreamingResponse:
+    """
+    여러 채팅 메시지를 한 번에 처리합니다.
+
+    - **items**: `{"id", "message"}` 목록 (`eval/test_case.json` 의 `{"id", "query"}` 형식도 가능)
+    - **concurrency**: 동시에 실행할 요청 수 (선택, 기본값: 8). 항목마다 수락 제어 슬롯을 얻으므로
+      전역 / 클라이언트별 동시 실행 한도를 넘지 않습니다.
+    - 배치 안의 요청들이 같은 검색어를 생성하면 Gemini 검색은 한 번만 호출됩니다.
+    - 한 줄에 하나씩 `{"type": "result", ...}` 가 전송되고, 마지막 줄은 `{"type": "summary", ...}` 입니다.
+    """
+    logger.info(f"배치 채팅 요청 처리 시작: {len(batch.items)}건")
+
+    # 실행 중인 항목마다 슬롯을 따로 얻으므로(chat_service), 여기서는 지금 바로 거절될
+    # 상황인지만 확인해 스트림 시작 전에 429/503 으로 응답
+    client_key = _client_key(http_request)
+    try:
+        get_admission_controller().check(client_key)
+    except AdmissionRejected as e:
+        raise _admission_error(e)
+
+    async def result_stream() -> AsyncIterator[str]:
+        async for result in chat_service.process_batch_request(batch, client_key=client_key):
+            if result["type"] == "summary":
+                logger.info(
+                    f"배치 채팅 요청 처리 완료: {result['succeeded']}/{result['total']}건 성공, "
+                    f"{result['processing_time']:.1f}초"
+                )
+            yield json.dumps(result, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
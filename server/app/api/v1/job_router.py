@@ -0,0 +1,67 @@
+from fastapi import APIRouter, HTTPException, Request, status
+import logging
+
+from app.schemas.chat_schema import ChatRequest, ErrorResponse
+from app.schemas.job_schema import JobCreateResponse, JobResponse
+from app.services.job_service import get_job_service
+from app.core.admission import AdmissionRejected
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 라우터 생성
+router = APIRouter()
+
+@router.post(
+    "/jobs",
+    response_model=JobCreateResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        503: {"model": ErrorResponse, "description": "작업 대기열 포화 (Retry-After)"},
+    },
+    summary="추천 작업 생성",
+    description="채팅 메시지를 백그라운드 작업으로 등록하고 작업 ID를 바로 반환합니다."
+)
+async def create_job(request: ChatRequest, http_request: Request) -> JobCreateResponse:
+    """
+    오래 걸리는 추천 요청을 작업으로 등록합니다.
+
+    - 요청 형식은 `/chat` 과 같습니다.
+    - 반환된 `status_url` 로 진행 상황과 결과를 조회합니다.
+    - 클라이언트 연결이 끊겨도 작업은 계속 실행되고 결과는 일정 시간 보관됩니다.
+    """
+    try:
+        job = await get_job_service().submit(request)
+    except AdmissionRejected as e:
+        logger.warning(f"작업 등록 거절: {e.detail}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    logger.info(f"작업 등록: {job['job_id']} - {request.message[:50]}...")
+    return JobCreateResponse(
+        job_id=job["job_id"],
+        status=job["status"],
+        status_url=str(http_request.url_for("get_job", job_id=job["job_id"])),
+    )
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "없거나 만료된 작업"},
+    },
+    summary="추천 작업 조회",
+    description="작업 상태와 부분 결과(진행 노드, 검색어, 생성 중인 리포트), 완료 시 최종 응답을 반환합니다."
+)
+async def get_job(job_id: str) -> JobResponse:
+    """작업 상태를 조회합니다."""
+    job = await get_job_service().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"작업을 찾을 수 없습니다: {job_id}"
+        )
+    return JobResponse(**job)
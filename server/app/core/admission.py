@@ -0,0 +1,198 @@
+import time
+import asyncio
+import logging
+import math
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ========== 요청 수락 제어 (admission control) ==========
+
+class AdmissionRejected(Exception):
+    """대기열이 가득 찼거나 클라이언트 한도를 넘어 요청을 받지 않을 때 발생합니다.
+
+    `status_code` 는 429(클라이언트별 한도 초과) 또는 503(전역 대기열 포화/대기 시간 초과),
+    `retry_after` 는 Retry-After 헤더로 보낼 대기 권장 시간(초)입니다.
+    """
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """동시에 실행되는 그래프 수를 전역 / 클라이언트별로 제한하는 수락 제어기.
+
+    - 전역으로 `max_concurrent` 개까지 바로 실행하고, 나머지는 최대 `max_queue` 개까지
+      FIFO 대기열에서 기다립니다. 대기열이 가득 차거나 `queue_timeout` 초를 넘기면 503.
+    - 한 클라이언트가 실행 + 대기 중인 요청이 `per_client_limit` 개를 넘으면 429.
+    - 한도 값이 0 이면 해당 제한을 적용하지 않습니다.
+
+    과부하 시 요청을 무작정 받아 Gemini 429 와 재시도를 유발하는 대신, 빠르게 거절하고
+    Retry-After 로 재시도 시점을 알려 줍니다.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        max_queue: int = 64,
+        queue_timeout: float = 30.0,
+        per_client_limit: int = 4,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.per_client_limit = per_client_limit
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._per_client: Counter = Counter()
+        self._queue_times: Deque[float] = deque(maxlen=1000)
+        self._service_times: Deque[float] = deque(maxlen=200)
+        self.metrics: Counter = Counter()
+
+    # ---------- 수락 / 반납 ----------
+
+    def _retry_after(self) -> int:
+        """현재 대기열이 비워질 때까지의 대략적인 시간(초)"""
+        service_time = sum(self._service_times) / len(self._service_times) if self._service_times else 10.0
+        waves = (len(self._waiters) + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(service_time * waves))
+
+    def check(self, client_key: str) -> None:
+        """슬롯을 잡지 않고, 지금 요청하면 바로 거절될 상황인지 확인합니다 (거절 시 AdmissionRejected).
+
+        항목마다 따로 슬롯을 얻는 배치 요청이 스트림을 시작하기 전에 429/503 으로 응답하는 데 사용합니다.
+        """
+        if self.per_client_limit and self._per_client[client_key] >= self.per_client_limit:
+            self.metrics["rejected_client"] += 1
+            raise AdmissionRejected(429, "클라이언트별 동시 요청 한도를 초과했습니다.", self._retry_after())
+        if self.max_concurrent and self.active >= self.max_concurrent and len(self._waiters) >= self.max_queue:
+            self.metrics["rejected_queue_full"] += 1
+            raise AdmissionRejected(503, "요청 대기열이 가득 찼습니다.", self._retry_after())
+
+    async def acquire(self, client_key: str) -> float:
+        """실행 슬롯을 얻을 때까지 기다리고, 반납 시 넘겨줄 시작 시각을 반환합니다."""
+        self.check(client_key)
+
+        enqueued_at = time.monotonic()
+        if self.max_concurrent and self.active >= self.max_concurrent:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self._per_client[client_key] += 1
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._abandon(waiter, client_key)
+                self.metrics["rejected_timeout"] += 1
+                raise AdmissionRejected(503, "요청 대기 시간이 초과되었습니다.", self._retry_after())
+            except BaseException:
+                self._abandon(waiter, client_key)
+                raise
+        else:
+            self.active += 1
+            self._per_client[client_key] += 1
+
+        started_at = time.monotonic()
+        self._queue_times.append(started_at - enqueued_at)
+        self.metrics["admitted"] += 1
+        return started_at
+
+    def _abandon(self, waiter: asyncio.Future, client_key: str) -> None:
+        """대기를 포기한 요청을 정리합니다. 그 사이 슬롯을 넘겨받았다면 다음 대기자에게 넘깁니다."""
+        self._release_client(client_key)
+        if waiter.done() and not waiter.cancelled():
+            self._handoff()
+        else:
+            waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def _release_client(self, client_key: str) -> None:
+        self._per_client[client_key] -= 1
+        if self._per_client[client_key] <= 0:
+            del self._per_client[client_key]
+
+    def _handoff(self) -> None:
+        """슬롯을 다음 대기자에게 넘기거나, 대기자가 없으면 반납합니다."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def release(self, client_key: str, started_at: float) -> None:
+        self._service_times.append(time.monotonic() - started_at)
+        self._release_client(client_key)
+        self._handoff()
+
+    def releaser(self, client_key: str, started_at: float) -> Callable[[], None]:
+        """여러 경로(스트림 종료, 응답 종료, 연결 끊김)에서 불러도 한 번만 반납하는 함수를 반환합니다."""
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.release(client_key, started_at)
+
+        return release
+
+    @asynccontextmanager
+    async def admit(self, client_key: str) -> AsyncIterator[None]:
+        """`async with controller.admit(key):` 블록 동안 실행 슬롯을 점유합니다."""
+        started_at = await self.acquire(client_key)
+        try:
+            yield
+        finally:
+            self.release(client_key, started_at)
+
+    # ---------- 통계 ----------
+
+    def stats(self) -> Dict[str, Any]:
+        """실행/대기 수, 거절 횟수, 대기 시간 분위수(초)"""
+        queue_times = sorted(self._queue_times)
+
+        def percentile(q: float) -> Optional[float]:
+            if not queue_times:
+                return None
+            return round(queue_times[min(int(q * len(queue_times)), len(queue_times) - 1)], 4)
+
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "clients": len(self._per_client),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.metrics["admitted"],
+            "rejected_client": self.metrics["rejected_client"],
+            "rejected_queue_full": self.metrics["rejected_queue_full"],
+            "rejected_timeout": self.metrics["rejected_timeout"],
+            "queue_time_p50": percentile(0.5),
+            "queue_time_p95": percentile(0.95),
+            "queue_time_max": round(queue_times[-1], 4) if queue_times else None,
+        }
+
+
+_admission: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """프로세스 전역 수락 제어기를 반환합니다."""
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController(
+            max_concurrent=settings.admission_max_concurrent,
+            max_queue=settings.admission_max_queue,
+            queue_timeout=settings.admission_queue_timeout,
+            per_client_limit=settings.admission_per_client_limit,
+        )
+    return _admission
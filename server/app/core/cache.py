@@ -0,0 +1,141 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+# ========== TTL + LRU 캐시 ==========
+
+class TTLCache(Generic[V]):
+    """만료 시간(TTL)과 최대 크기(LRU 제거)를 가진 프로세스 내 캐시.
+
+    - 항목은 저장 시점부터 `ttl` 초가 지나면 만료됩니다.
+    - `maxsize` 를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+    - 여러 스레드(동기 그래프 실행)와 이벤트 루프에서 함께 사용할 수 있도록 잠금을 사용합니다.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        if maxsize <= 0:
+            raise ValueError("maxsize는 1 이상이어야 합니다.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """키에 해당하는 값을 반환합니다. 없거나 만료되면 default 를 반환합니다."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        """값을 저장합니다. ttl 을 주면 해당 항목에만 다른 만료 시간을 적용합니다."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def touch(self, key: Hashable) -> None:
+        """적중 통계에 반영하지 않고 LRU 순서만 갱신합니다."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+
+    def pop(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[1]
+
+    def items(self) -> Iterator[Tuple[Hashable, V]]:
+        """만료되지 않은 항목을 (키, 값) 형태로 반환합니다. LRU 순서는 바꾸지 않습니다."""
+        now = time.monotonic()
+        with self._lock:
+            snapshot = [(k, v) for k, (expires_at, v) in self._data.items() if expires_at > now]
+        return iter(snapshot)
+
+    def purge_expired(self) -> int:
+        """만료된 항목을 모두 제거하고 제거한 개수를 반환합니다."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (expires_at, _) in self._data.items() if expires_at <= now]
+            for k in expired:
+                del self._data[k]
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """적중률 등 캐시 통계를 반환합니다."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+# ========== 동시 요청 병합 (singleflight) ==========
+
+class SingleFlight:
+    """같은 키의 동시 비동기 호출을 하나의 실행으로 합칩니다.
+
+    먼저 도착한 호출이 실제 작업을 Task 로 실행하고, 실행 중에 같은 키로 들어온
+    호출은 그 Task 의 결과를 함께 기다립니다. 작업은 별도 Task 이므로 처음 호출한
+    쪽이 취소되어도 나머지 대기자는 결과를 받습니다. 예외는 모든 대기자에게 전달되며
+    결과를 보관하지 않으므로 캐시와 함께 사용합니다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Tuple[int, Hashable], "asyncio.Task"] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> V:
+        loop = asyncio.get_running_loop()
+        # 동기 그래프 실행은 노드마다 별도 이벤트 루프를 사용하므로 루프별로 구분합니다.
+        flight_key = (id(loop), key)
+        task = self._inflight.get(flight_key)
+        if task is None:
+            self.calls += 1
+            task = loop.create_task(fn())
+            self._inflight[flight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "shared": self.shared,
+        }
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 import os
 
 class Settings(BaseSettings):
@@ -13,16 +13,83 @@ class Settings(BaseSettings):
     gemini_api_key: Optional[str] = os.getenv("GEMINI_API_KEY")
     
     # 그래프 설정
-    max_search_queries: int = 3
+    max_search_queries: int = 4
     max_search_loops: int = 2
+    required_search_results: int = 3  # 이 개수의 검색이 끝나면 나머지 검색은 기다리지 않음
+    search_timeout: int = 25  # 개별 검색 타임아웃 (초)
     
     # 모델 설정
     validation_model: str = "gemini-2.5-flash"
     search_model: str = "gemini-2.0-flash"
     analysis_model: str = "gemini-2.5-flash"
     
-    # 데이터베이스 설정 (향후 확장용)
-    database_url: Optional[str] = None
+    # 수락 제어 (동시 그래프 실행 수 제한, 0 이면 제한 없음)
+    admission_max_concurrent: int = 16  # 전역 동시 실행 수
+    admission_max_queue: int = 64  # 전역 대기열 길이 (초과 시 503)
+    admission_queue_timeout: float = 30.0  # 대기열 최대 대기 시간 (초과 시 503, 초)
+    admission_per_client_limit: int = 4  # 클라이언트별 실행 + 대기 요청 수 (초과 시 429)
+    
+    # 배치 요청 기본 동시 실행 수 (/chat/batch)
+    batch_concurrency: int = 8
+    
+    # 비동기 작업 설정 (/jobs)
+    job_workers: int = 4  # 작업 워커 수
+    job_max_queue: int = 100  # 대기 작업 수 (초과 시 503)
+    job_store_backend: str = "memory"  # memory | postgres
+    job_ttl: int = 24 * 60 * 60  # 작업 결과 보관 시간 (초)
+    job_max_entries: int = 10000  # 메모리 저장소 최대 작업 수
+    
+    # 동일한 단일 턴 요청(새 스레드, 같은 메시지·설정)을 하나의 그래프 실행으로 병합
+    coalesce_requests: bool = True
+    
+    # Gemini 요청 제한 (프로젝트 할당량 기준, 모든 노드가 공유)
+    gemini_rate_limit: bool = True
+    gemini_rpm_limits: Dict[str, int] = {"gemini-2.0-flash": 2000, "gemini-2.5-flash": 1000}
+    gemini_tpm_limits: Dict[str, int] = {"gemini-2.0-flash": 4_000_000, "gemini-2.5-flash": 1_000_000}
+    gemini_throttle_seconds: float = 5.0  # 429 응답 후 해당 모델 호출을 멈추는 시간 (초)
+    
+    # 로컬 스팬 트레이싱 (노드 / LLM·검색 호출별 JSONL, eval/trace_waterfall.py 로 확인)
+    trace_enabled: bool = False
+    trace_file: str = "logs/traces.jsonl"
+    trace_max_bytes: int = 10 * 1024 * 1024  # 파일 회전 크기
+    trace_backup_count: int = 5  # 보관할 회전 파일 수
+    
+    # 앱 시작 시 LLM 클라이언트 커넥션 예열 여부
+    warmup_clients: bool = True
+    
+    # 데이터베이스 설정 (docker-compose 의 POSTGRES_URL 사용)
+    database_url: Optional[str] = os.getenv("POSTGRES_URL")
+    
+    # 체크포인터 설정 (멀티턴 대화 상태)
+    checkpointer_backend: str = "memory"  # memory | postgres
+    checkpoint_thread_ttl: int = 24 * 60 * 60  # 마지막 사용 후 스레드 보관 시간 (초)
+    checkpoint_max_threads: int = 10000
+    checkpoint_history_per_thread: int = 10  # 스레드별로 남길 최근 체크포인트 수
+    checkpoint_maintenance_interval: int = 5 * 60  # 정리 주기 (초)
+    
+    # 임베딩 설정 ("hashing": 로컬 n-gram 임베딩, 그 외: Gemini 임베딩 모델명)
+    embedding_model: str = "hashing"
+    
+    # 응답 캐시 설정 (검증된 요구사항 기준)
+    answer_cache_backend: str = "memory"  # memory | pgvector
+    answer_cache_ttl: int = 6 * 60 * 60  # 초
+    answer_cache_max_entries: int = 1000
+    answer_cache_similarity_threshold: float = 0.92
+    
+    # 제품 지식 베이스 설정 (추출한 제품 저장, 요청별 사용 여부는 use_product_kb)
+    product_store_backend: str = "memory"  # memory | pgvector
+    product_store_retention: int = 30 * 24 * 60 * 60  # 마지막 갱신 후 보관 기간 (초)
+    product_store_max_entries: int = 5000
+    product_store_similarity_threshold: float = 0.2
+    
+    # 웹 검색 결과 캐시 설정 (정규화된 검색어 + 모델 기준)
+    search_cache_ttl: int = 60 * 60  # 초
+    search_cache_max_entries: int = 2048
+    
+    # 검색 헤지 요청 설정 (요청별 사용 여부는 use_search_hedging)
+    search_hedge_quantile: float = 0.9  # 이 분위 지연 시간이 지나면 중복 요청 전송
+    search_hedge_min_samples: int = 20  # 헤지 기준을 정하기 위한 최소 지연 시간 샘플 수
+    search_hedge_budget_ratio: float = 0.1  # 헤지 요청 상한 (전체 검색 대비 비율)
     
     class Config:
         env_file = ".env"
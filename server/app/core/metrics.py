@@ -0,0 +1,179 @@
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily, CounterMetricFamily
+
+logger = logging.getLogger(__name__)
+
+# ========== Prometheus 지표 ==========
+
+# 노드 / Gemini 호출은 수 초 ~ 수십 초 단위이므로 기본 버킷보다 넓게 잡습니다.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120)
+
+NODE_DURATION = Histogram(
+    "graph_node_duration_seconds",
+    "LangGraph 노드 실행 시간",
+    ["node", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+GEMINI_CALL_DURATION = Histogram(
+    "gemini_call_duration_seconds",
+    "Gemini API 호출 시간 (요청 제한 대기 제외)",
+    ["model", "node", "kind", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+GEMINI_RATE_LIMIT_WAIT = Histogram(
+    "gemini_rate_limit_wait_seconds",
+    "공유 Gemini 요청 제한기에서 기다린 시간",
+    ["model", "node"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60),
+)
+GEMINI_TOKENS = Counter(
+    "gemini_tokens_total",
+    "Gemini usage_metadata 기준 입력/출력 토큰 수",
+    ["model", "node", "direction"],
+)
+GRAPH_RUNS_IN_FLIGHT = Gauge(
+    "graph_runs_in_flight",
+    "실행 중인 그래프 수",
+    ["mode"],
+)
+CHAT_REQUEST_DURATION = Histogram(
+    "chat_request_duration_seconds",
+    "채팅 요청 전체 처리 시간",
+    ["mode", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def observe_node(node: str, seconds: float, status: str) -> None:
+    NODE_DURATION.labels(node=node, status=status).observe(seconds)
+
+
+def observe_gemini_call(
+    node: str,
+    model: str,
+    kind: str,
+    seconds: float,
+    status: str,
+    input_tokens: Optional[int] = None,
+    output_tokens: Optional[int] = None,
+) -> None:
+    GEMINI_CALL_DURATION.labels(model=model, node=node, kind=kind, status=status).observe(seconds)
+    if input_tokens:
+        GEMINI_TOKENS.labels(model=model, node=node, direction="input").inc(input_tokens)
+    if output_tokens:
+        GEMINI_TOKENS.labels(model=model, node=node, direction="output").inc(output_tokens)
+
+
+def observe_rate_limit_wait(node: str, model: str, seconds: float) -> None:
+    GEMINI_RATE_LIMIT_WAIT.labels(model=model, node=node).observe(seconds)
+
+
+@contextmanager
+def track_graph_run(mode: str) -> Iterator[None]:
+    """그래프 실행 중 in-flight 게이지를 올리고, 끝나면 전체 처리 시간을 기록합니다."""
+    gauge = GRAPH_RUNS_IN_FLIGHT.labels(mode=mode)
+    gauge.inc()
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        gauge.dec()
+        CHAT_REQUEST_DURATION.labels(mode=mode, status=status).observe(time.perf_counter() - start)
+
+# ========== 상태 기반 지표 (스크레이프 시점에 수집) ==========
+
+class StatsCollector:
+    """각 컴포넌트의 `stats()` 값을 스크레이프 시점에 게이지/카운터로 변환합니다.
+
+    대기열 깊이나 캐시 적중률처럼 이미 컴포넌트가 집계하고 있는 값은 별도로 갱신하지
+    않고, 등록된 stats 함수를 호출해 그대로 내보냅니다.
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def register(self, name: str, stats_fn: Callable[[], Dict[str, Any]]) -> None:
+        self._sources[name] = stats_fn
+
+    def _stats(self, name: str) -> Dict[str, Any]:
+        try:
+            return self._sources[name]() if name in self._sources else {}
+        except Exception as e:
+            logger.warning(f"[metrics] {name} 통계 수집 실패: {str(e)}")
+            return {}
+
+    def collect(self) -> Iterator[Any]:
+        queue_depth = GaugeMetricFamily("queue_depth", "대기 중인 작업 수", labels=["queue"])
+        active = GaugeMetricFamily("queue_active", "실행 중인 작업 수", labels=["queue"])
+        rejected = CounterMetricFamily("admission_rejected", "수락 제어로 거절된 요청 수", labels=["reason"])
+        cache_hits = CounterMetricFamily("cache_hits", "캐시 적중 수", labels=["cache"])
+        cache_misses = CounterMetricFamily("cache_misses", "캐시 미적중 수", labels=["cache"])
+        cache_hit_rate = GaugeMetricFamily("cache_hit_rate", "캐시 적중률", labels=["cache"])
+        cache_size = GaugeMetricFamily("cache_entries", "캐시 항목 수", labels=["cache"])
+
+        admission = self._stats("admission")
+        if admission:
+            queue_depth.add_metric(["admission"], admission["queued"])
+            active.add_metric(["admission"], admission["active"])
+            for reason in ("client", "queue_full", "timeout"):
+                rejected.add_metric([reason], admission[f"rejected_{reason}"])
+
+        jobs = self._stats("jobs")
+        if jobs:
+            queue_depth.add_metric(["jobs"], jobs["queued"])
+            active.add_metric(["jobs"], jobs["running"])
+
+        for model, bucket in self._stats("gemini_rate_limit").items():
+            queue_depth.add_metric([f"gemini:{model}"], bucket["queued"])
+
+        for cache in ("answer_cache", "search_cache"):
+            stats = self._stats(cache)
+            if "misses" not in stats:
+                continue
+            # 응답 캐시는 정확/유사 적중을 나누어 집계하고 크기는 백엔드 통계에 있음
+            hits = stats.get("hits", stats.get("exact_hits", 0) + stats.get("semantic_hits", 0))
+            size = stats.get("size", stats.get("backend", {}).get("size", 0))
+            cache_hits.add_metric([cache], hits)
+            cache_misses.add_metric([cache], stats["misses"])
+            cache_hit_rate.add_metric([cache], stats["hit_rate"])
+            cache_size.add_metric([cache], size)
+
+        yield from (queue_depth, active, rejected, cache_hits, cache_misses, cache_hit_rate, cache_size)
+
+        hedging = self._stats("search_hedging")
+        if hedging:
+            hedge_events = CounterMetricFamily("search_hedge_events", "검색 헤지 실행기 이벤트 수", labels=["event"])
+            for event in ("requests", "hedged", "hedge_wins", "budget_denied"):
+                hedge_events.add_metric([event], hedging[event])
+            yield hedge_events
+
+        product_store = self._stats("product_store")
+        if product_store:
+            stored = CounterMetricFamily("product_store_stored", "제품 지식 베이스에 저장(병합)한 제품 수")
+            lookups = CounterMetricFamily("product_store_lookups", "제품 지식 베이스 조회 수")
+            retrieved = CounterMetricFamily("product_store_retrieved", "제품 지식 베이스 조회로 찾은 제품 수")
+            stored.add_metric([], product_store["stored"])
+            lookups.add_metric([], product_store["lookups"])
+            retrieved.add_metric([], product_store["retrieved"])
+            yield from (stored, lookups, retrieved)
+            # pgvector 백엔드는 항목 수를 집계하지 않음
+            if "size" in product_store.get("backend", {}):
+                entries = GaugeMetricFamily("product_store_entries", "제품 지식 베이스 제품 수")
+                entries.add_metric([], product_store["backend"]["size"])
+                yield entries
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+def render_metrics() -> bytes:
+    return generate_latest(REGISTRY)
+
@@ -0,0 +1,193 @@
+import json
+import time
+import asyncio
+import uuid
+import logging
+import logging.handlers
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ========== 스팬 ==========
+
+class Span:
+    """그래프 실행 / 노드 / LLM·검색 호출 하나의 시간 구간.
+
+    같은 그래프 실행의 스팬은 trace_id 를 공유하고 parent_id 로 부모 스팬을 가리킵니다.
+    """
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"], thread_id: Optional[str], attrs: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.thread_id = thread_id or (parent.thread_id if parent else None)
+        self.attrs = attrs
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self.status = "ok"
+
+    def set(self, **attrs: Any) -> None:
+        """스팬 속성을 추가합니다 (토큰 수 등 호출이 끝난 뒤에 알 수 있는 값)."""
+        self.attrs.update({k: v for k, v in attrs.items() if v is not None})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "thread_id": self.thread_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": round(self.start, 6),
+            "duration_ms": round((time.perf_counter() - self._start_perf) * 1000, 3),
+            "status": self.status,
+            "attrs": self.attrs,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+# ========== JSONL 내보내기 ==========
+
+_trace_logger: Optional[logging.Logger] = None
+
+
+def _get_trace_logger() -> logging.Logger:
+    """회전(rotating) JSONL 파일에 스팬을 한 줄씩 기록하는 전용 로거"""
+    global _trace_logger
+    if _trace_logger is None:
+        path = Path(settings.trace_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=settings.trace_max_bytes,
+            backupCount=settings.trace_backup_count,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        trace_logger = logging.getLogger("app.trace.export")
+        trace_logger.setLevel(logging.INFO)
+        trace_logger.propagate = False  # 콘솔 로그에 섞이지 않도록
+        trace_logger.addHandler(handler)
+        _trace_logger = trace_logger
+    return _trace_logger
+
+
+def _export(span: Span) -> None:
+    try:
+        _get_trace_logger().info(json.dumps(span.to_dict(), ensure_ascii=False, default=str))
+    except Exception as e:
+        logger.warning(f"[tracing] 스팬 기록 실패: {str(e)}")
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", thread_id: Optional[str] = None, **attrs: Any) -> Iterator[Optional[Span]]:
+    """`with span("web_search", "node", query=...) as s:` 블록을 하나의 스팬으로 기록합니다.
+
+    현재 스팬이 있으면 그 자식 스팬이 되고, 없으면 새 trace 를 시작합니다.
+    트레이싱이 꺼져 있으면(TRACE_ENABLED=false) 아무것도 기록하지 않고 None 을 반환합니다.
+    """
+    if not settings.trace_enabled:
+        yield None
+        return
+
+    current = Span(name, kind, _current_span.get(), thread_id, {k: v for k, v in attrs.items() if v is not None})
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+        if current.status == "error":
+            current.set(error=str(e)[:500])
+        raise
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            pass  # 스트리밍 제너레이터가 다른 컨텍스트에서 닫힌 경우
+        _export(current)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+# ========== 워터폴 출력 ==========
+
+def load_spans(paths: Iterable[Path], thread_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """JSONL 파일(회전된 백업 포함)에서 스팬을 읽습니다. thread_id 를 주면 해당 스레드만."""
+    spans = []
+    for path in paths:
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if thread_id is None or record.get("thread_id") == thread_id:
+                    spans.append(record)
+    return spans
+
+
+def trace_files(path: Optional[str] = None) -> List[Path]:
+    """현재 파일과 회전된 백업 파일(.1, .2, ...)을 오래된 순서로 반환합니다."""
+    base = Path(path or settings.trace_file)
+    backups = sorted(base.parent.glob(base.name + ".*"), key=lambda p: -int(p.suffix[1:]) if p.suffix[1:].isdigit() else 0)
+    return backups + [base]
+
+
+def _describe(record: Dict[str, Any]) -> str:
+    attrs = record.get("attrs", {})
+    parts = []
+    for key in ("model", "query", "prompt_chars", "input_tokens", "output_tokens", "wait_ms", "error"):
+        if key in attrs:
+            parts.append(f"{key}={attrs[key]}")
+    return " ".join(parts)
+
+
+def render_waterfall(spans: List[Dict[str, Any]], width: int = 50) -> str:
+    """스팬 목록을 trace 별 워터폴(들여쓰기 트리 + 시간 막대) 텍스트로 만듭니다."""
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    for record in spans:
+        traces.setdefault(record["trace_id"], []).append(record)
+
+    lines: List[str] = []
+    for trace_spans in sorted(traces.values(), key=lambda s: min(r["start"] for r in s)):
+        trace_start = min(r["start"] for r in trace_spans)
+        trace_end = max(r["start"] + r["duration_ms"] / 1000 for r in trace_spans)
+        total = max(trace_end - trace_start, 1e-6)
+        ids = {r["span_id"] for r in trace_spans}
+
+        children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for record in trace_spans:
+            parent = record["parent_id"] if record["parent_id"] in ids else None
+            children.setdefault(parent, []).append(record)
+
+        thread_id = next((r["thread_id"] for r in trace_spans if r.get("thread_id")), "-")
+        lines.append(f"trace {trace_spans[0]['trace_id'][:12]}  thread={thread_id}  total={total * 1000:.0f}ms")
+
+        def walk(parent_id: Optional[str], depth: int) -> None:
+            for record in sorted(children.get(parent_id, []), key=lambda r: r["start"]):
+                offset = record["start"] - trace_start
+                begin = int(offset / total * width)
+                length = max(1, int(record["duration_ms"] / 1000 / total * width))
+                bar = " " * begin + "█" * min(length, width - begin)
+                label = ("  " * depth + record["name"])[:36]
+                status = "" if record["status"] == "ok" else f" [{record['status']}]"
+                lines.append(
+                    f"  {label:<36} |{bar:<{width}}| {offset * 1000:>8.0f}ms +{record['duration_ms']:>8.0f}ms"
+                    f"{status} {_describe(record)}".rstrip()
+                )
+                walk(record["span_id"], depth + 1)
+
+        walk(None, 0)
+        lines.append("")
+    return "\n".join(lines)
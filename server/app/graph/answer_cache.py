@@ -0,0 +1,381 @@
+import json
+import re
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple, TypedDict
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from .embeddings import create_embedder, cosine_similarity
+
+logger = logging.getLogger(__name__)
+
+# ========== 요구사항 정규화 ==========
+
+# LLM이 같은 의미로 다르게 내놓는 요구사항 키를 하나로 모읍니다.
+KEY_ALIASES = {
+    "category": "카테고리",
+    "product": "카테고리",
+    "제품": "카테고리",
+    "제품군": "카테고리",
+    "purpose": "용도",
+    "usage": "용도",
+    "목적": "용도",
+    "budget": "예산",
+    "price": "예산",
+    "가격": "예산",
+    "가격대": "예산",
+    "brand": "브랜드",
+    "features": "기능",
+    "feature": "기능",
+    "요구기능": "기능",
+}
+
+# 문장형이라 매번 표현이 달라지는 키는 캐시 키에서 제외합니다.
+IGNORED_KEYS = {"intent", "의도", "raw_text"}
+
+
+class CachedAnswer(TypedDict):
+    requirements_key: str
+    report: str
+    sources_gathered: List[Dict[str, Any]]
+    created_at: float
+    similarity: float
+
+
+def _normalize_value(value: Any) -> str:
+    if isinstance(value, (list, tuple, set)):
+        return ",".join(sorted(_normalize_value(v) for v in value if v))
+    if isinstance(value, dict):
+        return ",".join(f"{k}:{_normalize_value(v)}" for k, v in sorted(value.items()))
+    text = str(value).strip().lower()
+    text = re.sub(r"(\d)\s*(만|천|백)?\s*원", r"\1\2원", text)  # "10 만 원" -> "10만원"
+    text = re.sub(r"[\s~\-_/·]+", " ", text)
+    return text.strip()
+
+
+def canonicalize_requirements(requirements: Optional[Dict[str, Any]]) -> str:
+    """`extracted_requirements` 를 정렬·정규화한 캐시 키 문자열로 변환합니다.
+
+    예: {"예산": "10만 원 이하", "category": "무선 이어폰"}
+        -> "예산=10만원 이하|카테고리=무선 이어폰"
+    """
+    if not requirements:
+        return ""
+
+    normalized: Dict[str, str] = {}
+    for raw_key, raw_value in requirements.items():
+        key = re.sub(r"\s+", "", str(raw_key).lower())
+        if key in IGNORED_KEYS or raw_value in (None, "", [], {}):
+            continue
+        key = KEY_ALIASES.get(key, key)
+        value = _normalize_value(raw_value)
+        if value:
+            normalized[key] = value
+
+    # 구조화된 키가 하나도 없으면 원문 텍스트라도 사용
+    if not normalized and requirements.get("raw_text"):
+        normalized["raw_text"] = _normalize_value(requirements["raw_text"])
+
+    return "|".join(f"{k}={v}" for k, v in sorted(normalized.items()))
+
+
+# 제품 자체를 바꾸는 조건. 유사도가 높아도 값이 하나라도 다르면 다른 요청으로 취급합니다.
+# ("무선 이어폰" ~ "유선 이어폰", 용도 "운동" ~ "게임" 은 n-gram 임베딩 유사도가 0.92 를 넘음)
+CATEGORICAL_KEYS = ("카테고리", "브랜드", "용도", "기능")
+
+
+def _numbers(requirements_key: str) -> Tuple[str, ...]:
+    """예산 등 숫자 조건. 유사도가 높아도 숫자가 다르면 다른 요청으로 취급합니다."""
+    return tuple(sorted(re.findall(r"\d+", requirements_key)))
+
+
+def _categorical(requirements_key: str) -> Dict[str, str]:
+    """범주형 조건 (띄어쓰기 차이는 무시, 기능 목록은 정렬된 상태로 비교)"""
+    fields = dict(part.split("=", 1) for part in requirements_key.split("|") if "=" in part)
+    return {key: re.sub(r"\s+", "", fields[key]) for key in CATEGORICAL_KEYS if key in fields}
+
+
+def _same_constraints(a: str, b: str) -> bool:
+    """유사도 적중으로 인정해도 되는지: 숫자 조건과 범주형 조건이 모두 같아야 합니다."""
+    return _numbers(a) == _numbers(b) and _categorical(a) == _categorical(b)
+
+# ========== 저장소 백엔드 ==========
+
+class InMemoryAnswerCacheBackend:
+    """프로세스 내 TTL + LRU 저장소 (단일 인스턴스 배포 및 테스트용)"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._cache: TTLCache[Dict[str, Any]] = TTLCache(maxsize=max_entries, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+
+    async def nearest(self, embedding: List[float], limit: int = 5) -> List[Tuple[Dict[str, Any], float]]:
+        scored = [
+            (entry, cosine_similarity(embedding, entry["embedding"]))
+            for _, entry in self._cache.items()
+        ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    async def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self._cache.set(key, entry)
+
+    async def touch(self, key: str) -> None:
+        self._cache.touch(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+class PgVectorAnswerCacheBackend:
+    """pgvector 확장이 설치된 Postgres 저장소 (docker-compose 의 postgres 서비스)
+
+    여러 서버 인스턴스가 캐시를 공유하고 재시작 후에도 유지됩니다.
+    TTL 은 created_at, LRU 는 last_accessed_at 기준으로 적용합니다.
+    """
+
+    def __init__(self, database_url: str, dimension: int, max_entries: int, ttl: float):
+        try:
+            from psycopg_pool import AsyncConnectionPool
+        except ImportError as e:
+            raise ImportError(
+                "pgvector 캐시 백엔드에는 psycopg[binary,pool] 패키지가 필요합니다."
+            ) from e
+
+        self.dimension = dimension
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._pool = AsyncConnectionPool(database_url, open=False, kwargs={"autocommit": True})
+        self._ready = False
+        self._ready_lock = asyncio.Lock()
+
+    async def _ensure_ready(self) -> None:
+        if self._ready:
+            return
+        async with self._ready_lock:
+            if self._ready:
+                return
+            await self._pool.open()
+            async with self._pool.connection() as conn:
+                await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+                await conn.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS answer_cache (
+                        requirements_key TEXT PRIMARY KEY,
+                        embedding vector({self.dimension}) NOT NULL,
+                        report TEXT NOT NULL,
+                        sources JSONB NOT NULL DEFAULT '[]'::jsonb,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                        last_accessed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                    )
+                    """
+                )
+            self._ready = True
+
+    @staticmethod
+    def _vector_literal(embedding: List[float]) -> str:
+        return "[" + ",".join(f"{v:.6f}" for v in embedding) + "]"
+
+    @staticmethod
+    def _row_to_entry(row) -> Dict[str, Any]:
+        key, report, sources, created_at = row[:4]
+        return {
+            "requirements_key": key,
+            "report": report,
+            "sources_gathered": sources if isinstance(sources, list) else json.loads(sources),
+            "created_at": created_at.timestamp(),
+        }
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        await self._ensure_ready()
+        async with self._pool.connection() as conn:
+            cur = await conn.execute(
+                """
+                SELECT requirements_key, report, sources, created_at FROM answer_cache
+                WHERE requirements_key = %s AND created_at > now() - make_interval(secs => %s)
+                """,
+                (key, self.ttl),
+            )
+            row = await cur.fetchone()
+        return self._row_to_entry(row) if row else None
+
+    async def nearest(self, embedding: List[float], limit: int = 5) -> List[Tuple[Dict[str, Any], float]]:
+        await self._ensure_ready()
+        vector = self._vector_literal(embedding)
+        async with self._pool.connection() as conn:
+            cur = await conn.execute(
+                """
+                SELECT requirements_key, report, sources, created_at,
+                       1 - (embedding <=> %s::vector) AS similarity
+                FROM answer_cache
+                WHERE created_at > now() - make_interval(secs => %s)
+                ORDER BY embedding <=> %s::vector
+                LIMIT %s
+                """,
+                (vector, self.ttl, vector, limit),
+            )
+            rows = await cur.fetchall()
+        return [(self._row_to_entry(row), float(row[4])) for row in rows]
+
+    async def put(self, key: str, entry: Dict[str, Any]) -> None:
+        await self._ensure_ready()
+        async with self._pool.connection() as conn:
+            await conn.execute(
+                """
+                INSERT INTO answer_cache (requirements_key, embedding, report, sources)
+                VALUES (%s, %s::vector, %s, %s::jsonb)
+                ON CONFLICT (requirements_key) DO UPDATE SET
+                    embedding = EXCLUDED.embedding,
+                    report = EXCLUDED.report,
+                    sources = EXCLUDED.sources,
+                    created_at = now(),
+                    last_accessed_at = now()
+                """,
+                (
+                    key,
+                    self._vector_literal(entry["embedding"]),
+                    entry["report"],
+                    json.dumps(entry["sources_gathered"], ensure_ascii=False),
+                ),
+            )
+            # 만료 항목과 LRU 초과분 정리
+            await conn.execute(
+                "DELETE FROM answer_cache WHERE created_at <= now() - make_interval(secs => %s)",
+                (self.ttl,),
+            )
+            await conn.execute(
+                """
+                DELETE FROM answer_cache WHERE requirements_key IN (
+                    SELECT requirements_key FROM answer_cache
+                    ORDER BY last_accessed_at DESC OFFSET %s
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    async def touch(self, key: str) -> None:
+        await self._ensure_ready()
+        async with self._pool.connection() as conn:
+            await conn.execute(
+                "UPDATE answer_cache SET last_accessed_at = now() WHERE requirements_key = %s",
+                (key,),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "pgvector", "maxsize": self.max_entries, "ttl": self.ttl}
+
+# ========== 응답 캐시 ==========
+
+class AnswerCache:
+    """검증된 요구사항을 키로 완성된 리포트와 출처를 캐시합니다.
+
+    1) 정규화한 요구사항 키가 정확히 일치하면 바로 반환합니다.
+    2) 없으면 임베딩 유사도가 `similarity_threshold` 이상이고 숫자 조건(예산 등)과
+       범주형 조건(카테고리·브랜드·용도·기능)이 같은 가장 가까운 항목을 반환합니다.
+    """
+
+    def __init__(self, backend, embedder, similarity_threshold: float = 0.92):
+        self.backend = backend
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    async def lookup(self, requirements: Optional[Dict[str, Any]]) -> Optional[CachedAnswer]:
+        key = canonicalize_requirements(requirements)
+        if not key:
+            return None
+
+        entry = await self.backend.get(key)
+        if entry:
+            self.exact_hits += 1
+            await self.backend.touch(key)
+            return self._to_answer(entry, 1.0)
+
+        embedding = await self.embedder.aembed(key)
+        for candidate, similarity in await self.backend.nearest(embedding):
+            if similarity < self.similarity_threshold:
+                break
+            if not _same_constraints(candidate["requirements_key"], key):
+                continue
+            self.semantic_hits += 1
+            await self.backend.touch(candidate["requirements_key"])
+            logger.info(f"[answer_cache] 유사 요청 적중 ({similarity:.3f}): {key} ~ {candidate['requirements_key']}")
+            return self._to_answer(candidate, similarity)
+
+        self.misses += 1
+        return None
+
+    async def store(
+        self,
+        requirements: Optional[Dict[str, Any]],
+        report: str,
+        sources_gathered: List[Dict[str, Any]],
+    ) -> None:
+        key = canonicalize_requirements(requirements)
+        if not key or not report:
+            return
+        entry = {
+            "requirements_key": key,
+            "embedding": await self.embedder.aembed(key),
+            "report": report,
+            "sources_gathered": sources_gathered,
+            "created_at": time.time(),
+        }
+        await self.backend.put(key, entry)
+
+    @staticmethod
+    def _to_answer(entry: Dict[str, Any], similarity: float) -> CachedAnswer:
+        return CachedAnswer(
+            requirements_key=entry["requirements_key"],
+            report=entry["report"],
+            sources_gathered=entry["sources_gathered"],
+            created_at=entry["created_at"],
+            similarity=similarity,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "backend": self.backend.stats(),
+        }
+
+
+_answer_cache: Optional[AnswerCache] = None
+
+
+def create_answer_cache() -> AnswerCache:
+    """애플리케이션 설정(app.core.config.settings)에 맞는 응답 캐시를 생성합니다."""
+    embedder = create_embedder(settings.embedding_model)
+    if settings.answer_cache_backend == "pgvector":
+        if not settings.database_url:
+            raise ValueError("answer_cache_backend=pgvector 에는 DATABASE_URL/POSTGRES_URL 설정이 필요합니다.")
+        backend = PgVectorAnswerCacheBackend(
+            settings.database_url,
+            dimension=embedder.dimension,
+            max_entries=settings.answer_cache_max_entries,
+            ttl=settings.answer_cache_ttl,
+        )
+    else:
+        backend = InMemoryAnswerCacheBackend(
+            max_entries=settings.answer_cache_max_entries,
+            ttl=settings.answer_cache_ttl,
+        )
+    return AnswerCache(backend, embedder, settings.answer_cache_similarity_threshold)
+
+
+def get_answer_cache() -> AnswerCache:
+    """프로세스 전역 응답 캐시 인스턴스를 반환합니다."""
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = create_answer_cache()
+    return _answer_cache
@@ -0,0 +1,378 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ========== 메모리 체크포인터 ==========
+
+class BoundedMemorySaver(InMemorySaver):
+    """스레드 TTL / LRU 제한과 스레드별 체크포인트 개수 제한이 있는 MemorySaver.
+
+    기본 MemorySaver 는 스레드와 체크포인트가 계속 쌓이기만 하므로 장시간 운영 시
+    메모리가 선형으로 증가합니다. 이 구현은
+    - `thread_ttl` 초 동안 사용되지 않은 스레드를 삭제하고,
+    - 스레드 수가 `max_threads` 를 넘으면 가장 오래 사용되지 않은 스레드부터 삭제하며,
+    - 스레드(네임스페이스)별로 최근 `max_checkpoints_per_thread` 개 체크포인트만 남깁니다.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = 10000,
+        thread_ttl: float = 24 * 60 * 60,
+        max_checkpoints_per_thread: int = 10,
+    ):
+        super().__init__()
+        self.max_threads = max_threads
+        self.thread_ttl = thread_ttl
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        self._guard = threading.RLock()
+        self.evicted_threads = 0
+        self.pruned_checkpoints = 0
+
+    # ---------- 접근 기록 / 제거 ----------
+
+    def _touch(self, thread_id: str) -> None:
+        with self._guard:
+            self._last_access[thread_id] = time.monotonic()
+            self._last_access.move_to_end(thread_id)
+
+    def _is_expired(self, thread_id: str) -> bool:
+        last = self._last_access.get(thread_id)
+        return last is not None and time.monotonic() - last > self.thread_ttl
+
+    def _drop_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self._last_access.pop(thread_id, None)
+        self.evicted_threads += 1
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._guard:
+            super().delete_thread(thread_id)
+            self._last_access.pop(thread_id, None)
+
+    def evict(self) -> int:
+        """만료된 스레드와 LRU 초과 스레드를 삭제하고 삭제한 스레드 수를 반환합니다."""
+        with self._guard:
+            before = self.evicted_threads
+            now = time.monotonic()
+            for thread_id, last in list(self._last_access.items()):
+                if now - last <= self.thread_ttl:
+                    break  # OrderedDict 는 오래된 순서이므로 이후는 모두 유효
+                self._drop_thread(thread_id)
+            while len(self._last_access) > self.max_threads:
+                thread_id = next(iter(self._last_access))
+                self._drop_thread(thread_id)
+            return self.evicted_threads - before
+
+    def _trim_history(self, thread_id: str, checkpoint_ns: str) -> None:
+        """오래된 체크포인트와 그 쓰기 기록, 더 이상 참조되지 않는 채널 값을 삭제합니다."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.max_checkpoints_per_thread:
+            return
+
+        # 체크포인트 ID는 시간순 정렬 가능한 uuid6
+        ordered = sorted(checkpoints)
+        stale, kept = ordered[:-self.max_checkpoints_per_thread], ordered[-self.max_checkpoints_per_thread:]
+        for checkpoint_id in stale:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        self.pruned_checkpoints += len(stale)
+
+        referenced = set()
+        for checkpoint_id in kept:
+            checkpoint = self.serde.loads_typed(checkpoints[checkpoint_id][0])
+            referenced.update(checkpoint.get("channel_versions", {}).items())
+        for key in [
+            k for k in self.blobs
+            if k[0] == thread_id and k[1] == checkpoint_ns and (k[2], k[3]) not in referenced
+        ]:
+            del self.blobs[key]
+
+    # ---------- InMemorySaver 오버라이드 ----------
+
+    def get_tuple(self, config: RunnableConfig):
+        thread_id = config["configurable"]["thread_id"]
+        with self._guard:
+            if self._is_expired(thread_id):
+                self._drop_thread(thread_id)
+                return None
+            result = super().get_tuple(config)
+            if result is not None:
+                self._touch(thread_id)
+            return result
+
+    def put(self, config: RunnableConfig, checkpoint, metadata, new_versions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        with self._guard:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._touch(thread_id)
+            self._trim_history(thread_id, config["configurable"]["checkpoint_ns"])
+            self.evict()
+            return result
+
+    def put_writes(self, config: RunnableConfig, writes, task_id: str, task_path: str = "") -> None:
+        with self._guard:
+            super().put_writes(config, writes, task_id, task_path)
+
+    # ---------- 메모리 사용량 ----------
+
+    def stats(self) -> Dict[str, Any]:
+        """스레드/체크포인트 수와 직렬화된 상태의 대략적인 크기(바이트)"""
+        with self._guard:
+            checkpoints = sum(len(c) for ns in self.storage.values() for c in ns.values())
+            checkpoint_bytes = sum(
+                len(cp[1]) + len(meta[1])
+                for ns in self.storage.values()
+                for c in ns.values()
+                for cp, meta, _ in c.values()
+            )
+            blob_bytes = sum(len(v[1]) for v in self.blobs.values())
+            write_bytes = sum(
+                len(w[2][1]) for writes in self.writes.values() for w in writes.values()
+            )
+            return {
+                "backend": "memory",
+                "threads": len(self.storage),
+                "checkpoints": checkpoints,
+                "approx_bytes": checkpoint_bytes + blob_bytes + write_bytes,
+                "evicted_threads": self.evicted_threads,
+                "pruned_checkpoints": self.pruned_checkpoints,
+                "max_threads": self.max_threads,
+                "thread_ttl": self.thread_ttl,
+            }
+
+    async def maintain(self) -> None:
+        self.evict()
+
+# ========== Postgres 체크포인터 ==========
+
+def create_postgres_saver(database_url: str):
+    """docker-compose 의 Postgres 를 사용하는 체크포인터를 생성합니다.
+
+    커넥션 풀은 이벤트 루프가 필요하므로 여기서는 열지 않고, 앱 시작 시
+    `setup_checkpointer` 에서 열고 테이블을 준비합니다.
+    """
+    try:
+        from psycopg_pool import AsyncConnectionPool
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+    except ImportError as e:
+        raise ImportError(
+            "Postgres 체크포인터에는 langgraph-checkpoint-postgres, psycopg[binary,pool] 패키지가 필요합니다."
+        ) from e
+
+    class BoundedPostgresSaver(AsyncPostgresSaver):
+        """스레드 TTL / 최대 스레드 수 / 스레드별 체크포인트 정리를 주기적으로 수행하는 Postgres 체크포인터
+
+        BoundedMemorySaver 와 같이 스레드(네임스페이스)별로 최근 `max_checkpoints_per_thread` 개
+        체크포인트만 남깁니다.
+        """
+
+        # 스레드(네임스페이스)별 최근 N 개를 넘는 체크포인트와 그 쓰기 기록을 삭제하고,
+        # 삭제한 체크포인트 수와 삭제된 체크포인트가 참조하던 채널 값 목록을 반환
+        TRIM_HISTORY_SQL = """
+            WITH ranked AS (
+                SELECT thread_id, checkpoint_ns, checkpoint_id,
+                       row_number() OVER (
+                           PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                       ) AS rn
+                FROM checkpoints
+                WHERE thread_id = ANY(%s)
+            ), stale AS (
+                DELETE FROM checkpoints c USING ranked r
+                WHERE r.rn > %s
+                  AND c.thread_id = r.thread_id
+                  AND c.checkpoint_ns = r.checkpoint_ns
+                  AND c.checkpoint_id = r.checkpoint_id
+                RETURNING c.thread_id, c.checkpoint_ns, c.checkpoint_id,
+                          c.checkpoint -> 'channel_versions' AS versions
+            ), stale_writes AS (
+                DELETE FROM checkpoint_writes w USING stale s
+                WHERE w.thread_id = s.thread_id
+                  AND w.checkpoint_ns = s.checkpoint_ns
+                  AND w.checkpoint_id = s.checkpoint_id
+            )
+            SELECT (SELECT count(*) FROM stale), s.thread_id, s.checkpoint_ns, v.key, v.value
+            FROM stale s LEFT JOIN LATERAL jsonb_each_text(s.versions) AS v ON true
+        """
+
+        # 삭제된 체크포인트가 참조하던 채널 값 중 남은 체크포인트가 참조하지 않는 것만 삭제
+        # (저장 중인 실행의 새 채널 값은 아직 체크포인트가 없어도 지우지 않음)
+        DELETE_FREED_BLOBS_SQL = """
+            DELETE FROM checkpoint_blobs b
+            USING unnest(%s::text[], %s::text[], %s::text[], %s::text[])
+                AS f(thread_id, checkpoint_ns, channel, version)
+            WHERE b.thread_id = f.thread_id
+              AND b.checkpoint_ns = f.checkpoint_ns
+              AND b.channel = f.channel
+              AND b.version = f.version
+              AND NOT EXISTS (
+                  SELECT 1 FROM checkpoints c
+                  WHERE c.thread_id = b.thread_id
+                    AND c.checkpoint_ns = b.checkpoint_ns
+                    AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+              )
+        """
+
+        def __init__(self, conn, *, max_threads: int, thread_ttl: float, max_checkpoints_per_thread: int):
+            super().__init__(conn)
+            self.max_threads = max_threads
+            self.thread_ttl = thread_ttl
+            self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+            self.evicted_threads = 0
+            self.pruned_checkpoints = 0
+
+        async def _trim_history(self, thread_ids) -> None:
+            """오래된 체크포인트와 그 쓰기 기록, 더 이상 참조되지 않는 채널 값을 삭제합니다."""
+            async with self.conn.connection() as conn:
+                async with conn.transaction():
+                    cur = await conn.execute(self.TRIM_HISTORY_SQL, (list(thread_ids), self.max_checkpoints_per_thread))
+                    rows = await cur.fetchall()
+                    if not rows:
+                        return
+                    self.pruned_checkpoints += rows[0][0]
+                    freed = {row[1:] for row in rows if row[3] is not None}
+                    if freed:
+                        await conn.execute(self.DELETE_FREED_BLOBS_SQL, tuple(map(list, zip(*freed))))
+
+        async def maintain(self) -> None:
+            async with self.conn.connection() as conn:
+                cur = await conn.execute(
+                    """
+                    SELECT thread_id, max((checkpoint->>'ts')::timestamptz) AS last_ts, count(*) AS n
+                    FROM checkpoints GROUP BY thread_id ORDER BY last_ts DESC
+                    """
+                )
+                rows = await cur.fetchall()
+
+            now = time.time()
+            expired = [
+                thread_id for i, (thread_id, last_ts, _) in enumerate(rows)
+                if i >= self.max_threads or now - last_ts.timestamp() > self.thread_ttl
+            ]
+            if expired:
+                await self.aprune(expired, strategy="delete")
+                self.evicted_threads += len(expired)
+
+            expired_set = set(expired)
+            long_threads = [
+                thread_id for thread_id, _, n in rows
+                if thread_id not in expired_set and n > self.max_checkpoints_per_thread
+            ]
+            if long_threads:
+                await self._trim_history(long_threads)
+
+        async def astats(self) -> Dict[str, Any]:
+            async with self.conn.connection() as conn:
+                cur = await conn.execute(
+                    """
+                    SELECT count(DISTINCT thread_id), count(*),
+                           pg_total_relation_size('checkpoints')
+                           + pg_total_relation_size('checkpoint_blobs')
+                           + pg_total_relation_size('checkpoint_writes')
+                    FROM checkpoints
+                    """
+                )
+                threads, checkpoints, size = await cur.fetchone()
+            return {
+                "backend": "postgres",
+                "threads": threads,
+                "checkpoints": checkpoints,
+                "approx_bytes": size,
+                "evicted_threads": self.evicted_threads,
+                "pruned_checkpoints": self.pruned_checkpoints,
+                "max_threads": self.max_threads,
+                "thread_ttl": self.thread_ttl,
+            }
+
+    pool = AsyncConnectionPool(
+        database_url,
+        open=False,
+        kwargs={"autocommit": True, "prepare_threshold": 0},
+    )
+    return BoundedPostgresSaver(
+        pool,
+        max_threads=settings.checkpoint_max_threads,
+        thread_ttl=settings.checkpoint_thread_ttl,
+        max_checkpoints_per_thread=settings.checkpoint_history_per_thread,
+    )
+
+# ========== 팩토리 / 수명 주기 ==========
+
+def create_checkpointer():
+    """설정(CHECKPOINTER_BACKEND)에 맞는 체크포인터를 생성합니다."""
+    if settings.checkpointer_backend == "postgres":
+        if not settings.database_url:
+            raise ValueError("checkpointer_backend=postgres 에는 DATABASE_URL/POSTGRES_URL 설정이 필요합니다.")
+        return create_postgres_saver(settings.database_url)
+    return BoundedMemorySaver(
+        max_threads=settings.checkpoint_max_threads,
+        thread_ttl=settings.checkpoint_thread_ttl,
+        max_checkpoints_per_thread=settings.checkpoint_history_per_thread,
+    )
+
+
+async def setup_checkpointer(checkpointer) -> None:
+    """앱 시작 시 Postgres 커넥션 풀을 열고 체크포인트 테이블을 준비합니다."""
+    pool = getattr(checkpointer, "conn", None)
+    if pool is not None and hasattr(pool, "open"):
+        await pool.open()
+        await checkpointer.setup()
+        logger.info("[checkpointer] Postgres 체크포인터 준비 완료")
+
+
+async def close_checkpointer(checkpointer) -> None:
+    pool = getattr(checkpointer, "conn", None)
+    if pool is not None and hasattr(pool, "close"):
+        await pool.close()
+
+
+async def run_checkpointer_maintenance(checkpointer, interval: float) -> None:
+    """만료 스레드 삭제와 체크포인트 정리를 주기적으로 수행합니다 (백그라운드 태스크)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await checkpointer.maintain()
+            stats = await checkpointer_stats(checkpointer)
+            logger.info(
+                f"[checkpointer] 정리 완료 - 스레드: {stats['threads']}, 체크포인트: {stats['checkpoints']}, "
+                f"크기: {stats['approx_bytes']}B, RSS: {stats['process_rss_bytes']}B"
+            )
+        except Exception as e:
+            logger.warning(f"[checkpointer] 정리 실패: {str(e)}")
+
+
+def current_rss_bytes() -> Optional[int]:
+    """현재 프로세스의 RSS (Linux /proc 기준, 그 외 환경에서는 최대 RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return None
+
+
+async def checkpointer_stats(checkpointer) -> Dict[str, Any]:
+    """체크포인터 사용량과 프로세스 RSS"""
+    if checkpointer is None:
+        stats: Dict[str, Any] = {"backend": "platform"}
+    elif hasattr(checkpointer, "astats"):
+        stats = await checkpointer.astats()
+    else:
+        stats = checkpointer.stats()
+    stats["process_rss_bytes"] = current_rss_bytes()
+    return stats
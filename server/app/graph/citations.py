@@ -0,0 +1,86 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# ========== 출처 링크 복원 ==========
+
+class CitationRewriter:
+    """리포트의 단축 URL(`short_url`)을 원본 URL(`value`)로 바꾸는 재작성기.
+
+    실행마다 `sources_gathered` 로 한 번 만들고, 모든 단축 URL을 하나의 정규식
+    (긴 것부터의 alternation)으로 컴파일해 리포트를 한 번만 훑어 교체합니다.
+
+    - `rewrite(text)`: 완성된 리포트 전체를 교체
+    - `feed(chunk)` / `flush()`: 스트리밍 토큰을 순서대로 넣으면, 청크 경계에 걸친
+      단축 URL 앞부분은 다음 청크가 올 때까지 보류했다가 교체한 뒤 내보냅니다.
+    """
+
+    def __init__(self, sources: Optional[Iterable[Dict[str, Any]]]):
+        self.sources: List[Dict[str, Any]] = [s for s in (sources or []) if isinstance(s, dict)]
+        self._targets: Dict[str, str] = {}
+        for source in self.sources:
+            # 병합된 중복 출처의 단축 URL(aliases)도 같은 원본 URL로 교체
+            for short_url in (source.get("short_url"), *source.get("aliases", [])):
+                if short_url and short_url not in self._targets:
+                    self._targets[short_url] = source.get("value", short_url)
+
+        # "…/0-1" 과 "…/0-12" 처럼 한쪽이 다른 쪽의 앞부분이면 긴 쪽이 먼저 매칭되어야 함
+        keys = sorted(self._targets, key=len, reverse=True)
+        self._pattern = re.compile("|".join(map(re.escape, keys))) if keys else None
+        # 청크 끝에 걸린 부분 매칭 판별용 (단축 URL의 진짜 앞부분들)
+        self._prefixes: Set[str] = {key[:i] for key in keys for i in range(1, len(key))}
+        self._max_len = max(map(len, keys), default=0)
+
+        self._buffer = ""
+        self._used: Set[str] = set()
+
+    def _replace(self, match: "re.Match[str]") -> str:
+        self._used.add(match.group(0))
+        return self._targets[match.group(0)]
+
+    def rewrite(self, text: str) -> str:
+        """텍스트 전체의 단축 URL을 한 번에 교체합니다."""
+        if self._pattern is None or not text:
+            return text
+        return self._pattern.sub(self._replace, text)
+
+    def _hold_from(self, text: str) -> int:
+        """끝부분이 단축 URL의 앞부분일 수 있으면 그 시작 위치, 아니면 len(text)"""
+        for start in range(max(0, len(text) - self._max_len + 1), len(text)):
+            if text[start:] in self._prefixes:
+                return start
+        return len(text)
+
+    def feed(self, chunk: str) -> str:
+        """스트리밍 청크를 넣고, 교체가 끝나 내보내도 되는 부분을 반환합니다."""
+        if self._pattern is None:
+            return chunk
+
+        text = self._buffer + chunk
+        cut = self._hold_from(text)
+        output: List[str] = []
+        position = 0
+        for match in self._pattern.finditer(text):
+            if match.start() >= cut:
+                break
+            if match.end() > cut:
+                # 완성된 매칭이 보류 구간에 걸치면 매칭 시작부터 보류
+                cut = match.start()
+                break
+            output.append(text[position:match.start()])
+            output.append(self._replace(match))
+            position = match.end()
+        output.append(text[position:cut])
+        self._buffer = text[cut:]
+        return "".join(output)
+
+    def flush(self) -> str:
+        """보류 중인 나머지 텍스트를 교체해 반환합니다 (스트림 종료 시 호출)."""
+        text, self._buffer = self._buffer, ""
+        return self.rewrite(text)
+
+    def used_sources(self) -> List[Dict[str, Any]]:
+        """지금까지 교체한 단축 URL에 해당하는 출처 (sources_gathered 순서)"""
+        return [
+            s for s in self.sources
+            if s.get("short_url") in self._used or not self._used.isdisjoint(s.get("aliases", []))
+        ]
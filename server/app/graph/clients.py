@@ -0,0 +1,171 @@
+import os
+import asyncio
+import logging
+import threading
+import weakref
+from collections import Counter
+from typing import Any, Dict, Hashable, Optional
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+from google import genai as google_genai
+
+logger = logging.getLogger(__name__)
+
+# ========== 노드별 LLM 설정 ==========
+
+# (temperature, 재시도 정책). 모델은 요청별 ProductRecommendationConfig 에서 정해집니다.
+NODE_LLM_PARAMS: Dict[str, Dict[str, Any]] = {
+    "validate_request": {"temperature": 0.1, "max_retries": 2, "retry_delay": 2},
+    "generate_search_queries": {"temperature": 0.7, "max_retries": 2},
+    # 검증 판단은 안정적으로, 검색어는 다양하게 나오도록 두 노드의 중간값
+    "validate_and_generate_queries": {"temperature": 0.3, "max_retries": 2, "retry_delay": 2},
+    "reflection": {"temperature": 0.1, "max_retries": 2},
+    "answer_generation": {"temperature": 0.1, "max_retries": 2},
+    "report_generation": {"temperature": 0.2, "max_retries": 2},
+    "summarize_conversation": {"temperature": 0.1, "max_retries": 1},
+    "extract_products": {"temperature": 0.0, "max_retries": 1},
+}
+
+# ========== 클라이언트 레지스트리 ==========
+
+class ClientRegistry:
+    """LLM / genai 클라이언트를 프로세스 전역에서 재사용하는 레지스트리.
+
+    노드 호출마다 클라이언트를 새로 만들면 TLS 핸드셰이크와 객체 생성이 반복되므로,
+    (model, temperature, 재시도 정책) 별로 한 번만 만들고 HTTP 커넥션 풀을 공유합니다.
+
+    비동기 HTTP 커넥션은 이벤트 루프에 묶이므로 실행 중인 루프마다 따로 보관합니다.
+    서버에서는 uvicorn 루프 하나를 계속 사용하므로 모든 요청이 같은 클라이언트를 씁니다.
+    """
+
+    def __init__(self):
+        self._loop_scopes: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, Any]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._sync_scope: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self.created: Counter = Counter()
+        self.reused: Counter = Counter()
+
+    def _scope(self) -> Dict[Hashable, Any]:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._sync_scope
+        scope = self._loop_scopes.get(loop)
+        if scope is None:
+            scope = self._loop_scopes.setdefault(loop, {})
+        return scope
+
+    def _get_or_create(self, key: Hashable, label: str, factory) -> Any:
+        with self._lock:
+            scope = self._scope()
+            client = scope.get(key)
+            if client is None:
+                client = factory()
+                scope[key] = client
+                self.created[label] += 1
+            else:
+                self.reused[label] += 1
+            return client
+
+    def chat_model(
+        self,
+        model: str,
+        temperature: float,
+        max_retries: int = 2,
+        retry_delay: Optional[float] = None,
+    ) -> ChatGoogleGenerativeAI:
+        """(model, temperature, 재시도 정책) 별로 공유되는 ChatGoogleGenerativeAI 를 반환합니다."""
+        key = ("chat", model, temperature, max_retries, retry_delay)
+        label = f"chat:{model}:t={temperature}:r={max_retries}"
+
+        def factory() -> ChatGoogleGenerativeAI:
+            kwargs: Dict[str, Any] = {}
+            if retry_delay is not None:
+                kwargs["retry_delay"] = retry_delay
+            return ChatGoogleGenerativeAI(
+                model=model,
+                temperature=temperature,
+                max_retries=max_retries,
+                api_key=os.getenv("GEMINI_API_KEY"),
+                **kwargs,
+            )
+
+        return self._get_or_create(key, label, factory)
+
+    def genai_client(self) -> google_genai.Client:
+        """google_search grounding 등 genai SDK 직접 호출용 공유 클라이언트를 반환합니다."""
+        return self._get_or_create(("genai",), "genai", google_genai.Client)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._loop_scopes.clear()
+            self._sync_scope.clear()
+            self.created.clear()
+            self.reused.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """클라이언트별 생성/재사용 횟수와 재사용률"""
+        labels = sorted(set(self.created) | set(self.reused))
+        total_created = sum(self.created.values())
+        total_reused = sum(self.reused.values())
+        total = total_created + total_reused
+        return {
+            "clients": {
+                label: {"created": self.created[label], "reused": self.reused[label]}
+                for label in labels
+            },
+            "created": total_created,
+            "reused": total_reused,
+            "reuse_rate": round(total_reused / total, 4) if total else 0.0,
+        }
+
+
+registry = ClientRegistry()
+
+
+def get_chat_model(
+    model: str,
+    temperature: float,
+    max_retries: int = 2,
+    retry_delay: Optional[float] = None,
+) -> ChatGoogleGenerativeAI:
+    return registry.chat_model(model, temperature, max_retries, retry_delay)
+
+
+def get_node_chat_model(node: str, model: str) -> ChatGoogleGenerativeAI:
+    """노드별 temperature / 재시도 정책(NODE_LLM_PARAMS)이 적용된 공유 LLM을 반환합니다."""
+    return registry.chat_model(model, **NODE_LLM_PARAMS[node])
+
+
+def get_genai_client() -> google_genai.Client:
+    return registry.genai_client()
+
+
+async def warmup_clients(node_models: Dict[str, str], timeout: float = 5.0) -> None:
+    """앱 시작 시 노드별 클라이언트를 미리 만들고 커넥션을 열어 둡니다.
+
+    커넥션은 모델 메타데이터 조회(토큰 과금 없음)로 엽니다. 실패해도 서버 시작은
+    막지 않으며, 첫 요청에서 다시 연결합니다.
+
+    Parameters
+    ----------
+    node_models : Dict[str, str]
+        노드 이름 -> 사용할 모델 이름 (예: {"validate_request": "gemini-2.5-flash"}).
+    """
+    genai_clients = [get_genai_client()]
+    for node, model in node_models.items():
+        if node in NODE_LLM_PARAMS:
+            genai_clients.append(get_node_chat_model(node, model).client)
+
+    warm_model = next(iter(node_models.values()), "gemini-2.0-flash")
+
+    async def _open(client) -> None:
+        await asyncio.wait_for(client.aio.models.get(model=warm_model), timeout=timeout)
+
+    results = await asyncio.gather(*(_open(c) for c in genai_clients), return_exceptions=True)
+    failed = [r for r in results if isinstance(r, Exception)]
+    if failed:
+        logger.warning(f"[warmup_clients] 커넥션 예열 실패 {len(failed)}/{len(results)}개: {failed[0]}")
+    logger.info(f"[warmup_clients] 클라이언트 예열 완료 - {registry.stats()['created']}개 생성")
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 from langchain_core.runnables import RunnableConfig
 
@@ -16,7 +16,35 @@ class ProductRecommendationConfig(BaseModel):
     required_search_results: int = Field(default=3, description="필요한 최소 검색 결과 수 (빠른 3개 사용)")
     max_products_per_query: int = Field(default=5, description="검색어당 최대 제품 수")
     max_candidate_products: int = Field(default=10, description="최대 후보 제품 수")
+    use_product_extraction: bool = Field(default=True, description="검색 결과마다 제품 목록을 추출해 리포트에 제품 표로 전달할지 여부 (false 면 검색 결과 원문 전달)")
     search_timeout: int = Field(default=25, description="개별 검색 타임아웃 (초)")
+    use_search_hedging: bool = Field(default=False, description="느린 검색에 p90 지연 후 중복 요청을 보낼지 여부")
+    validation_mode: Literal["separate", "combined"] = Field(
+        default="separate",
+        description="separate: 검증 후 검색어 생성 (LLM 2회), combined: 검증과 검색어 생성을 한 번의 호출로 수행",
+    )
+    use_fast_classifier: bool = Field(default=False, description="확신할 수 있는 요청은 LLM 대신 로컬 분류기로 검증할지 여부")
+    fast_classifier_threshold: float = Field(default=0.85, description="로컬 분류 결과를 그대로 사용할 최소 신뢰도")
+    use_speculative_queries: bool = Field(default=False, description="요청 검증과 동시에 검색어 생성을 미리 시작할지 여부")
+    speculative_search_count: int = Field(default=0, description="추측 실행 시 검색어 생성 직후 미리 시작할 검색 수 (0 이면 검색어 생성만)")
+    
+    # 컨텍스트 예산 설정
+    reflection_context_tokens: int = Field(default=6000, description="reflection 프롬프트의 검색 결과 토큰 예산 (0 이면 제한 없음)")
+    report_context_tokens: int = Field(default=12000, description="report_generation 프롬프트의 검색 결과 토큰 예산 (0 이면 제한 없음)")
+    
+    # 대화 맥락 설정
+    use_conversation_summary: bool = Field(default=True, description="오래된 대화를 LLM으로 누적 요약할지 여부 (false 면 사용자 메시지를 잘라 붙임)")
+    conversation_recent_messages: int = Field(default=4, description="요약하지 않고 그대로 전달할 최근 사용자 메시지 수")
+    conversation_context_tokens: int = Field(default=1500, description="노드 프롬프트에 넣는 대화 맥락(요약 + 최근 메시지) 토큰 상한 (0 이면 제한 없음)")
+    archive_context_turns: int = Field(default=2, description="리포트 프롬프트에 넣을 관련 이전 턴 요약 최대 수 (0 이면 사용 안 함)")
+    
+    # 캐시 설정
+    use_answer_cache: bool = Field(default=True, description="검증된 요구사항 기준 응답 캐시 사용 여부")
+    use_search_cache: bool = Field(default=True, description="검색어 기준 웹 검색 결과 캐시 사용 여부")
+    use_product_kb: bool = Field(default=False, description="검색 전에 제품 지식 베이스(저장된 추출 제품)를 조회하고, 리포트 후 후보 제품을 저장할지 여부")
+    product_kb_min_products: int = Field(default=5, description="웹 검색 없이 리포트를 만들 최소 지식 베이스 제품 수 (부족하면 나머지만 검색)")
+    product_kb_max_age: int = Field(default=3 * 24 * 60 * 60, description="리포트에 사용할 지식 베이스 제품의 최대 경과 시간 (초)")
+    search_batch_id: Optional[str] = Field(default=None, description="배치 실행 ID (배치 안에서 같은 검색어는 한 번만 검색)")
     
     @classmethod
     def from_runnable_config(cls, config: Optional[RunnableConfig] = None) -> "ProductRecommendationConfig":
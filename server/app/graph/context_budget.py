@@ -0,0 +1,138 @@
+import re
+import logging
+from typing import Any, Dict, List, Sequence
+
+from .utils import SHORT_URL_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# 결과를 잘라서라도 넣을 최소 토큰 수. 이보다 적게 남으면 해당 결과는 제외합니다.
+MIN_TRIMMED_TOKENS = 200
+
+# 결과 사이 구분자 (quickstart 패턴)
+RESULT_SEPARATOR = "\n---\n"
+
+# ========== 토큰 수 추정 ==========
+
+def count_tokens(text: str) -> int:
+    """텍스트의 토큰 수를 추정합니다 (한국어 기준 약 2자당 1토큰)."""
+    return (len(text) + 1) // 2
+
+
+def _terms(text: str) -> set:
+    """관련도 계산용 단어 집합. 한국어는 조사가 붙으므로 2글자 단위(bigram)로 비교합니다."""
+    terms = set()
+    for word in re.findall(r"\w+", text.lower()):
+        if len(word) < 2:
+            continue
+        terms.add(word)
+        terms.update(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+# ========== 검색 결과 순위 ==========
+
+def is_failed_result(text: str) -> bool:
+    """web_search 노드가 실패 시 남기는 결과 ("검색 오류: ...", "검색 실패: ...")"""
+    return not text or text.startswith(("검색 오류:", "검색 실패:"))
+
+
+def score_result(text: str, query_terms: set) -> Dict[str, float]:
+    """검색 결과 하나의 관련도(질의 단어 포함 비율)와 인용 밀도(1천 토큰당 출처 수)"""
+    if is_failed_result(text):
+        return {"relevance": 0.0, "citation_density": 0.0, "score": 0.0}
+
+    relevance = len(query_terms & _terms(text)) / len(query_terms) if query_terms else 0.0
+    citation_density = text.count(SHORT_URL_PREFIX) * 1000 / max(count_tokens(text), 1)
+    # 출처가 많은 결과일수록 리포트에서 인용할 수 있는 근거가 많음 (1천 토큰당 5개에서 포화)
+    score = relevance + 0.5 * min(citation_density / 5, 1.0)
+    return {
+        "relevance": round(relevance, 3),
+        "citation_density": round(citation_density, 2),
+        "score": round(score, 3),
+    }
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """문단/줄/문장 경계에서 잘라 max_tokens 이하로 만듭니다 (출처 링크 중간에서 자르지 않음)."""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    limit = max_tokens * 2
+    head = text[:limit]
+    for boundary in ("\n\n", "\n", ". ", "다. "):
+        cut = head.rfind(boundary)
+        if cut >= limit // 2:
+            return head[:cut + len(boundary)].rstrip()
+
+    # 경계를 못 찾으면 그대로 자르되, 닫히지 않은 출처 링크는 제거
+    link = head.rfind("[")
+    if link > head.rfind(")"):
+        head = head[:link]
+    return head.rstrip()
+
+# ========== 컨텍스트 예산 ==========
+
+def fit_research_results(
+    results: Sequence[str],
+    query_texts: Sequence[str],
+    budget_tokens: int,
+    node: str,
+    separator: str = RESULT_SEPARATOR,
+) -> str:
+    """검색 결과를 관련도·인용 밀도 순으로 골라 토큰 예산 안에 들어가는 문자열로 합칩니다.
+
+    - 점수가 높은 결과부터 넣고, 남은 예산보다 큰 결과는 경계에서 잘라 넣습니다.
+    - 남은 예산이 `MIN_TRIMMED_TOKENS` 보다 작으면 나머지 결과는 제외합니다.
+    - 선택된 결과는 원래 순서를 유지하고, 잘리거나 제외된 결과는 로그로 남깁니다.
+    - budget_tokens <= 0 이면 예산 없이 모두 합칩니다.
+    """
+    if budget_tokens <= 0:
+        return separator.join(results)
+
+    plan = plan_context(results, query_texts, budget_tokens, separator)
+    kept = [entry["text"] for entry in sorted(plan, key=lambda e: e["index"]) if entry["action"] != "dropped"]
+
+    total = count_tokens(separator.join(results))
+    used = count_tokens(separator.join(kept))
+    request_tokens = count_tokens("\n".join(query_texts))
+    summary = f"[{node}] 컨텍스트 예산 {budget_tokens} 토큰 - 요청·검색어 {request_tokens} 토큰, 검색 결과 {total} → {used} 토큰"
+    cut = [entry for entry in plan if entry["action"] != "kept"]
+    if cut:
+        details = ", ".join(
+            f"#{e['index']} {e['action']}({e['tokens']}→{e['kept_tokens']} tok, score={e['score']})" for e in cut
+        )
+        logger.info(f"{summary} ({details})")
+    else:
+        logger.info(summary)
+    return separator.join(kept)
+
+
+def plan_context(
+    results: Sequence[str],
+    query_texts: Sequence[str],
+    budget_tokens: int,
+    separator: str = RESULT_SEPARATOR,
+) -> List[Dict[str, Any]]:
+    """결과별로 kept / trimmed / dropped 를 결정합니다 (index 는 원래 순서)."""
+    query_terms = _terms(" ".join(query_texts))
+    separator_tokens = count_tokens(separator)
+
+    entries = []
+    for index, text in enumerate(results):
+        entries.append({"index": index, "text": text, "tokens": count_tokens(text), **score_result(text, query_terms)})
+
+    remaining = budget_tokens
+    for entry in sorted(entries, key=lambda e: (-e["score"], e["index"])):
+        available = remaining - (separator_tokens if remaining < budget_tokens else 0)
+        if is_failed_result(entry["text"]) or available < min(entry["tokens"], MIN_TRIMMED_TOKENS):
+            entry.update(action="dropped", text="", kept_tokens=0)
+            continue
+        if entry["tokens"] > available:
+            entry["text"] = trim_to_tokens(entry["text"], available)
+            entry["action"] = "trimmed"
+        else:
+            entry["action"] = "kept"
+        entry["kept_tokens"] = count_tokens(entry["text"])
+        remaining = available - entry["kept_tokens"]
+    return entries
+
@@ -0,0 +1,108 @@
+from typing import Any, List, Optional, Tuple
+
+from .context_budget import count_tokens, trim_to_tokens
+
+# 요약에 넣을 AI 메시지 최대 토큰 (리포트 본문은 turn_archive 에 따로 보관되므로 앞부분만)
+AI_MESSAGE_TOKENS = 80
+
+# ========== 메시지 분류 ==========
+
+def _message_type(message: Any) -> Optional[str]:
+    if isinstance(message, dict):
+        return message.get("type") or {"user": "human", "assistant": "ai"}.get(message.get("role"))
+    return getattr(message, "type", None)
+
+
+def _message_content(message: Any) -> str:
+    content = message.get("content", "") if isinstance(message, dict) else getattr(message, "content", "")
+    return content if isinstance(content, str) else str(content)
+
+# ========== 요약 대상 ==========
+
+def summary_cutoff(messages: List[Any], keep_recent: int) -> int:
+    """최근 사용자 메시지 keep_recent 개가 시작되는 위치. 이 앞의 메시지가 요약 대상입니다."""
+    seen = 0
+    for index in range(len(messages) - 1, -1, -1):
+        if _message_type(messages[index]) == "human":
+            seen += 1
+            if seen >= keep_recent:
+                return index
+    return 0
+
+
+def messages_to_fold(messages: List[Any], summarized_count: int, keep_recent: int) -> Tuple[List[Any], int]:
+    """아직 요약에 반영되지 않은 오래된 메시지와 새 summarized_count 를 반환합니다."""
+    cutoff = max(summary_cutoff(messages, max(keep_recent, 1)), summarized_count)
+    return messages[summarized_count:cutoff], cutoff
+
+
+def render_messages(messages: List[Any]) -> str:
+    """요약 프롬프트용 대화 텍스트 ("사용자: ..." / "AI: ...")"""
+    lines = []
+    for message in messages:
+        kind = _message_type(message)
+        content = _message_content(message).strip()
+        if not content:
+            continue
+        if kind == "human":
+            lines.append(f"사용자: {content}")
+        elif kind == "ai":
+            lines.append(f"AI: {trim_to_tokens(content, AI_MESSAGE_TOKENS)}")
+    return "\n".join(lines)
+
+
+def fold_without_llm(previous_summary: str, messages: List[Any], max_tokens: int) -> str:
+    """LLM 요약에 실패했을 때의 대체 요약: 이전 요약 뒤에 사용자 메시지를 붙이고 뒤쪽을 남깁니다."""
+    requests = [_message_content(m).strip() for m in messages if _message_type(m) == "human"]
+    text = "\n".join(part for part in [previous_summary, *requests] if part)
+    if count_tokens(text) <= max_tokens:
+        return text
+    # 오래된 내용부터 버림 (최근 요구사항이 더 중요)
+    return text[-max_tokens * 2:].lstrip()
+
+# ========== 노드 입력 컨텍스트 ==========
+
+def build_conversation_context(
+    messages: List[Any],
+    summary: str,
+    summarized_count: int,
+    keep_recent: int,
+    max_tokens: int,
+) -> str:
+    """노드 프롬프트에 넣을 대화 맥락: 누적 요약 + 최근 사용자 메시지 (max_tokens 이하).
+
+    - 요약이 없으면 기존 `get_recent_user_messages` 와 같이 사용자 메시지만 줄바꿈으로 합칩니다.
+    - 메시지 목록은 끝에서부터 최근 keep_recent 개 사용자 메시지까지만 훑습니다.
+    - 토큰 상한을 넘으면 요약을 먼저 줄이고, 그래도 넘으면 오래된 최근 메시지부터 뺍니다.
+      가장 최근 메시지는 항상 포함합니다.
+    """
+    recent: List[str] = []
+    for index in range(len(messages) - 1, -1, -1):
+        if index < summarized_count or len(recent) >= max(keep_recent, 1):
+            break
+        if _message_type(messages[index]) == "human":
+            recent.append(_message_content(messages[index]))
+    recent.reverse()
+
+    if max_tokens <= 0:
+        return "\n".join(part for part in [summary, *recent] if part)
+
+    # 최근 메시지는 최신 것부터 상한 안에서 채움
+    kept: List[str] = []
+    used = 0
+    for text in reversed(recent):
+        tokens = count_tokens(text) + 1
+        if kept and used + tokens > max_tokens:
+            break
+        kept.insert(0, text if kept or tokens <= max_tokens else trim_to_tokens(text, max_tokens))
+        used += min(tokens, max_tokens)
+
+    recent_text = "\n".join(kept)
+    if not summary:
+        return recent_text
+
+    label = "이전 대화 요약: "
+    summary_budget = max_tokens - used - count_tokens(label)
+    if summary_budget < 50:
+        return recent_text
+    return f"{label}{trim_to_tokens(summary, summary_budget)}\n{recent_text}"
@@ -0,0 +1,61 @@
+import math
+import re
+import zlib
+from typing import List
+
+# ========== 텍스트 임베딩 ==========
+
+class HashingEmbedder:
+    """문자 n-gram 해싱 기반의 로컬 임베딩.
+
+    네트워크 호출 없이 결정적으로 동작하므로 캐시 키 유사도 비교와 테스트에 사용합니다.
+    한국어처럼 띄어쓰기가 흔들리는 짧은 요구사항 문자열에서도 부분 일치를 잘 잡아냅니다.
+    """
+
+    def __init__(self, dimension: int = 256, ngram_range: tuple = (2, 3)):
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+
+    def embed(self, text: str) -> List[float]:
+        normalized = re.sub(r"\s+", "", text.lower())
+        vector = [0.0] * self.dimension
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            for i in range(max(len(normalized) - n + 1, 0)):
+                h = zlib.crc32(normalized[i:i + n].encode("utf-8"))
+                vector[h % self.dimension] += 1.0 if (h >> 16) & 1 else -1.0
+        return normalize(vector)
+
+    async def aembed(self, text: str) -> List[float]:
+        return self.embed(text)
+
+
+class GeminiEmbedder:
+    """Gemini 임베딩 API(`text-embedding-004` 등)를 사용하는 임베딩."""
+
+    def __init__(self, model: str = "text-embedding-004", dimension: int = 768):
+        self.model = model
+        self.dimension = dimension
+
+    async def aembed(self, text: str) -> List[float]:
+        from .clients import get_genai_client
+
+        client = get_genai_client()
+        response = await client.aio.models.embed_content(model=self.model, contents=text)
+        return normalize(list(response.embeddings[0].values))
+
+
+def create_embedder(model: str):
+    """설정값으로 임베딩 구현을 선택합니다. "hashing" 이면 로컬 임베딩을 사용합니다."""
+    if not model or model == "hashing":
+        return HashingEmbedder()
+    return GeminiEmbedder(model=model)
+
+
+def normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    """정규화된 두 벡터의 코사인 유사도"""
+    return sum(x * y for x, y in zip(a, b))
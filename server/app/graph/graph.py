@@ -1,36 +1,61 @@
 import os
+import math
+import time
+import uuid
+import asyncio
 import logging
 from dotenv import load_dotenv
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict
 
 # LangGraph 관련
 from langgraph.graph import StateGraph, START, END
-from langgraph.types import Send
-from langchain_core.runnables import RunnableConfig
+from langgraph.types import Overwrite, Send
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langchain_core.messages import AIMessage
 
 # LLM 관련
-from langchain_google_genai import ChatGoogleGenerativeAI
-from google import genai as google_genai
 from google.genai import types
 
 # 로컬 모듈 import
 from .prompts import (
     get_validation_prompt,
+    get_validation_with_queries_prompt,
     get_search_query_prompt,
     get_web_search_prompt,
     get_reflection_prompt,
     get_answer_prompt,
     get_report_prompt,
+    get_conversation_summary_prompt,
+    get_product_extraction_prompt,
     # get_answer_validation_prompt
 )
 from .state import (
     ProductRecommendationState,
-    get_recent_user_messages
+    get_latest_user_message
 )
 from .config import ProductRecommendationConfig
+from .answer_cache import get_answer_cache
+from .product_store import get_product_store, kb_candidates
+from .search_cache import get_search_cache, get_batch_search_cache
+from .clients import get_node_chat_model, get_genai_client
+from .checkpointer import create_checkpointer
+from .quorum import run_with_quorum
+from .hedging import get_search_hedger
+from .speculation import get_speculator
+from .request_classifier import get_request_classifier
+from .context_budget import count_tokens, fit_research_results, is_failed_result, trim_to_tokens
+from .citations import CitationRewriter
+from .sources import merge_sources
+from .products import products_from_extraction, rank_products, render_product_table
+from .turns import start_turn_update, relevant_turns
+from .conversation import build_conversation_context, fold_without_llm, messages_to_fold, render_messages
+from .rate_limit import ainvoke_llm, ainvoke_structured, rate_limited
+from app.core.metrics import observe_node
+from app.core.tracing import span
 from .tools_and_schemas import (
     ValidationResult,
+    ValidationWithQueriesResult,
+    ProductExtractionResult,
     SearchQueryResult,
     ReflectionResult,
     # AnswerValidationResult
@@ -47,38 +72,129 @@ if os.getenv("GEMINI_API_KEY") is None:
 
 # ========== 노드 구현 ==========
 
+# 0. 턴 시작 노드
+async def start_turn(state: ProductRecommendationState, config: RunnableConfig) -> dict:
+    """새 사용자 메시지로 턴을 시작합니다.
+
+    같은 thread_id 의 이전 턴 검색 결과·출처·검색어가 이번 턴 프롬프트와 체크포인트에
+    계속 쌓이지 않도록 비우고, 이전 턴은 요약만 `turn_archive` 에 남깁니다.
+    """
+    update = start_turn_update(state)
+    
+    # 최근 사용자 메시지 몇 개만 그대로 두고, 그 이전 대화는 턴마다 한 번 누적 요약에 반영
+    configurable = ProductRecommendationConfig.from_runnable_config(config)
+    to_fold, cutoff = messages_to_fold(
+        state["messages"], state.get("summarized_message_count", 0), configurable.conversation_recent_messages
+    )
+    if to_fold:
+        update["conversation_summary"] = await _fold_conversation(
+            state.get("conversation_summary", ""), to_fold, configurable
+        )
+        update["summarized_message_count"] = cutoff
+    return update
+
+async def _fold_conversation(previous_summary: str, messages: list, configurable: ProductRecommendationConfig) -> str:
+    """이전 요약에 오래된 메시지를 반영한 새 요약. LLM 요약이 꺼져 있거나 실패하면 잘라 붙입니다."""
+    max_tokens = configurable.conversation_context_tokens // 2 if configurable.conversation_context_tokens > 0 else 500
+    if configurable.use_conversation_summary:
+        llm = get_node_chat_model("summarize_conversation", configurable.validation_model)
+        prompt = get_conversation_summary_prompt(previous_summary, render_messages(messages), max_tokens * 2)
+        try:
+            result = await ainvoke_llm("summarize_conversation", configurable.validation_model, llm, prompt)
+            content = result.content.strip() if result and isinstance(result.content, str) else ""
+            if content:
+                logger.info(f"[start_turn] 대화 요약 갱신 - 메시지 {len(messages)}개 반영, {len(content)}자")
+                return trim_to_tokens(content, max_tokens)
+        except Exception as e:
+            logger.warning(f"[start_turn] 대화 요약 실패, 메시지를 잘라 붙입니다: {str(e)}")
+    return fold_without_llm(previous_summary, messages, max_tokens)
+
+def _conversation_context(state: ProductRecommendationState, configurable: ProductRecommendationConfig) -> str:
+    """노드 프롬프트용 대화 맥락 (누적 요약 + 최근 사용자 메시지, 토큰 상한 적용)"""
+    return build_conversation_context(
+        state["messages"],
+        state.get("conversation_summary", ""),
+        state.get("summarized_message_count", 0),
+        configurable.conversation_recent_messages,
+        configurable.conversation_context_tokens,
+    )
+
 # 1. 검증 노드
-def validate_request(state: ProductRecommendationState, config: RunnableConfig) -> dict:
+async def validate_request(state: ProductRecommendationState, config: RunnableConfig) -> dict:
     """사용자 요청의 구체성을 검증하고 필요시 구체화 질문을 생성합니다."""
     
     logger.info("[validate_request] 노드 시작")
     
     configurable = ProductRecommendationConfig.from_runnable_config(config)
     
-    # LLM 초기화
-    llm = ChatGoogleGenerativeAI(
-        model=configurable.validation_model,
-        temperature=0.1,
-        max_retries=5,  # 재시도 횟수 증가
-        retry_delay=2,  # 재시도 간격 추가
-        api_key=os.getenv("GEMINI_API_KEY")
-    )
-    
-    # 구조화된 출력을 위한 스키마 적용
-    structured_llm = llm.with_structured_output(ValidationResult)
+    # LLM (프로세스 전역 레지스트리에서 재사용, 재시도 2회 / 간격 2초)
+    llm = get_node_chat_model("validate_request", configurable.validation_model)
     
     # 전체 대화 맥락을 프롬프트에 전달하도록 최근 사용자 메시지들을 합칩니다.
-    user_message = get_recent_user_messages(state["messages"])  # full context
+    user_message = _conversation_context(state, configurable)  # 요약 + 최근 메시지
     logger.info(f"[validate_request] 사용자 메시지: {user_message[:100]}...")
     
+    # 로컬 분류기: 카테고리+예산/용도가 분명하거나 카테고리만 있는 요청은 LLM 호출 없이 판단
+    local = _classify_locally("validate_request", state, user_message, configurable)
+    if local is not None:
+        return _validation_update(local, None)
+    
     # 프롬프트 구성
     validation_prompt = get_validation_prompt(user_message)
     
-    # LLM 호출
-    result = structured_llm.invoke(validation_prompt)
+    # 추측 실행: 요청이 구체적일 것으로 보고 검색어 생성(과 앞쪽 검색)을 검증과 동시에 시작.
+    # 검증 결과를 모르므로 user_intent 없이 전체 대화 맥락만으로 검색어를 만듭니다.
+    speculation_id = None
+    if configurable.use_speculative_queries:
+        speculation_id = uuid.uuid4().hex
+        get_speculator().start(
+            speculation_id,
+            lambda: _generate_queries(user_message, "", configurable),
+            lambda query, search_id: _cached_search(query, search_id, configurable),
+            search_count=configurable.speculative_search_count,
+        )
+    
+    # 구조화된 출력으로 LLM 호출 (공유 Gemini 요청 제한기에서 순서를 기다림)
+    try:
+        result = await ainvoke_structured(
+            "validate_request", configurable.validation_model, llm, ValidationResult, validation_prompt
+        )
+    except BaseException:
+        get_speculator().discard(speculation_id, "error")
+        raise
     
     logger.info(f"[validate_request] 검증 완료 - 구체적 여부: {result.is_specific}")
     
+    # 구체화 질문으로 끝나면(refine) 추측 작업은 버림
+    if not result.is_specific:
+        get_speculator().discard(speculation_id, "refine")
+        speculation_id = None
+    
+    return _validation_update(result, speculation_id)
+
+
+def _classify_locally(
+    node: str, state: ProductRecommendationState, user_message: str, configurable: ProductRecommendationConfig
+) -> ValidationResult | None:
+    """use_fast_classifier 이고 로컬 분류기가 확신하면 검증 결과를, 아니면 None 을 반환합니다."""
+    if not configurable.use_fast_classifier:
+        return None
+    human_turns = sum(
+        1 for m in state["messages"]
+        if getattr(m, "type", None) == "human" or (isinstance(m, dict) and m.get("type") == "human")
+    )
+    decision = get_request_classifier().decide(
+        user_message, configurable.fast_classifier_threshold, multi_turn=human_turns > 1
+    )
+    if decision is None:
+        return None
+    logger.info(f"[{node}] 로컬 분류 - 구체적 여부: {decision.is_specific}, "
+                f"신뢰도: {decision.confidence}, 근거: {decision.reason}")
+    return decision.to_validation_result()
+
+
+def _validation_update(result: ValidationResult, speculation_id: str | None) -> dict:
+    """검증 결과(LLM 또는 로컬 분류기)를 상태 업데이트로 변환합니다."""
     # 반려될 경우 AI 메시지를 state에 추가
     if not result.is_specific and result.clarification_question:
         ai_message = AIMessage(content=result.clarification_question)
@@ -86,56 +202,299 @@ def validate_request(state: ProductRecommendationState, config: RunnableConfig)
             "is_request_specific": result.is_specific,
             "response_to_user": result.clarification_question,
             "user_intent": result.extracted_requirements.get("intent", ""),
+            "extracted_requirements": result.extracted_requirements,
+            "answer_cache_hit": False,
+            "speculation_id": speculation_id,
             "messages": [ai_message]  # AIMessage 객체만 저장
         }
     else:
         return {
             "is_request_specific": result.is_specific,
             "response_to_user": result.clarification_question if not result.is_specific else "",
-            "user_intent": result.extracted_requirements.get("intent", "")
+            "user_intent": result.extracted_requirements.get("intent", ""),
+            "extracted_requirements": result.extracted_requirements,
+            "answer_cache_hit": False,
+            "speculation_id": speculation_id,
         }
 
-# 2. 검색어 생성 노드
-def generate_search_queries(state: ProductRecommendationState, config: RunnableConfig) -> dict:
-    """구체화된 요청을 바탕으로 효과적인 검색어들을 생성합니다."""
+# 1-2. 검증 + 검색어 생성 결합 노드
+async def validate_and_generate_queries(state: ProductRecommendationState, config: RunnableConfig) -> dict:
+    """요청 검증과 검색어 생성을 한 번의 LLM 호출로 수행합니다 (validation_mode=combined).
+
+    구체적인 요청이면 generate_search_queries 를 거치지 않고 바로 웹 검색으로 진행하므로
+    LLM 왕복이 한 번 줄어듭니다.
+    """
     
-    logger.info("[generate_search_queries] 노드 시작")
+    logger.info("[validate_and_generate_queries] 노드 시작")
+    
+    configurable = ProductRecommendationConfig.from_runnable_config(config)
+    user_message = _conversation_context(state, configurable)  # 요약 + 최근 메시지
+    
+    # 로컬 분류기가 구체적이라고 확신하면 검색어만 생성
+    local = _classify_locally("validate_and_generate_queries", state, user_message, configurable)
+    if local is not None:
+        update = _validation_update(local, None)
+        if local.is_specific:
+            update["search_queries"] = await _generate_queries(user_message, update["user_intent"], configurable)
+        return update
+    
+    llm = get_node_chat_model("validate_and_generate_queries", configurable.validation_model)
+    prompt = get_validation_with_queries_prompt(user_message, configurable.max_search_queries)
+    result = await ainvoke_structured(
+        "validate_and_generate_queries", configurable.validation_model, llm, ValidationWithQueriesResult, prompt
+    )
+    
+    logger.info(f"[validate_and_generate_queries] 검증 완료 - 구체적 여부: {result.is_specific}, 검색어: {len(result.queries)}개")
+    
+    update = _validation_update(result, None)
+    if result.is_specific:
+        queries = result.queries[:configurable.max_search_queries]
+        if not queries:
+            # 구체적이라고 판단했지만 검색어를 비워 둔 경우에만 별도로 생성
+            logger.warning("[validate_and_generate_queries] 검색어 없음 - 검색어를 따로 생성합니다.")
+            queries = await _generate_queries(user_message, update["user_intent"], configurable)
+        for i, query in enumerate(queries, 1):
+            logger.info(f"[validate_and_generate_queries] 검색어 {i}: {query}")
+        update["search_queries"] = queries
+    return update
+
+# 1-1. 응답 캐시 조회 노드
+async def lookup_answer_cache(state: ProductRecommendationState, config: RunnableConfig) -> dict:
+    """검증된 요구사항과 같은(또는 매우 유사한) 요청의 완성된 리포트가 캐시에 있으면 바로 반환합니다."""
+    
+    configurable = ProductRecommendationConfig.from_runnable_config(config)
+    if not configurable.use_answer_cache:
+        return {"answer_cache_hit": False}
+    
+    try:
+        cached = await get_answer_cache().lookup(state.get("extracted_requirements"))
+    except Exception as e:
+        # 캐시 장애가 추천 자체를 막지 않도록 검색 경로로 진행
+        logger.warning(f"[lookup_answer_cache] 캐시 조회 실패: {str(e)}")
+        return {"answer_cache_hit": False}
+    
+    if not cached:
+        logger.info("[lookup_answer_cache] 캐시 미적중")
+        return {"answer_cache_hit": False}
+    
+    logger.info(f"[lookup_answer_cache] 캐시 적중 - 키: {cached['requirements_key']}, 유사도: {cached['similarity']:.3f}")
+    get_speculator().discard(state.get("speculation_id"), "answer_cache_hit")
+    return {
+        "answer_cache_hit": True,
+        "messages": [AIMessage(content=cached["report"])],
+        "sources_gathered": cached["sources_gathered"],
+        "response_to_user": cached["report"],
+    }
+
+# 1-2. 제품 지식 베이스 조회 노드
+async def retrieve_products(state: ProductRecommendationState, config: RunnableConfig) -> dict:
+    """최근에 저장된 제품 중 요구사항에 맞는 제품을 찾아 후보 제품으로 넣습니다.
+
+    product_kb_min_products 개 이상이면 웹 검색 없이 리포트로, 부족하면 모자란 만큼만 검색합니다.
+    """
     
     configurable = ProductRecommendationConfig.from_runnable_config(config)
     
-    llm = ChatGoogleGenerativeAI(
-        model=configurable.search_model,
-        temperature=0.7,
-        max_retries=2,
-        api_key=os.getenv("GEMINI_API_KEY")
+    try:
+        entries = await get_product_store().retrieve(
+            state.get("extracted_requirements"),
+            state.get("user_intent", ""),
+            configurable.max_candidate_products,
+            configurable.product_kb_max_age,
+        )
+    except Exception as e:
+        # 저장소 장애가 추천 자체를 막지 않도록 검색 경로로 진행
+        logger.warning(f"[retrieve_products] 제품 조회 실패: {str(e)}")
+        return {"kb_product_count": 0}
+    
+    if not entries:
+        logger.info("[retrieve_products] 지식 베이스 제품 없음")
+        return {"kb_product_count": 0}
+    
+    products, sources = kb_candidates(entries)
+    enough = len(products) >= configurable.product_kb_min_products
+    logger.info(
+        f"[retrieve_products] 지식 베이스 제품 {len(products)}개 "
+        f"({'웹 검색 생략' if enough else f'검색어 {_search_query_budget(len(products), configurable)}개로 축소'})"
     )
+    update = {
+        "kb_product_count": len(products),
+        "candidate_products": products,
+        "sources_gathered": sources,
+    }
+    # 추측 실행 검색어는 지식 베이스 제품을 모르고 만든 것이므로, 부족한 경우에도 버리고
+    # generate_search_queries 가 이미 확보한 제품을 알려 주고 다시 생성하게 함
+    get_speculator().discard(state.get("speculation_id"), "product_kb_hit" if enough else "product_kb_partial")
+    if not enough and state.get("search_queries"):
+        # combined 모드에서 검증과 함께 생성된 검색어도 부족한 만큼만 사용
+        update["search_queries"] = Overwrite(state["search_queries"][:_search_query_budget(len(products), configurable)])
+    return update
+
+
+def _search_query_budget(kb_product_count: int, configurable: ProductRecommendationConfig) -> int:
+    """지식 베이스로 채운 비율만큼 줄인 검색어 수 (최소 1개)"""
+    if not kb_product_count:
+        return configurable.max_search_queries
+    missing = 1 - kb_product_count / max(configurable.product_kb_min_products, 1)
+    return max(1, math.ceil(configurable.max_search_queries * missing))
+
+# 2. 검색어 생성 노드
+async def _generate_queries(
+    user_message: str,
+    user_intent: str,
+    configurable: ProductRecommendationConfig,
+    max_queries: int | None = None,
+    known_products: str = "",
+) -> list:
+    llm = get_node_chat_model("generate_search_queries", configurable.search_model)
+    search_prompt = get_search_query_prompt(
+        user_message, user_intent, max_queries or configurable.max_search_queries, known_products
+    )
+    result = await ainvoke_structured(
+        "generate_search_queries", configurable.search_model, llm, SearchQueryResult, search_prompt
+    )
+    return result.queries
+
+
+async def generate_search_queries(state: ProductRecommendationState, config: RunnableConfig) -> dict:
+    """구체화된 요청을 바탕으로 효과적인 검색어들을 생성합니다."""
     
-    structured_llm = llm.with_structured_output(SearchQueryResult)
+    logger.info("[generate_search_queries] 노드 시작")
     
-    user_intent = state.get("user_intent", "")
-    user_message = get_recent_user_messages(state["messages"])  # full context
+    configurable = ProductRecommendationConfig.from_runnable_config(config)
     
-    search_prompt = get_search_query_prompt(user_message, user_intent, configurable.max_search_queries)
-    result = structured_llm.invoke(search_prompt)
+    budget = _search_query_budget(state.get("kb_product_count", 0), configurable)
     
-    logger.info(f"[generate_search_queries] 검색어 생성 완료 - {len(result.queries)}개 생성")
-    for i, query in enumerate(result.queries, 1):
+    # validate_request 와 동시에 미리 생성한 검색어가 있으면 사용
+    queries = await get_speculator().take_queries(state.get("speculation_id"))
+    if queries is not None:
+        logger.info("[generate_search_queries] 추측 실행으로 미리 생성된 검색어 사용")
+    else:
+        user_intent = state.get("user_intent", "")
+        user_message = _conversation_context(state, configurable)  # 요약 + 최근 메시지
+        # 지식 베이스에서 찾은 제품이 있으면 부족한 만큼만, 다른 제품을 찾는 검색어 생성
+        known_products = ""
+        if state.get("kb_product_count"):
+            known_products = ", ".join(p["name"] for p in state.get("candidate_products") or [])
+        queries = await _generate_queries(
+            user_message,
+            user_intent,
+            configurable,
+            budget,
+            known_products,
+        )
+    queries = queries[:budget]  # 지식 베이스로 채운 만큼 검색어 축소
+    
+    logger.info(f"[generate_search_queries] 검색어 생성 완료 - {len(queries)}개 생성")
+    for i, query in enumerate(queries, 1):
         logger.info(f"[generate_search_queries] 검색어 {i}: {query}")
     
-    return {"search_queries": result.queries}
+    return {"search_queries": queries}
 
 
-def continue_to_web_search(state: ProductRecommendationState):
-    """LangGraph의 Send 이벤트를 사용한 동적 병렬 검색"""
-    logger.info(f"[continue_to_web_search] 병렬 검색 시작 - {len(state['search_queries'])}개 검색어")
+def continue_to_web_search(state: ProductRecommendationState, config: RunnableConfig):
+    """LangGraph의 Send 이벤트를 사용한 동적 병렬 검색
+
+    같은 팬아웃의 브랜치들은 batch_id 로 묶여, required_search_results 개가 먼저
+    끝나면 나머지 브랜치는 기다리지 않습니다 (app/graph/quorum.py).
+    """
+    configurable = ProductRecommendationConfig.from_runnable_config(config)
+    queries = state["search_queries"]
+    batch_id = uuid.uuid4().hex
+    required = min(configurable.required_search_results, len(queries))
+    logger.info(f"[continue_to_web_search] 병렬 검색 시작 - {len(queries)}개 검색어 (정족수 {required}개)")
     return [
-        Send("web_search", {"search_query": query, "id": int(idx)})
-        for idx, query in enumerate(state["search_queries"])
+        Send("web_search", {
+            "search_query": query,
+            "id": int(idx),
+            "batch_id": batch_id,
+            "batch_size": len(queries),
+            "speculation_id": state.get("speculation_id"),
+        })
+        for idx, query in enumerate(queries)
     ]
 
 
 # 3. 웹 검색 노드
-def web_search(state: dict, config: RunnableConfig) -> dict:
+async def _grounded_search(query: str, model: str, search_id: int) -> dict:
+    """Gemini google_search grounding 으로 검색하고 출처 마커가 삽입된 결과를 반환합니다."""
+    
+    from .utils import resolve_urls, get_citations, insert_citation_markers
+    
+    client = get_genai_client()
+    
+    search_prompt = get_web_search_prompt(query)
+
+    async with rate_limited("web_search", model, search_prompt) as permit:
+        response = await client.aio.models.generate_content(
+            model=model,
+            contents=search_prompt,
+            config=types.GenerateContentConfig(
+                tools=[types.Tool(google_search=types.GoogleSearch())],
+                temperature=0.3
+            )
+        )
+        if response.usage_metadata:
+            permit.record_usage(
+                response.usage_metadata.prompt_token_count,
+                response.usage_metadata.candidates_token_count,
+            )
+
+    # 안전한 grounding_metadata 처리 (quickstart 패턴 참고)
+    if (response.candidates and 
+        len(response.candidates) > 0 and 
+        response.candidates[0].grounding_metadata and
+        response.candidates[0].grounding_metadata.grounding_chunks):
+        
+        resolved_urls = resolve_urls(response.candidates[0].grounding_metadata.grounding_chunks, search_id)
+        citations = get_citations(response, resolved_urls)
+        modified_text = insert_citation_markers(response.text, citations)
+        # 여러 인용 구간이 같은 출처를 가리키므로 검색 캐시에 넣기 전에 중복을 합침
+        sources_gathered = merge_sources([], [item for citation in citations for item in citation["segments"]])
+    else:
+        logger.warning(f"[web_search] ID: {search_id} - grounding_metadata가 없음")
+        modified_text = response.text if response.text else f"검색 실패: {query}"
+        sources_gathered = []
+
+    return {
+        "web_research_result": modified_text,
+        "sources_gathered": sources_gathered,
+    }
+
+async def _cached_search(query: str, search_id: int, configurable: ProductRecommendationConfig) -> dict:
+    """배치 캐시 → 검색 캐시 → 헤지 → grounded search + 제품 추출 순서로 검색합니다.
+
+    web_search 노드와 추측 실행 검색이 같은 경로를 써서 캐시·중복 제거를 함께 누립니다.
+    """
+    
+    async def grounded_search() -> dict:
+        return await _grounded_search(query, configurable.search_model, search_id)
+    
+    async def search() -> dict:
+        # 지연 시간은 항상 기록하고, use_search_hedging 이면 p90 초과 시 중복 요청
+        result = await get_search_hedger().run(
+            configurable.search_model, grounded_search, hedge=configurable.use_search_hedging
+        )
+        # 추출한 제품도 검색 결과와 함께 캐시되도록 여기서 추출
+        if configurable.use_product_extraction:
+            products = await _extract_products(query, result, configurable)
+            if products is not None:
+                result = {**result, "candidate_products": products}
+        return result
+    
+    async def cached_search() -> dict:
+        if configurable.use_search_cache:
+            # 같은 검색어는 캐시에서 재사용하고, 동시에 들어온 같은 검색어는 한 번만 호출
+            return await get_search_cache().get_or_search(query, configurable.search_model, search_id, search)
+        return await search()
+    
+    # 배치 실행 중이면 배치 전체에서 같은 검색어를 한 번만 검색
+    batch_cache = get_batch_search_cache(configurable.search_batch_id)
+    if batch_cache is not None:
+        return await batch_cache.get_or_search(query, configurable.search_model, search_id, cached_search)
+    return await cached_search()
+
+async def web_search(state: dict, config: RunnableConfig) -> dict:
     """Gemini API의 Google Search 기능을 사용하여 웹 검색을 수행하고 제품 후보를 추출합니다."""
     
     query = state["search_query"]
@@ -143,47 +502,48 @@ def web_search(state: dict, config: RunnableConfig) -> dict:
     logger.info(f"[web_search] 검색 시작 - ID: {search_id}, 쿼리: {query}")
     
     try:
-        from .utils import resolve_urls, get_citations, insert_citation_markers
-        
         configurable = ProductRecommendationConfig.from_runnable_config(config)
         
-        client = google_genai.Client()
+        async def batch_search() -> dict:
+            # 추측 실행으로 미리 시작한 같은 검색(같은 캐시 경로)이 있으면 그 결과를 기다림
+            speculative = get_speculator().take_search(state.get("speculation_id"), query)
+            if speculative is not None:
+                try:
+                    return await speculative
+                except Exception as e:
+                    logger.warning(f"[web_search] ID: {search_id} 추측 검색 실패, 다시 검색합니다: {str(e)}")
+            return await _cached_search(query, search_id, configurable)
         
-        search_prompt = get_web_search_prompt(query)
-
-        response = client.models.generate_content(
-            model=configurable.search_model,
-            contents=search_prompt,
-            config=types.GenerateContentConfig(
-                tools=[types.Tool(google_search=types.GoogleSearch())],
-                temperature=0.3
-            )
+        # 정족수(required_search_results)가 채워지거나 search_timeout 이 지나면 결과를 기다리지 않음
+        result = await run_with_quorum(
+            batch_search,
+            batch_id=state.get("batch_id"),
+            required=configurable.required_search_results,
+            total=state.get("batch_size", 1),
+            timeout=configurable.search_timeout,
         )
-
-        # 안전한 grounding_metadata 처리 (quickstart 패턴 참고)
-        if (response.candidates and 
-            len(response.candidates) > 0 and 
-            response.candidates[0].grounding_metadata and
-            response.candidates[0].grounding_metadata.grounding_chunks):
-            
-            resolved_urls = resolve_urls(response.candidates[0].grounding_metadata.grounding_chunks, search_id)
-            citations = get_citations(response, resolved_urls)
-            modified_text = insert_citation_markers(response.text, citations)
-            sources_gathered = [item for citation in citations for item in citation["segments"]]
-            
-            logger.info(f"[web_search] 검색 완료 - ID: {search_id}, 출처: {len(sources_gathered)}개")
-        else:
-            logger.warning(f"[web_search] ID: {search_id} - grounding_metadata가 없음")
-            modified_text = response.text if response.text else f"검색 실패: {query}"
-            sources_gathered = []
-            
-            logger.info(f"[web_search] 검색 완료 - ID: {search_id}, 출처: 0개 (metadata 없음)")
+        if result is None:
+            logger.info(f"[web_search] 검색 중단 - ID: {search_id} (정족수 도달 또는 {configurable.search_timeout}초 초과)")
+            return {
+                "sources_gathered": [],
+                "search_query": [state["search_query"]],
+                "web_research_result": [],
+            }
+        
+        sources_gathered = result["sources_gathered"]
+        products = result.get("candidate_products")
+        if products is None and configurable.use_product_extraction:
+            # 제품 추출 전(또는 추출 실패)에 캐시된 결과
+            products = await _extract_products(query, result, configurable)
+        products = products or []
+        logger.info(f"[web_search] 검색 완료 - ID: {search_id}, 출처: {len(sources_gathered)}개, 제품: {len(products)}개")
 
         # quickstart 패턴과 동일한 반환 구조
         return {
             "sources_gathered": sources_gathered,
+            "candidate_products": products,
             "search_query": [state["search_query"]],
-            "web_research_result": [modified_text],
+            "web_research_result": [result["web_research_result"]],
         }
         
     except Exception as e:
@@ -195,34 +555,68 @@ def web_search(state: dict, config: RunnableConfig) -> dict:
         }
 
 
+# 3-1. 제품 추출 / 제품 표
+async def _extract_products(query: str, result: dict, configurable: ProductRecommendationConfig) -> list | None:
+    """검색 결과 하나에서 제품 목록을 추출합니다. 추출에 실패하면 None (캐시에 빈 목록을 남기지 않음)"""
+    if not result.get("sources_gathered"):
+        return []  # 검색 실패 / grounding 없음
+    llm = get_node_chat_model("extract_products", configurable.search_model)
+    prompt = get_product_extraction_prompt(query, result["web_research_result"], configurable.max_products_per_query)
+    try:
+        extracted = await ainvoke_structured(
+            "extract_products", configurable.search_model, llm, ProductExtractionResult, prompt
+        )
+    except Exception as e:
+        logger.warning(f"[web_search] 제품 추출 실패 ({query}): {str(e)}")
+        return None
+    return products_from_extraction(extracted.products, result["sources_gathered"], configurable.max_products_per_query)
+
+def _product_table(state: ProductRecommendationState, configurable: ProductRecommendationConfig, node: str) -> str:
+    """브랜치 간 병합된 후보 제품을 순위대로 자른 제품 표. 추출된 제품이 없으면 빈 문자열"""
+    products = state.get("candidate_products") or []
+    # 지식 베이스에서 가져온 제품은 추출 사용 여부와 관계없이 표로 전달 (검색 결과 원문이 없음)
+    if not products or not (configurable.use_product_extraction or state.get("kb_product_count")):
+        return ""
+    ranked = rank_products(products, configurable.max_candidate_products)
+    table = render_product_table(ranked, state.get("sources_gathered") or [])
+    raw_tokens = count_tokens("\n".join(state.get("web_research_result") or []))
+    logger.info(f"[{node}] 제품 표 사용 - 후보 {len(products)}개 중 {len(ranked)}개, 검색 결과 {raw_tokens} → {count_tokens(table)} 토큰")
+    return table
+
 # 4. 리플렉션
-def reflection(state: ProductRecommendationState, config: RunnableConfig) -> dict:
+async def reflection(state: ProductRecommendationState, config: RunnableConfig) -> dict:
     """검색 결과를 평가하고 추가 검색이 필요한지 판단합니다."""
     
     logger.info("[reflection] 노드 시작")
     
     configurable = ProductRecommendationConfig.from_runnable_config(config)
     
-    llm = ChatGoogleGenerativeAI(
-        model=configurable.analysis_model,
-        temperature=0.1,
-        max_retries=2,
-        api_key=os.getenv("GEMINI_API_KEY")
-    )
+    # 검색 단계가 끝났으므로 쓰이지 않은 추측 검색은 정리
+    get_speculator().finish(state.get("speculation_id"))
+    
+    llm = get_node_chat_model("reflection", configurable.analysis_model)
     
     # 현재 검색 결과 분석
-    user_message = get_recent_user_messages(state["messages"])  # full context
+    user_message = _conversation_context(state, configurable)  # 요약 + 최근 메시지
     web_research_results = state.get("web_research_result", [])
     search_queries = state.get("search_queries", [])
     sources_gathered = state.get("sources_gathered", [])
     
-    # candidate_products는 현재 추출 로직이 없으므로 web_research_result를 사용
-    research_summary = "\n".join(web_research_results) if web_research_results else "검색 결과 없음"
+    # 추출된 제품이 있으면 제품 표를, 없으면 검색 결과 원문을 사용
+    # (원문은 관련도·인용 밀도가 낮은 결과부터 잘라 토큰 예산 안으로 맞춤)
+    research_summary = _product_table(state, configurable, "reflection") or fit_research_results(
+        web_research_results,
+        [user_message, *search_queries],
+        configurable.reflection_context_tokens,
+        "reflection",
+        separator="\n",
+    ) or "검색 결과 없음"
     
     reflection_prompt = get_reflection_prompt(user_message, research_summary, search_queries)
     
-    structured_llm = llm.with_structured_output(ReflectionResult)
-    result = structured_llm.invoke(reflection_prompt)
+    result = await ainvoke_structured(
+        "reflection", configurable.analysis_model, llm, ReflectionResult, reflection_prompt
+    )
     
     search_loop_count = state.get("search_loop_count", 0) + 1
     logger.info(f"[reflection] 반성 완료 - 충분 여부: {result.is_sufficient}, 검색 루프: {search_loop_count}")
@@ -235,23 +629,18 @@ def reflection(state: ProductRecommendationState, config: RunnableConfig) -> dic
 
 
 # 5. 답변 생성
-def answer_generation(state: ProductRecommendationState, config: RunnableConfig) -> dict:
+async def answer_generation(state: ProductRecommendationState, config: RunnableConfig) -> dict:
     """최종 답변을 생성합니다. quickstart의 finalize_answer 패턴을 따릅니다."""
     
     logger.info("[answer_generation] 노드 시작")
     
     configurable = ProductRecommendationConfig.from_runnable_config(config)
     
-    # LLM 초기화
-    llm = ChatGoogleGenerativeAI(
-        model=configurable.analysis_model,  # 답변 생성에는 분석 모델 사용
-        temperature=0.1,
-        max_retries=2,
-        api_key=os.getenv("GEMINI_API_KEY")
-    )
+    # LLM 초기화 (답변 생성에는 분석 모델 사용)
+    llm = get_node_chat_model("answer_generation", configurable.analysis_model)
     
     # 사용자 요청과 검색 결과 수집
-    user_message = get_recent_user_messages(state["messages"])  # full context
+    user_message = _conversation_context(state, configurable)  # 요약 + 최근 메시지
     web_research_results = state.get("web_research_result", [])
     sources_gathered = state.get("sources_gathered", [])
     
@@ -269,23 +658,13 @@ def answer_generation(state: ProductRecommendationState, config: RunnableConfig)
     answer_prompt = get_answer_prompt(user_message, summaries)
     
     # 답변 생성
-    result = llm.invoke(answer_prompt)
+    result = await ainvoke_llm("answer_generation", configurable.analysis_model, llm, answer_prompt)
     
-    # quickstart 패턴: 단축 URL을 원본 URL로 변환
+    # quickstart 패턴: 단축 URL을 원본 URL로 변환 (한 번의 정규식 패스)
     final_content = result.content if result and hasattr(result, 'content') else "답변 생성에 실패했습니다."
-    unique_sources = []
-    
-    if sources_gathered and isinstance(sources_gathered, list):
-        for source in sources_gathered:
-            if (isinstance(source, dict) and 
-                source.get("short_url") and 
-                source["short_url"] in final_content):
-                # 단축 URL을 원본 URL로 교체
-                final_content = final_content.replace(
-                    source["short_url"], 
-                    source.get("value", source["short_url"])
-                )
-                unique_sources.append(source)
+    rewriter = CitationRewriter(sources_gathered)
+    final_content = rewriter.rewrite(final_content)
+    unique_sources = rewriter.used_sources()
     
     logger.info(f"[answer_generation] 답변 생성 완료 - 최종 출처: {len(unique_sources)}개")
     
@@ -296,55 +675,72 @@ def answer_generation(state: ProductRecommendationState, config: RunnableConfig)
     }
 
 # 6. 리포트 생성
-def report_generation(state: ProductRecommendationState, config: RunnableConfig) -> dict:
+async def report_generation(state: ProductRecommendationState, config: RunnableConfig) -> dict:
     """웹 검색 결과를 바탕으로 장문의 제품 추천 리포트를 생성합니다."""
 
     logger.info("[report_generation] 노드 시작")
 
     configurable = ProductRecommendationConfig.from_runnable_config(config)
 
-    llm = ChatGoogleGenerativeAI(
-        model=configurable.analysis_model,  # 리포트도 분석 모델 사용
-        temperature=0.2,
-        max_retries=2,
-        api_key=os.getenv("GEMINI_API_KEY")
-    )
+    # 리포트도 분석 모델 사용
+    llm = get_node_chat_model("report_generation", configurable.analysis_model)
 
     # 사용자 요청 및 웹 리서치 결과 취합
-    user_message = get_recent_user_messages(state["messages"])
+    user_message = _conversation_context(state, configurable)
     web_research_results = state.get("web_research_result", [])
     sources_gathered = state.get("sources_gathered", [])
 
     logger.info(f"[report_generation] 리포트 생성 중 - 검색 결과: {len(web_research_results)}개, 출처: {len(sources_gathered)}개")
 
-    # 웹 리서치 결과를 하나의 문자열로 구성
-    if web_research_results:
-        products_info = "\n---\n".join(web_research_results)
-    else:
-        products_info = "검색 결과가 없습니다."
+    # 검색 브랜치 간 병합한 제품 표 (없으면 웹 리서치 결과를 토큰 예산 안에서 하나의 문자열로 구성)
+    products_info = _product_table(state, configurable, "report_generation") or fit_research_results(
+        web_research_results,
+        [user_message, *state.get("search_queries", [])],
+        configurable.report_context_tokens,
+        "report_generation",
+    ) or "검색 결과가 없습니다."
+
+    # 이전 턴 요약은 현재 요청과 관련 있을 때만 포함 (추가 요청: "더 저렴한 걸로" 등)
+    previous_turns = relevant_turns(
+        state.get("turn_archive"),
+        [state.get("user_intent", ""), get_latest_user_message(state["messages"])],
+        configurable.archive_context_turns,
+    )
 
-    report_prompt = get_report_prompt(user_message, products_info)
+    report_prompt = get_report_prompt(user_message, products_info, previous_turns)
 
-    result = llm.invoke(report_prompt)
+    result = await ainvoke_llm("report_generation", configurable.analysis_model, llm, report_prompt)
 
     final_content = result.content if result and hasattr(result, "content") else "리포트 생성에 실패했습니다."
 
-    # 출처 링크 교체 (answer_generation 로직 재사용)
-    unique_sources = []
-    if sources_gathered and isinstance(sources_gathered, list):
-        for source in sources_gathered:
-            if (
-                isinstance(source, dict)
-                and source.get("short_url")
-                and source["short_url"] in final_content
-            ):
-                final_content = final_content.replace(
-                    source["short_url"], source.get("value", source["short_url"])
-                )
-                unique_sources.append(source)
+    # 출처 링크 교체 (스트리밍 토큰도 같은 CitationRewriter 로 교체됨)
+    rewriter = CitationRewriter(sources_gathered)
+    final_content = rewriter.rewrite(final_content)
+    unique_sources = rewriter.used_sources()
 
     logger.info(f"[report_generation] 리포트 생성 완료 - 최종 출처: {len(unique_sources)}개")
 
+    # 검색이 모두 실패했거나 인용한 출처가 없는 리포트는 캐시하지 않음
+    # (한 번의 실패한 실행이 TTL 동안 비슷한 요청 모두에 재사용되지 않도록)
+    searched = bool(state.get("kb_product_count")) or any(not is_failed_result(text) for text in web_research_results)
+    if configurable.use_answer_cache and not (searched and unique_sources):
+        logger.info("[report_generation] 검색 결과 또는 출처가 없어 응답 캐시에 저장하지 않음")
+    elif configurable.use_answer_cache and result and hasattr(result, "content"):
+        try:
+            await get_answer_cache().store(state.get("extracted_requirements"), final_content, unique_sources)
+        except Exception as e:
+            logger.warning(f"[report_generation] 응답 캐시 저장 실패: {str(e)}")
+
+    # 이번 턴에 웹 검색으로 찾은 제품을 지식 베이스에 저장 (지식 베이스에서 온 제품은 갱신하지 않음)
+    if configurable.use_product_kb and state.get("candidate_products"):
+        try:
+            stored = await get_product_store().store(
+                state["candidate_products"], sources_gathered, state.get("extracted_requirements")
+            )
+            logger.info(f"[report_generation] 지식 베이스에 제품 {stored}개 저장")
+        except Exception as e:
+            logger.warning(f"[report_generation] 제품 저장 실패: {str(e)}")
+
     return {
         "messages": [AIMessage(content=final_content)],
         "sources_gathered": unique_sources,
@@ -357,8 +753,84 @@ def should_refine_or_search(state: ProductRecommendationState) -> str:
     logger.info(f"[should_refine_or_search] 라우팅 결정: {decision}")
     return decision
 
+def should_use_cached_answer(state: ProductRecommendationState) -> str:
+    """응답 캐시 적중 여부에 따른 라우팅 결정"""
+    decision = "hit" if state.get("answer_cache_hit", False) else "miss"
+    logger.info(f"[should_use_cached_answer] 라우팅 결정: {decision}")
+    return decision
+
+def route_validation(state: ProductRecommendationState, config: RunnableConfig) -> str:
+    """validation_mode 에 따라 검증 노드를 선택합니다."""
+    configurable = ProductRecommendationConfig.from_runnable_config(config)
+    return "validate_and_generate_queries" if configurable.validation_mode == "combined" else "validate_request"
+
+def route_after_answer_cache(state: ProductRecommendationState, config: RunnableConfig):
+    """캐시 미적중 시 지식 베이스 조회(use_product_kb)로, 아니면 separate 모드는 검색어 생성으로,
+    combined 모드는 바로 웹 검색으로 진행"""
+    if should_use_cached_answer(state) == "hit":
+        return END
+    configurable = ProductRecommendationConfig.from_runnable_config(config)
+    if configurable.use_product_kb:
+        return "retrieve_products"
+    return _route_to_search(state, config, configurable)
+
+def route_after_retrieval(state: ProductRecommendationState, config: RunnableConfig):
+    """지식 베이스 제품이 충분하면 바로 리포트로, 부족하면 검색 경로로 진행"""
+    configurable = ProductRecommendationConfig.from_runnable_config(config)
+    if state.get("kb_product_count", 0) >= configurable.product_kb_min_products:
+        return "report_generation"
+    return _route_to_search(state, config, configurable)
+
+def _route_to_search(state: ProductRecommendationState, config: RunnableConfig, configurable: ProductRecommendationConfig):
+    if configurable.validation_mode == "combined":
+        return continue_to_web_search(state, config)
+    return "generate_search_queries"
+
 # ========== 그래프 구성 ==========
 
+def _as_node(afunc: Callable[..., Awaitable[dict]]) -> RunnableLambda:
+    """비동기 노드를 sync/async 양쪽에서 실행 가능한 Runnable로 감쌉니다.
+
+    서버는 `graph.ainvoke`/`astream` 으로 이벤트 루프를 막지 않고 실행하고,
+    스크립트·테스트의 `graph.invoke` / `graph.nodes[...].invoke` 호출은
+    노드마다 별도 이벤트 루프에서 코루틴을 실행합니다.
+
+    노드 함수 자체(`web_search` 등)는 코루틴 함수이므로 직접 호출할 때는
+    `asyncio.run(web_search(state, config))` 처럼 실행해야 합니다.
+    이벤트 루프가 도는 곳(Jupyter, 비동기 테스트 등)에서는 동기 호출을 쓸 수 없고
+    `graph.ainvoke` 를 사용해야 합니다.
+    """
+
+    name = afunc.__name__
+
+    async def _timed(state: dict, config: RunnableConfig) -> dict:
+        # 노드별 실행 시간 지표 (GET /metrics 의 graph_node_duration_seconds)
+        start = time.perf_counter()
+        status = "error"
+        attrs = {"search_id": state.get("id"), "query": state.get("search_query")} if name == "web_search" else {}
+        try:
+            with span(name, "node", **attrs):
+                result = await afunc(state, config)
+            status = "ok"
+            return result
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            observe_node(name, time.perf_counter() - start, status)
+
+    def _sync(state: dict, config: RunnableConfig) -> dict:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(_timed(state, config))
+        raise RuntimeError(
+            f"'{name}' 노드를 실행 중인 이벤트 루프 안에서 동기로 호출했습니다. "
+            "graph.ainvoke / astream (또는 노드의 ainvoke)을 사용하세요."
+        )
+
+    return RunnableLambda(_sync, afunc=_timed, name=name)
+
 def create_product_recommendation_graph():
     """제품 추천 그래프 생성"""
     
@@ -368,21 +840,42 @@ def create_product_recommendation_graph():
     builder = StateGraph(ProductRecommendationState, config_schema=ProductRecommendationConfig)
     
     # 노드 추가
-    builder.add_node("validate_request", validate_request)
-    builder.add_node("generate_search_queries", generate_search_queries)
-    builder.add_node("web_search", web_search)
-    builder.add_node("reflection", reflection)
-    builder.add_node("report_generation", report_generation)
+    builder.add_node("start_turn", _as_node(start_turn))
+    builder.add_node("validate_request", _as_node(validate_request))
+    builder.add_node("validate_and_generate_queries", _as_node(validate_and_generate_queries))
+    builder.add_node("lookup_answer_cache", _as_node(lookup_answer_cache))
+    builder.add_node("retrieve_products", _as_node(retrieve_products))
+    builder.add_node("generate_search_queries", _as_node(generate_search_queries))
+    builder.add_node("web_search", _as_node(web_search))
+    builder.add_node("reflection", _as_node(reflection))
+    builder.add_node("report_generation", _as_node(report_generation))
     
     # 엣지 구성
-    builder.add_edge(START, "validate_request")
+    # 턴 시작(이전 턴 정리) 후 validation_mode=combined 이면 검증과 검색어 생성을 한 노드에서 수행
+    builder.add_edge(START, "start_turn")
     builder.add_conditional_edges(
-        "validate_request",
-        should_refine_or_search,
-        {
-            "refine": END,  # 구체화 질문으로 종료
-            "search": "generate_search_queries"  # 검색 진행
-        }
+        "start_turn", route_validation, ["validate_request", "validate_and_generate_queries"]
+    )
+    for validation_node in ("validate_request", "validate_and_generate_queries"):
+        builder.add_conditional_edges(
+            validation_node,
+            should_refine_or_search,
+            {
+                "refine": END,  # 구체화 질문으로 종료
+                "search": "lookup_answer_cache"  # 캐시 조회 후 검색 진행
+            }
+        )
+    # 캐시 적중 시 캐시된 리포트로 종료, 미적중 시 검색어 생성 (combined 모드는 바로 웹 검색)
+    # use_product_kb 이면 먼저 지식 베이스를 조회해 충분하면 바로 리포트, 부족하면 나머지만 검색
+    builder.add_conditional_edges(
+        "lookup_answer_cache",
+        route_after_answer_cache,
+        [END, "retrieve_products", "generate_search_queries", "web_search"],
+    )
+    builder.add_conditional_edges(
+        "retrieve_products",
+        route_after_retrieval,
+        ["report_generation", "generate_search_queries", "web_search"],
     )
     builder.add_conditional_edges("generate_search_queries", continue_to_web_search, ["web_search"])
     builder.add_edge("web_search", "reflection")
@@ -392,7 +885,8 @@ def create_product_recommendation_graph():
     logger.info("제품 추천 그래프 생성 완료")
     
     # 멀티턴 대화 영속성:
-    #  - 로컬 파이썬 서버(개발/테스트)에서는 MemorySaver로 상태 유지
+    #  - 로컬 파이썬 서버에서는 CHECKPOINTER_BACKEND 에 따라 TTL/LRU 제한 메모리 체크포인터
+    #    또는 Postgres 체크포인터(POSTGRES_URL)로 상태 유지 (app/graph/checkpointer.py)
     #  - LangGraph Runtime(local_dev / cloud)에서는 플랫폼이 Postgres Saver를 제공하므로 지정하지 않음
     #    (참고: docs/backend/8_multiturn_interaction.md §5 State+Checkpointer)
 
@@ -400,8 +894,7 @@ def create_product_recommendation_graph():
         # Runtime 환경: 사용자 지정 체크포인터를 생략해야 경고/오류가 발생하지 않음
         return builder.compile()
     else:
-        from langgraph.checkpoint.memory import MemorySaver
-        return builder.compile(checkpointer=MemorySaver())
+        return builder.compile(checkpointer=create_checkpointer())
 
 # 그래프 인스턴스 생성
 graph = create_product_recommendation_graph()
@@ -410,14 +903,17 @@ graph = create_product_recommendation_graph()
 # stream_log 기반 로깅 헬퍼
 # =========================
 
-def invoke_with_logging(
+def _render_messages(msgs):
+    return [getattr(m, "content", m) if not isinstance(m, dict) else m.get("content", str(m)) for m in msgs]
+
+async def ainvoke_with_logging(
     input_state: Dict[str, Any],
     config: RunnableConfig | None = None,
 ) -> Dict[str, Any]:
-    """그래프를 실행하면서 LangGraph `stream_log` 로 각 단계 로그를 남깁니다.
+    """`invoke_with_logging` 의 비동기 버전으로, `graph.ainvoke` 로 그래프를 실행합니다.
 
-    docs/backend/6_langchain_logging.md 의 5번 섹션(`stream_log`) 패턴을 따릅니다.
-    LangSmith 없이도 각 노드의 실행 순서·출력을 실시간으로 확인할 수 있습니다.
+    FastAPI 서버에서 사용하며, Gemini 호출을 기다리는 동안 이벤트 루프를 점유하지
+    않으므로 여러 채팅 요청이 동시에 처리됩니다.
 
     Parameters
     ----------
@@ -429,19 +925,44 @@ def invoke_with_logging(
     Returns
     -------
     Dict[str, Any]
-        graph.invoke 의 최종 결과.
+        graph.ainvoke 의 최종 결과.
     """
     if config is None:
         config = {}
 
-    def render(msgs):
-        return [getattr(m, "content", m) if not isinstance(m, dict) else m.get("content", str(m)) for m in msgs]
-
-    logger.info(f"[invoke_with_logging] INITIAL messages ({len(input_state.get('messages', []))}): {render(input_state.get('messages', []))}")
+    logger.info(f"[ainvoke_with_logging] INITIAL messages ({len(input_state.get('messages', []))}): {_render_messages(input_state.get('messages', []))}")
 
-    result = graph.invoke(input_state, config)
+    # 그래프 실행 전체를 루트 스팬으로 기록 (노드 / LLM·검색 호출 스팬이 자식으로 연결됨)
+    thread_id = config.get("configurable", {}).get("thread_id")
+    with span("graph_run", "run", thread_id=thread_id, mode="invoke"):
+        result = await graph.ainvoke(input_state, config)
 
     final_msgs = result.get("messages", [])
-    logger.info(f"[invoke_with_logging] FINAL messages ({len(final_msgs)}): {render(final_msgs)}")
+    logger.info(f"[ainvoke_with_logging] FINAL messages ({len(final_msgs)}): {_render_messages(final_msgs)}")
 
     return result
+
+def invoke_with_logging(
+    input_state: Dict[str, Any],
+    config: RunnableConfig | None = None,
+) -> Dict[str, Any]:
+    """그래프를 실행하고 처음/마지막 메시지를 로그로 남깁니다.
+
+    노드별 실행 순서와 시간, LLM·검색 호출의 토큰 수는 TRACE_ENABLED=true 일 때
+    JSONL 스팬(app/core/tracing.py)으로 기록되며, LangSmith 없이
+    `python -m eval.trace_waterfall <thread_id>` 로 확인할 수 있습니다.
+    이벤트 루프 밖(스크립트, 테스트)에서 사용하는 동기 버전입니다.
+
+    Parameters
+    ----------
+    input_state : Dict[str, Any]
+        그래프에 전달할 초기 State 값.
+    config : RunnableConfig | None, optional
+        LangGraph 실행 설정. thread_id 등 전달.
+
+    Returns
+    -------
+    Dict[str, Any]
+        graph.invoke 의 최종 결과.
+    """
+    return asyncio.run(ainvoke_with_logging(input_state, config))
@@ -0,0 +1,218 @@
+import time
+import asyncio
+import bisect
+import logging
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 헤지(중복) 요청 안에서 실행 중인지 여부. 요청 제한기가 가장 낮은 우선순위로 처리합니다.
+is_hedge_attempt: ContextVar[bool] = ContextVar("is_hedge_attempt", default=False)
+
+# 헤지 실행기가 재는 검색 안에서 Gemini 호출 시간(초)을 모으는 목록.
+# 요청 제한기(rate_limited)가 대기 시간을 뺀 호출 시간만 추가합니다.
+gemini_call_seconds: ContextVar[Optional[List[float]]] = ContextVar("gemini_call_seconds", default=None)
+
+# ========== 지연 시간 히스토그램 ==========
+
+# 50ms ~ 약 60초 구간의 로그 스케일 버킷 경계 (초)
+DEFAULT_BUCKETS: List[float] = [round(0.05 * 1.25 ** i, 3) for i in range(32)]
+
+
+class LatencyHistogram:
+    """모델별 검색 지연 시간을 고정 버킷으로 집계하는 히스토그램.
+
+    샘플 수가 `max_samples` 를 넘으면 모든 버킷을 절반으로 줄여 최근 지연 시간의
+    비중을 높입니다. 분위수는 해당 버킷의 상한값으로 근사합니다.
+    """
+
+    def __init__(self, buckets: Optional[List[float]] = None, max_samples: int = 2000):
+        self.buckets = buckets or DEFAULT_BUCKETS
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 최대 경계 초과
+        self.max_samples = max_samples
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.total += 1
+            if self.total > self.max_samples:
+                self.counts = [c // 2 for c in self.counts]
+                self.total = sum(self.counts)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """q 분위 지연 시간(초). 샘플이 없으면 None"""
+        with self._lock:
+            if self.total == 0:
+                return None
+            target = q * self.total
+            seen = 0
+            for i, count in enumerate(self.counts):
+                seen += count
+                if seen >= target and count:
+                    return self.buckets[min(i, len(self.buckets) - 1)]
+            return self.buckets[-1]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "samples": self.total,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+# ========== 헤지 예산 ==========
+
+class HedgeBudget:
+    """헤지 요청이 전체 요청의 `ratio` 비율을 넘지 않도록 제한하는 토큰 버킷.
+
+    요청마다 `ratio` 만큼 토큰이 쌓이고(최대 `burst`), 헤지 요청은 토큰 1개를 씁니다.
+    Gemini 가 전반적으로 느려졌을 때 모든 검색이 두 번씩 나가 QPS 가 두 배가 되는
+    상황을 막습니다.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+        self._lock = threading.Lock()
+
+    def on_request(self) -> None:
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+# ========== 헤지 요청 ==========
+
+class SearchHedger:
+    """느린 grounding 검색에 중복 요청(hedged request)을 보내는 실행기.
+
+    검색이 모델별 관측 지연 시간의 `quantile` 분위(기본 p90)까지 끝나지 않으면 같은
+    검색을 한 번 더 보내고 먼저 끝난 결과를 사용합니다. 나머지 요청은 취소합니다.
+    헤지를 끄더라도 지연 시간은 계속 기록하므로 켜는 즉시 기준값을 사용할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.9,
+        min_samples: int = 20,
+        budget_ratio: float = 0.1,
+        budget_burst: float = 5.0,
+    ):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.budget = HedgeBudget(budget_ratio, budget_burst)
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.metrics: Counter = Counter()
+
+    def histogram(self, model: str) -> LatencyHistogram:
+        with self._lock:
+            histogram = self._histograms.get(model)
+            if histogram is None:
+                histogram = self._histograms[model] = LatencyHistogram()
+            return histogram
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """헤지 요청을 보낼 대기 시간(초). 샘플이 부족하면 None (헤지하지 않음)"""
+        histogram = self.histogram(model)
+        if histogram.total < self.min_samples:
+            return None
+        return histogram.quantile(self.quantile)
+
+    async def _timed(self, model: str, fn: Callable[[], Awaitable[T]], hedge: bool = False) -> T:
+        if hedge:
+            is_hedge_attempt.set(True)  # 별도 Task 의 컨텍스트이므로 원래 요청에는 영향 없음
+        call_seconds: List[float] = []
+        token = gemini_call_seconds.set(call_seconds)
+        start = time.perf_counter()
+        try:
+            result = await fn()
+        finally:
+            gemini_call_seconds.reset(token)
+        # 추측 실행·요청 제한기 대기 시간이 헤지 기준(p90)을 부풀리지 않도록 Gemini 호출 시간만 기록
+        # (요청 제한기를 거치지 않은 호출이면 전체 시간)
+        self.histogram(model).observe(sum(call_seconds) if call_seconds else time.perf_counter() - start)
+        return result
+
+    async def run(self, model: str, fn: Callable[[], Awaitable[T]], hedge: bool = True) -> T:
+        """`fn()` 을 실행하고, 필요하면 헤지 요청을 보내 먼저 끝난 결과를 반환합니다."""
+        self.metrics["requests"] += 1
+        self.budget.on_request()
+
+        delay = self.hedge_delay(model) if hedge else None
+        if delay is None:
+            return await self._timed(model, fn)
+
+        primary = asyncio.ensure_future(self._timed(model, fn))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                if self.budget.try_acquire():
+                    self.metrics["hedged"] += 1
+                    logger.info(f"[hedging] {model} 검색이 {delay:.2f}초 내에 끝나지 않아 헤지 요청 전송")
+                    tasks.add(asyncio.ensure_future(self._timed(model, fn, hedge=True)))
+                else:
+                    self.metrics["budget_denied"] += 1
+
+            # 먼저 성공한 결과를 사용하고, 한쪽이 실패하면 다른 쪽을 계속 기다림
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.metrics["hedge_wins"] += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """헤지 비율/승리 횟수와 모델별 지연 시간 분위수"""
+        requests = self.metrics["requests"]
+        hedged = self.metrics["hedged"]
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {
+            "requests": requests,
+            "hedged": hedged,
+            "hedge_wins": self.metrics["hedge_wins"],
+            "budget_denied": self.metrics["budget_denied"],
+            "hedge_rate": round(hedged / requests, 4) if requests else 0.0,
+            "hedge_win_rate": round(self.metrics["hedge_wins"] / hedged, 4) if hedged else 0.0,
+            "latency": {model: h.stats() for model, h in histograms.items()},
+        }
+
+
+_search_hedger: Optional[SearchHedger] = None
+
+
+def get_search_hedger() -> SearchHedger:
+    """프로세스 전역 검색 헤지 실행기를 반환합니다."""
+    global _search_hedger
+    if _search_hedger is None:
+        _search_hedger = SearchHedger(
+            quantile=settings.search_hedge_quantile,
+            min_samples=settings.search_hedge_min_samples,
+            budget_ratio=settings.search_hedge_budget_ratio,
+        )
+    return _search_hedger
@@ -0,0 +1,414 @@
+import json
+import re
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from .answer_cache import canonicalize_requirements
+from .embeddings import create_embedder, cosine_similarity
+from .products import product_tokens
+from .utils import SHORT_URL_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# 제품 지식 베이스에서 가져온 제품의 단축 URL (`{prefix}kb-{idx}`). 웹 검색 출처와 구분됩니다.
+KB_SHORT_URL_PREFIX = f"{SHORT_URL_PREFIX}kb-"
+
+# 제품당 보관하는 출처 수 (최근 것 우선)
+MAX_SOURCES_PER_PRODUCT = 10
+
+# 가격이 예산을 이 비율 이상 넘으면 후보에서 제외
+BUDGET_TOLERANCE = 1.1
+
+# ========== 키 / 조건 ==========
+
+def product_key(name: str) -> str:
+    """띄어쓰기·표기 차이를 없앤 제품 키 ("QCY 멜로버즈프로" == "qcy 멜로버즈 프로")"""
+    base, variant = product_tokens(name)
+    return " ".join(sorted(base | variant))
+
+
+def requirement_fields(requirements: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """정규화한 요구사항 키("예산=10만원 이하|카테고리=무선 이어폰")를 dict 로 나눕니다."""
+    key = canonicalize_requirements(requirements)
+    return dict(part.split("=", 1) for part in key.split("|") if "=" in part)
+
+
+def parse_price(text: str) -> Optional[int]:
+    """가격 표현의 첫 금액을 원 단위로 ("3만원대" → 30000, "155,000원" → 155000)"""
+    match = re.search(r"(\d[\d,]*(?:\.\d+)?)\s*(만)?\s*원", text or "")
+    if not match:
+        return None
+    value = float(match.group(1).replace(",", ""))
+    return int(value * 10000) if match.group(2) else int(value)
+
+
+def _same_category(stored: str, requested: str) -> bool:
+    """요청에 카테고리가 있으면 저장된 제품도 같은(포함 관계인) 카테고리여야 합니다.
+
+    카테고리 없이 저장된 제품은 카테고리를 지정하지 않은 요청에만 사용합니다.
+    """
+    stored, requested = re.sub(r"\s+", "", stored or ""), re.sub(r"\s+", "", requested or "")
+    if not requested:
+        return True
+    return bool(stored) and (stored in requested or requested in stored)
+
+# ========== 저장소 백엔드 ==========
+
+class InMemoryProductStoreBackend:
+    """프로세스 내 제품 저장소 (단일 인스턴스 배포 및 테스트용)"""
+
+    def __init__(self, max_entries: int, retention: float):
+        self._entries: TTLCache[Dict[str, Any]] = TTLCache(maxsize=max_entries, ttl=retention)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None:
+                found[key] = entry
+        return found
+
+    async def upsert(self, entries: List[Dict[str, Any]]) -> None:
+        for entry in entries:
+            self._entries.set(entry["product_key"], entry)
+
+    async def nearest(self, embedding: List[float], max_age: float, limit: int) -> List[Tuple[Dict[str, Any], float]]:
+        cutoff = time.time() - max_age
+        scored = [
+            (entry, cosine_similarity(embedding, entry["embedding"]))
+            for _, entry in self._entries.items()
+            if entry["updated_at"] > cutoff
+        ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        return self._entries.stats()
+
+
+class PgVectorProductStoreBackend:
+    """pgvector 확장이 설치된 Postgres 제품 저장소 (docker-compose 의 postgres 서비스)
+
+    여러 서버 인스턴스가 같은 제품 지식 베이스를 공유하고 재시작 후에도 유지됩니다.
+    updated_at 이 retention 보다 오래된 제품과 max_entries 초과분은 저장할 때 정리합니다.
+    """
+
+    def __init__(self, database_url: str, dimension: int, max_entries: int, retention: float):
+        try:
+            from psycopg_pool import AsyncConnectionPool
+        except ImportError as e:
+            raise ImportError(
+                "pgvector 제품 저장소에는 psycopg[binary,pool] 패키지가 필요합니다."
+            ) from e
+
+        self.dimension = dimension
+        self.max_entries = max_entries
+        self.retention = retention
+        self._pool = AsyncConnectionPool(database_url, open=False, kwargs={"autocommit": True})
+        self._ready = False
+        self._ready_lock = asyncio.Lock()
+
+    async def _ensure_ready(self) -> None:
+        if self._ready:
+            return
+        async with self._ready_lock:
+            if self._ready:
+                return
+            await self._pool.open()
+            async with self._pool.connection() as conn:
+                await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+                await conn.execute(
+                    f"""
+                    CREATE TABLE IF NOT EXISTS product_kb (
+                        product_key TEXT PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        category TEXT NOT NULL DEFAULT '',
+                        price_range TEXT NOT NULL DEFAULT '',
+                        review_summary TEXT NOT NULL DEFAULT '',
+                        sources JSONB NOT NULL DEFAULT '[]'::jsonb,
+                        mention_count INTEGER NOT NULL DEFAULT 1,
+                        embedding vector({self.dimension}) NOT NULL,
+                        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                    )
+                    """
+                )
+                await conn.execute("CREATE INDEX IF NOT EXISTS product_kb_updated_at ON product_kb (updated_at)")
+            self._ready = True
+
+    @staticmethod
+    def _vector_literal(embedding: List[float]) -> str:
+        return "[" + ",".join(f"{v:.6f}" for v in embedding) + "]"
+
+    @staticmethod
+    def _row_to_entry(row) -> Dict[str, Any]:
+        key, name, category, price_range, review_summary, sources, mention_count, updated_at = row[:8]
+        return {
+            "product_key": key,
+            "name": name,
+            "category": category,
+            "price_range": price_range,
+            "review_summary": review_summary,
+            "sources": sources if isinstance(sources, list) else json.loads(sources),
+            "mention_count": mention_count,
+            "updated_at": updated_at.timestamp(),
+        }
+
+    _COLUMNS = "product_key, name, category, price_range, review_summary, sources, mention_count, updated_at"
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        await self._ensure_ready()
+        async with self._pool.connection() as conn:
+            cur = await conn.execute(
+                f"SELECT {self._COLUMNS} FROM product_kb WHERE product_key = ANY(%s)",
+                (keys,),
+            )
+            rows = await cur.fetchall()
+        return {row[0]: self._row_to_entry(row) for row in rows}
+
+    async def upsert(self, entries: List[Dict[str, Any]]) -> None:
+        if not entries:
+            return
+        await self._ensure_ready()
+        async with self._pool.connection() as conn:
+            for entry in entries:
+                await conn.execute(
+                    """
+                    INSERT INTO product_kb
+                        (product_key, name, category, price_range, review_summary, sources, mention_count, embedding, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, %s::jsonb, %s, %s::vector, to_timestamp(%s))
+                    ON CONFLICT (product_key) DO UPDATE SET
+                        name = EXCLUDED.name,
+                        category = EXCLUDED.category,
+                        price_range = EXCLUDED.price_range,
+                        review_summary = EXCLUDED.review_summary,
+                        sources = EXCLUDED.sources,
+                        mention_count = EXCLUDED.mention_count,
+                        embedding = EXCLUDED.embedding,
+                        updated_at = EXCLUDED.updated_at
+                    """,
+                    (
+                        entry["product_key"],
+                        entry["name"],
+                        entry["category"],
+                        entry["price_range"],
+                        entry["review_summary"],
+                        json.dumps(entry["sources"], ensure_ascii=False),
+                        entry["mention_count"],
+                        self._vector_literal(entry["embedding"]),
+                        entry["updated_at"],
+                    ),
+                )
+            # 보관 기간이 지난 제품과 최대 개수 초과분 정리
+            await conn.execute(
+                "DELETE FROM product_kb WHERE updated_at <= now() - make_interval(secs => %s)",
+                (self.retention,),
+            )
+            await conn.execute(
+                """
+                DELETE FROM product_kb WHERE product_key IN (
+                    SELECT product_key FROM product_kb ORDER BY updated_at DESC OFFSET %s
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    async def nearest(self, embedding: List[float], max_age: float, limit: int) -> List[Tuple[Dict[str, Any], float]]:
+        await self._ensure_ready()
+        vector = self._vector_literal(embedding)
+        async with self._pool.connection() as conn:
+            cur = await conn.execute(
+                f"""
+                SELECT {self._COLUMNS}, 1 - (embedding <=> %s::vector) AS similarity
+                FROM product_kb
+                WHERE updated_at > now() - make_interval(secs => %s)
+                ORDER BY embedding <=> %s::vector
+                LIMIT %s
+                """,
+                (vector, max_age, vector, limit),
+            )
+            rows = await cur.fetchall()
+        return [(self._row_to_entry(row), float(row[8])) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "pgvector", "maxsize": self.max_entries, "retention": self.retention}
+
+# ========== 제품 지식 베이스 ==========
+
+class ProductStore:
+    """웹 검색에서 추출한 제품을 가격대·출처·갱신 시각·임베딩과 함께 보관하는 지식 베이스.
+
+    - `store`: 리포트 생성 후 이번 실행의 후보 제품을 저장합니다. 웹 검색 출처가 있는 제품만
+      저장하고 갱신 시각을 바꾸므로, 지식 베이스에서 꺼낸 제품이 스스로 "신선해지지" 않습니다.
+    - `retrieve`: 요구사항(카테고리·예산)과 의도에 맞는, max_age 이내에 갱신된 제품을 찾습니다.
+    """
+
+    def __init__(self, backend, embedder, similarity_threshold: float = 0.2):
+        self.backend = backend
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.stored = 0
+        self.lookups = 0
+        self.retrieved = 0
+
+    @staticmethod
+    def _embedding_text(name: str, category: str, review_summary: str) -> str:
+        return f"{category} {name} {review_summary}".strip()
+
+    async def store(
+        self,
+        products: List[Dict[str, Any]],
+        sources_gathered: List[Dict[str, Any]],
+        requirements: Optional[Dict[str, Any]],
+    ) -> int:
+        """후보 제품을 저장(기존 제품이면 병합)하고 저장한 제품 수를 반환합니다."""
+        # 단축 URL → 원본 출처 (지식 베이스에서 온 출처는 제외)
+        originals: Dict[str, Dict[str, str]] = {}
+        for source in sources_gathered or []:
+            if not isinstance(source, dict) or not source.get("value"):
+                continue
+            for short_url in (source.get("short_url"), *source.get("aliases", [])):
+                if short_url and not short_url.startswith(KB_SHORT_URL_PREFIX):
+                    originals[short_url] = {"label": source.get("label") or "", "value": source["value"]}
+
+        category = requirement_fields(requirements).get("카테고리", "")
+        fresh: Dict[str, Dict[str, Any]] = {}
+        for product in products or []:
+            sources = [originals[u] for u in product.get("source_urls", []) if u in originals]
+            key = product_key(product.get("name", ""))
+            if not sources or not key:
+                continue
+            fresh[key] = {**product, "sources": sources}
+        if not fresh:
+            return 0
+
+        existing = await self.backend.get_many(fresh)
+        now = time.time()
+        entries = []
+        for key, product in fresh.items():
+            previous = existing.get(key, {})
+            sources = list({s["value"]: s for s in [*product["sources"], *previous.get("sources", [])]}.values())
+            name = product["name"]
+            review_summary = product.get("review_summary") or previous.get("review_summary", "")
+            entry_category = category or previous.get("category", "")
+            entries.append({
+                "product_key": key,
+                "name": name,
+                "category": entry_category,
+                "price_range": product.get("price_range") or previous.get("price_range", ""),
+                "review_summary": review_summary,
+                "sources": sources[:MAX_SOURCES_PER_PRODUCT],
+                "mention_count": previous.get("mention_count", 0) + 1,
+                "embedding": await self.embedder.aembed(self._embedding_text(name, entry_category, review_summary)),
+                "updated_at": now,
+            })
+        await self.backend.upsert(entries)
+        self.stored += len(entries)
+        return len(entries)
+
+    async def retrieve(
+        self,
+        requirements: Optional[Dict[str, Any]],
+        intent: str,
+        limit: int,
+        max_age: float,
+    ) -> List[Dict[str, Any]]:
+        """요구사항에 맞는 신선한 제품을 유사도 순으로 최대 limit 개 반환합니다.
+
+        카테고리가 다르거나 가격이 예산을 BUDGET_TOLERANCE 배 넘는 제품은 제외합니다.
+        """
+        fields = requirement_fields(requirements)
+        query = " ".join(part for part in [fields.get("카테고리", ""), " ".join(fields.values()), intent] if part)
+        if not query:
+            return []
+        self.lookups += 1
+
+        budget = parse_price(fields.get("예산", ""))
+        embedding = await self.embedder.aembed(query)
+        found = []
+        for entry, similarity in await self.backend.nearest(embedding, max_age, limit * 4):
+            if similarity < self.similarity_threshold:
+                break
+            if not _same_category(entry["category"], fields.get("카테고리", "")):
+                continue
+            price = parse_price(entry["price_range"])
+            if budget and price and price > budget * BUDGET_TOLERANCE:
+                continue
+            found.append({**entry, "similarity": round(similarity, 4)})
+            if len(found) >= limit:
+                break
+        self.retrieved += len(found)
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stored": self.stored,
+            "lookups": self.lookups,
+            "retrieved": self.retrieved,
+            "backend": self.backend.stats(),
+        }
+
+
+def kb_candidates(entries: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """지식 베이스 제품을 (candidate_products, sources_gathered) 형식으로 바꿉니다.
+
+    출처에는 `{prefix}kb-{idx}` 단축 URL을 붙여, 웹 검색 결과와 같은 제품 표·CitationRewriter
+    경로로 리포트에 인용되게 합니다.
+    """
+    products: List[Dict[str, Any]] = []
+    sources: List[Dict[str, Any]] = []
+    short_urls: Dict[str, str] = {}
+    for entry in entries:
+        urls = []
+        for source in entry.get("sources", [])[:3]:
+            if source["value"] not in short_urls:
+                short_urls[source["value"]] = f"{KB_SHORT_URL_PREFIX}{len(short_urls)}"
+                sources.append({"label": source.get("label") or "출처", "short_url": short_urls[source["value"]], "value": source["value"]})
+            urls.append(short_urls[source["value"]])
+        products.append({
+            "name": entry["name"],
+            "price_range": entry.get("price_range", ""),
+            "review_summary": entry.get("review_summary", ""),
+            "purchase_link": "",
+            "source_url": urls[0] if urls else "",
+            "source_urls": urls,
+            "mention_count": 1,
+        })
+    return products, sources
+
+
+_product_store: Optional[ProductStore] = None
+
+
+def create_product_store() -> ProductStore:
+    """애플리케이션 설정(app.core.config.settings)에 맞는 제품 지식 베이스를 생성합니다."""
+    embedder = create_embedder(settings.embedding_model)
+    if settings.product_store_backend == "pgvector":
+        if not settings.database_url:
+            raise ValueError("product_store_backend=pgvector 에는 DATABASE_URL/POSTGRES_URL 설정이 필요합니다.")
+        backend = PgVectorProductStoreBackend(
+            settings.database_url,
+            dimension=embedder.dimension,
+            max_entries=settings.product_store_max_entries,
+            retention=settings.product_store_retention,
+        )
+    else:
+        backend = InMemoryProductStoreBackend(
+            max_entries=settings.product_store_max_entries,
+            retention=settings.product_store_retention,
+        )
+    return ProductStore(backend, embedder, settings.product_store_similarity_threshold)
+
+
+def get_product_store() -> ProductStore:
+    """프로세스 전역 제품 지식 베이스 인스턴스를 반환합니다."""
+    global _product_store
+    if _product_store is None:
+        _product_store = create_product_store()
+    return _product_store
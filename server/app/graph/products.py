@@ -0,0 +1,183 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# ========== 제품명 정규화 ==========
+
+# 제품을 구분하지 못하는 일반 단어 (카테고리·기능 표현)
+GENERIC_TOKENS = {
+    "anc", "nc", "tws", "bluetooth", "블루투스", "무선", "유선", "이어폰", "헤드폰", "헤드셋", "이어버드",
+    "노이즈캔슬링", "노캔", "키보드", "마우스", "노트북", "모니터", "청소기", "공기청정기", "정품",
+    "신형", "최신형", "국내정품", "제품", "모델", "세대", "gen", "the", "new",
+}
+
+# 같은 시리즈의 다른 제품을 가르는 단어. 숫자와 함께 양쪽이 같아야 같은 제품으로 봅니다.
+VARIANT_TOKENS = {
+    "pro", "plus", "lite", "max", "mini", "ultra", "se", "fe", "air", "neo", "slim",
+    "프로", "플러스", "라이트", "맥스", "미니", "울트라", "에어", "네오", "슬림",
+}
+
+_ATTACHED_VARIANT = re.compile(r"(?<=[가-힣])(프로|플러스|라이트|맥스|미니|울트라)(?=\s|$)")
+_TOKEN = re.compile(r"[a-z]+|\d+|[가-힣]+")
+
+# 이 비율 이상 비슷하면 띄어쓰기·오타 차이로 보고 같은 제품으로 병합
+NAME_SIMILARITY_THRESHOLD = 0.9
+
+
+def product_tokens(name: str) -> Tuple[Set[str], Set[str]]:
+    """제품명을 (기본 단어, 모델 구분 단어) 집합으로 나눕니다.
+
+    "QCY 멜로버즈프로 ANC" → ({"qcy", "멜로버즈"}, {"프로"}).
+    일반 단어(무선, ANC 등)는 버리고, 숫자와 변형 단어(프로, 미니 등)는 구분 단어로 둡니다.
+    """
+    text = unicodedata.normalize("NFKC", name or "").lower()
+    text = re.sub(r"\([^)]*\)|\[[^\]]*\]", " ", text)  # 괄호 안 부가 설명
+    text = _ATTACHED_VARIANT.sub(r" \1", text)
+    base, variant = set(), set()
+    for token in _TOKEN.findall(text):
+        if token in GENERIC_TOKENS:
+            continue
+        if token.isdigit() or token in VARIANT_TOKENS:
+            variant.add(token)
+        else:
+            base.add(token)
+    return base, variant
+
+
+def same_product(a: str, b: str) -> bool:
+    """두 제품명이 같은 제품을 가리키는지 판단합니다.
+
+    - 숫자·변형 단어(프로, 2, xm5 의 5 등)가 다르면 다른 제품
+    - 한쪽 기본 단어가 다른 쪽에 모두 포함되면 같은 제품 (브랜드 생략, "ANC" 같은 수식어 허용)
+    - 아니면 공백을 뺀 이름의 유사도가 NAME_SIMILARITY_THRESHOLD 이상일 때 같은 제품
+    """
+    base_a, variant_a = product_tokens(a)
+    base_b, variant_b = product_tokens(b)
+    if variant_a != variant_b or not base_a or not base_b:
+        return False
+    smaller, larger = sorted((base_a, base_b), key=len)
+    if smaller <= larger:
+        return True
+    compact_a, compact_b = "".join(sorted(base_a)), "".join(sorted(base_b))
+    return SequenceMatcher(None, compact_a, compact_b).ratio() >= NAME_SIMILARITY_THRESHOLD
+
+# ========== 병합 / 순위 ==========
+
+def _specificity(name: str) -> int:
+    """대표 이름 선택 기준: 일반 단어를 뺀 단어 수 (브랜드가 붙은 이름 우선)"""
+    base, variant = product_tokens(name)
+    return len(base) + len(variant)
+
+
+def _merge_into(entry: Dict[str, Any], product: Dict[str, Any]) -> None:
+    if _specificity(product.get("name", "")) > _specificity(entry.get("name", "")):
+        entry["name"] = product["name"]
+    for key in ("price_range", "purchase_link", "source_url"):
+        if not entry.get(key) and product.get(key):
+            entry[key] = product[key]
+    if len(product.get("review_summary", "")) > len(entry.get("review_summary", "")):
+        entry["review_summary"] = product["review_summary"]
+    entry["source_urls"] = list(dict.fromkeys([*entry.get("source_urls", []), *product.get("source_urls", [])]))
+    entry["mention_count"] = entry.get("mention_count", 1) + product.get("mention_count", 1)
+
+
+def merge_products(left: Optional[List[Dict[str, Any]]], right: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """`candidate_products` 리듀서: 검색 브랜치마다 추출한 제품 중 같은 제품을 하나로 합칩니다.
+
+    같은 제품이면 더 구체적인 이름을 대표로 하고, 출처는 합치고, 언급 수(mention_count)를 더합니다.
+    입력 리스트와 dict 는 변경하지 않습니다.
+    """
+    merged: List[Dict[str, Any]] = [dict(p) for p in (left or []) if isinstance(p, dict)]
+    for product in right or []:
+        if not isinstance(product, dict) or not product.get("name"):
+            continue
+        for entry in merged:
+            if same_product(entry["name"], product["name"]):
+                _merge_into(entry, product)
+                break
+        else:
+            merged.append({
+                **product,
+                "source_urls": list(product.get("source_urls") or ([product["source_url"]] if product.get("source_url") else [])),
+                "mention_count": product.get("mention_count", 1),
+            })
+    return merged
+
+
+def rank_products(products: Iterable[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """언급 수 → 출처 수 → 처음 나온 순서로 정렬해 상위 limit 개를 반환합니다."""
+    indexed = list(enumerate(products))
+    indexed.sort(key=lambda item: (-item[1].get("mention_count", 1), -len(item[1].get("source_urls", [])), item[0]))
+    return [product for _, product in indexed[:limit]]
+
+# ========== 추출 결과 변환 / 표 ==========
+
+def products_from_extraction(
+    extracted: Iterable[Any],
+    sources: Iterable[Dict[str, Any]],
+    max_products: int,
+) -> List[Dict[str, Any]]:
+    """구조화 출력(ExtractedProduct)을 Product 레코드로 바꿉니다.
+
+    출처는 이 검색 결과의 단축 URL만 남겨, 모델이 지어낸 URL이 리포트에 들어가지 않게 합니다.
+    같은 검색 결과 안의 중복 제품도 여기서 합칩니다.
+    """
+    known = set()
+    for source in sources:
+        known.update(u for u in (source.get("short_url"), *source.get("aliases", [])) if u)
+
+    products: List[Dict[str, Any]] = []
+    for item in extracted:
+        name = (getattr(item, "name", "") or "").strip()
+        if not name:
+            continue
+        source_urls = [u for u in dict.fromkeys(getattr(item, "source_urls", []) or []) if u in known]
+        products = merge_products(products, [{
+            "name": name,
+            "price_range": (getattr(item, "price_range", "") or "").strip(),
+            "review_summary": (getattr(item, "review_summary", "") or "").strip(),
+            "purchase_link": (getattr(item, "purchase_link", "") or "").strip(),
+            "source_url": source_urls[0] if source_urls else "",
+            "source_urls": source_urls,
+            "mention_count": 1,
+        }])
+    # 한 검색 결과 안에서 여러 번 나온 제품도 언급 1회로 셈
+    for product in products:
+        product["mention_count"] = 1
+    return products[:max_products]
+
+
+def _cell(text: str, limit: int) -> str:
+    text = re.sub(r"\s+", " ", text or "").replace("|", "/").strip()
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def render_product_table(
+    products: List[Dict[str, Any]],
+    sources: Iterable[Dict[str, Any]],
+    review_chars: int = 120,
+    max_links: int = 3,
+) -> str:
+    """순위가 매겨진 제품 목록을 리포트/reflection 프롬프트용 마크다운 표로 만듭니다.
+
+    출처 칸은 `[레이블](단축 URL)` 형식이라 리포트가 그대로 인용하면 CitationRewriter 가
+    원본 URL로 바꿉니다.
+    """
+    labels: Dict[str, str] = {}
+    for source in sources:
+        for short_url in (source.get("short_url"), *source.get("aliases", [])):
+            if short_url:
+                labels.setdefault(short_url, source.get("label") or "출처")
+
+    lines = ["| 순위 | 제품 | 가격대 | 특징·평가 | 언급 | 출처 |", "|---|---|---|---|---|---|"]
+    for rank, product in enumerate(products, 1):
+        links = " ".join(
+            f"[{labels.get(url, '출처')}]({url})" for url in product.get("source_urls", [])[:max_links]
+        )
+        lines.append(
+            f"| {rank} | {_cell(product.get('name', ''), 60)} | {_cell(product.get('price_range', ''), 30) or '-'} "
+            f"| {_cell(product.get('review_summary', ''), review_chars) or '-'} | {product.get('mention_count', 1)} "
+            f"| {links or '-'} |"
+        )
+    return "\n".join(lines)
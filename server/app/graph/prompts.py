@@ -84,8 +84,12 @@ Format:
 사용자 요청: {user_message}
 추출된 의도: {user_intent}"""
 
-def get_search_query_prompt(user_message: str, user_intent: str, max_queries: int) -> List:
-    """검색어 생성을 위한 프롬프트"""
+def get_search_query_prompt(user_message: str, user_intent: str, max_queries: int, known_products: str = "") -> List:
+    """검색어 생성을 위한 프롬프트
+
+    known_products 가 있으면(제품 지식 베이스에서 이미 찾은 제품) 그 제품들로 채우지 못한
+    부분만 검색하도록 요청합니다.
+    """
     current_date = get_current_date()
     system_prompt = query_writer_instructions.format(
         max_queries=max_queries,
@@ -94,9 +98,97 @@ def get_search_query_prompt(user_message: str, user_intent: str, max_queries: in
         user_intent=user_intent
     )
 
+    human_content = f"다음 요청에 대한 효과적인 검색어를 생성해주세요:\n요청: {user_message}\n의도: {user_intent}"
+    if known_products:
+        human_content += (
+            f"\n\n이미 최근 리뷰 데이터로 확보한 제품: {known_products}"
+            "\n이 제품들은 다시 찾지 말고, 아직 확보하지 못한 다른 후보 제품을 찾는 검색어를 생성해주세요."
+        )
+
     return [
         SystemMessage(content=system_prompt),
-        HumanMessage(content=f"다음 요청에 대한 효과적인 검색어를 생성해주세요:\n요청: {user_message}\n의도: {user_intent}")
+        HumanMessage(content=human_content)
+    ]
+
+validation_with_queries_instructions = """당신은 제품 추천 및 검색 전문가입니다. 사용자의 요청이 제품 검색에 충분히 구체적인지 판단하고, 구체적이라면 한국 커뮤니티와 리뷰 사이트에서 사용할 검색어까지 한 번에 생성해주세요.
+
+Instructions:
+- 현재 날짜는 {current_date}입니다.
+- 먼저 요청이 구체적이고 검색 가능한지 평가하세요.
+- 불충분한 경우 구체화를 위한 질문을 생성하고, 검색어는 생성하지 마세요.
+- 구체적인 경우 서로 다른 관점의 검색어를 최대 {max_queries}개 생성하세요.
+
+구체적인 요청의 기준:
+- 제품 카테고리가 명확함 (예: 노트북, 이어폰, 키보드 등)
+- 용도나 목적이 언급됨 (예: 게이밍용, 업무용, 학습용 등)
+- 브랜드 선호도나 특정 기능 요구사항이 있음
+
+불충분한 요청 예시:
+- "키보드 추천해줘"
+- "좋은 노트북 알려줘"
+- "이어폰 뭐가 좋을까?"
+
+충분한 요청 예시:
+- "10만원 이하 가성비 좋은 게이밍 키보드 추천해줘"
+- "대학생용 문서작업 노트북 추천, 예산 100만원"
+- "운동할 때 쓸 무선 이어폰, 방수 기능 있는 걸로"
+
+검색어 생성 원칙:
+1. 한국 커뮤니티 특화 키워드 포함 (디시, 클리앙, 뽐뿌 등)
+2. 가격대 및 성능 관련 키워드 활용
+3. 리뷰 및 사용기 관련 키워드 포함
+4. 최신 트렌드 반영
+
+Output Format:
+- Format your response as a JSON object with these exact keys:
+   - "is_specific": true or false
+   - "clarification_question": 불충분할 경우 구체화를 위한 질문 (한국어, is_specific이 false인 경우만, 아니면 빈 문자열)
+   - "extracted_requirements": 추출된 요구사항들을 JSON 객체로 (예: {{"카테고리": "키보드", "용도": "게이밍", "예산": "10만원", "intent": "게이밍 키보드 구매"}})
+   - "queries": 검색어 리스트 (is_specific이 false인 경우 빈 리스트)
+   - "rationale": 각 검색어를 선택한 이유에 대한 간단한 설명
+
+사용자 요청: {user_message}"""
+
+def get_validation_with_queries_prompt(user_message: str, max_queries: int) -> List:
+    """요청 검증과 검색어 생성을 한 번에 수행하는 프롬프트"""
+    current_date = get_current_date()
+    system_prompt = validation_with_queries_instructions.format(
+        current_date=current_date,
+        max_queries=max_queries,
+        user_message=user_message
+    )
+
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=f"사용자 요청을 분석하고 필요하면 검색어를 생성해주세요: {user_message}")
+    ]
+
+conversation_summary_instructions = """당신은 제품 추천 상담 대화를 요약하는 전문가입니다. 기존 요약에 새 대화 내용을 반영해 갱신된 요약을 작성해주세요.
+
+Instructions:
+- 사용자가 찾는 제품 카테고리, 예산, 용도, 선호/비선호 브랜드, 필수 기능 등 요구사항을 중심으로 요약하세요.
+- 요구사항이 바뀐 경우(예: 예산 변경) 최신 요구사항만 남기고 이전 값은 "(이전: ...)" 으로 짧게 표시하세요.
+- AI가 이미 추천한 제품이 있으면 제품명만 남기세요.
+- 인사말, 출처, 링크는 제외하세요.
+- 한국어로 {max_chars}자 이내의 한 문단으로 작성하세요.
+
+기존 요약:
+{previous_summary}
+
+새 대화:
+{new_messages}"""
+
+def get_conversation_summary_prompt(previous_summary: str, new_messages: str, max_chars: int) -> List:
+    """누적 대화 요약 갱신 프롬프트"""
+    system_prompt = conversation_summary_instructions.format(
+        previous_summary=previous_summary or "(없음)",
+        new_messages=new_messages,
+        max_chars=max_chars,
+    )
+
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content="갱신된 대화 요약만 출력해주세요.")
     ]
 
 web_searcher_instructions = """한국 제품 추천 사이트에서 "{search_query}"에 대한 최신 정보를 수집하고 검증 가능한 제품 정보로 종합해주세요.
@@ -133,6 +225,33 @@ def get_web_search_prompt(query: str) -> str:
         current_date=current_date
     )
 
+product_extraction_instructions = """다음은 "{search_query}" 검색 결과입니다. 검색 결과에서 추천되거나 비교된 제품을 구조화된 목록으로 추출해주세요.
+
+Instructions:
+- 검색 결과에 실제로 나온 제품만 추출하고, 정보를 지어내지 마세요.
+- 제품명은 브랜드와 모델명을 포함한 정확한 이름으로 쓰세요 (예: "QCY 멜로버즈 프로").
+- 같은 제품은 한 번만 추출하세요.
+- 가격 정보가 없으면 빈 문자열로 두세요.
+- review_summary 는 특징과 사용자 평가를 한 문장으로 요약하세요.
+- source_urls 에는 해당 제품 정보 옆에 있는 출처 URL을 검색 결과에 적힌 그대로 넣으세요.
+- 최대 {max_products}개까지 추출하세요.
+
+검색 결과:
+{search_result}"""
+
+def get_product_extraction_prompt(query: str, search_result: str, max_products: int) -> List:
+    """검색 결과에서 제품 목록을 추출하는 프롬프트"""
+    system_prompt = product_extraction_instructions.format(
+        search_query=query,
+        search_result=search_result,
+        max_products=max_products,
+    )
+
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content="검색 결과의 제품 목록을 추출해주세요.")
+    ]
+
 reflection_instructions = """당신은 제품 추천 결과를 평가하는 전문 리서치 어시스턴트입니다. "{user_request}"에 대한 검색 결과를 분석하고 있습니다.
 
 Instructions:
@@ -236,7 +355,7 @@ report_instructions = """
 사용자가 흥미로워할 내용을 작성해야 합니다.
 
 사용자 요청: {user_request}
-
+{previous_turns}
 Instructions:
 1. 리포트는 *마크다운 기호 노출*을 최소화하고, **블로그 기사**처럼 자연스러운 문단 위주로 작성하세요.
 - 리포트를 처음 생성한게 아니라 사용자가 추가 요청을 한 경우에는 맨 앞줄에 추가 요청에 대한 대답을 해 주세요.
@@ -292,7 +411,7 @@ Instructions:
 # Helper Function: get_report_prompt
 # -------------------------------------------------
 
-def get_report_prompt(user_request: str, products_info: str) -> List:
+def get_report_prompt(user_request: str, products_info: str, previous_turns: str = "") -> List:
     """제품 추천 리포트를 작성하기 위한 시스템 + 휴먼 메시지 프롬프트를 반환합니다.
 
     Parameters
@@ -301,6 +420,8 @@ def get_report_prompt(user_request: str, products_info: str) -> List:
         사용자의 원본 요청(예: "10만 원 이하 가성비 이어폰 추천")
     products_info : str
         웹 검색 요약 등 리포트에 포함할 상세 제품 정보(마크다운 가능)
+    previous_turns : str
+        현재 요청과 관련 있는 이전 턴 요약 (없으면 빈 문자열)
 
     Returns
     -------
@@ -312,6 +433,10 @@ def get_report_prompt(user_request: str, products_info: str) -> List:
         content=report_instructions.format(
             user_request=user_request,
             products_info=products_info,
+            previous_turns=(
+                f"\n이전 대화 요약 (추가 요청에 답할 때만 참고하고, 출처로 인용하지 마세요):\n{previous_turns}\n"
+                if previous_turns else ""
+            ),
         )
     )
 
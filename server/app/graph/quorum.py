@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.cache import TTLCache
+from .context_budget import is_failed_result
+
+logger = logging.getLogger(__name__)
+
+# ========== 검색 정족수 (quorum) ==========
+
+class SearchQuorum:
+    """한 번의 web_search 팬아웃(Send 브랜치 묶음)의 완료 상태를 공유합니다.
+
+    N개 검색 중 `required` 개가 성공하면 `reached` 이벤트가 설정되고, 아직 진행 중인
+    나머지 브랜치는 결과를 기다리지 않고 빈 결과로 종료합니다.
+    """
+
+    def __init__(self, required: int, total: int):
+        self.required = required
+        self.total = total
+        self.succeeded = 0
+        self.reached = asyncio.Event()
+
+    def mark_succeeded(self) -> None:
+        self.succeeded += 1
+        if self.succeeded >= self.required:
+            self.reached.set()
+
+
+# 팬아웃별 정족수 상태. 브랜치가 모두 끝나지 못한 경우에도 남지 않도록 TTL 로 정리합니다.
+_quorums: TTLCache[SearchQuorum] = TTLCache(maxsize=1024, ttl=600)
+
+
+def _get_quorum(batch_id: str, required: int, total: int) -> SearchQuorum:
+    # asyncio.Event 는 이벤트 루프에 묶이므로 루프별로 구분합니다.
+    key: Tuple[int, str] = (id(asyncio.get_running_loop()), batch_id)
+    quorum = _quorums.get(key)
+    if quorum is None:
+        quorum = SearchQuorum(required, total)
+        _quorums.set(key, quorum)
+    return quorum
+
+
+def search_succeeded(result: Dict[str, Any]) -> bool:
+    """출처가 있거나 실패 표시("검색 실패: ...")가 없는 검색 결과만 정족수에 셉니다."""
+    return bool(result.get("sources_gathered")) or not is_failed_result(result.get("web_research_result") or "")
+
+
+async def run_with_quorum(
+    search: Callable[[], Awaitable[Dict[str, Any]]],
+    batch_id: Optional[str],
+    required: int,
+    total: int,
+    timeout: float,
+) -> Optional[Dict[str, Any]]:
+    """검색을 실행하되, 같은 팬아웃의 정족수가 먼저 채워지거나 timeout 이 지나면 포기합니다.
+
+    Returns
+    -------
+    Optional[Dict[str, Any]]
+        검색 결과. 정족수 도달 또는 시간 초과로 중단한 경우 None.
+    """
+    search_task = asyncio.ensure_future(search())
+
+    # 정족수를 쓰지 않는 경우(배치 정보 없음, 전체 결과 필요)에는 timeout 만 적용
+    if not batch_id or required <= 0 or required >= total:
+        done, _ = await asyncio.wait({search_task}, timeout=timeout)
+        if search_task in done:
+            return search_task.result()
+        search_task.cancel()
+        return None
+
+    quorum = _get_quorum(batch_id, required, total)
+    if quorum.reached.is_set():
+        search_task.cancel()
+        return None
+
+    quorum_task = asyncio.ensure_future(quorum.reached.wait())
+    try:
+        done, _ = await asyncio.wait(
+            {search_task, quorum_task},
+            timeout=timeout,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if search_task in done:
+            result = search_task.result()
+            # 실패한 검색이 정족수를 채워 성공할 수 있는 느린 검색을 취소하지 않도록
+            if search_succeeded(result):
+                quorum.mark_succeeded()
+            return result
+        search_task.cancel()
+        return None
+    finally:
+        quorum_task.cancel()
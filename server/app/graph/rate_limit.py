@@ -0,0 +1,331 @@
+import time
+import heapq
+import asyncio
+import itertools
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import observe_gemini_call, observe_rate_limit_wait
+from app.core.tracing import span
+from .context_budget import count_tokens
+from .hedging import gemini_call_seconds, is_hedge_attempt
+from .speculation import is_speculative
+
+logger = logging.getLogger(__name__)
+
+# ========== 노드별 우선순위 / 토큰 추정 ==========
+
+# 값이 작을수록 먼저 처리합니다. 최종 리포트가 검색 팬아웃이나 헤지·추측 실행 요청보다 앞섭니다.
+PRIORITY_REPORT = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_SEARCH = 2
+PRIORITY_SPECULATIVE = 3
+
+NODE_PRIORITY: Dict[str, int] = {
+    "report_generation": PRIORITY_REPORT,
+    "answer_generation": PRIORITY_REPORT,
+    "validate_request": PRIORITY_INTERACTIVE,
+    "validate_and_generate_queries": PRIORITY_INTERACTIVE,
+    "reflection": PRIORITY_INTERACTIVE,
+    "summarize_conversation": PRIORITY_INTERACTIVE,
+    "generate_search_queries": PRIORITY_SEARCH,
+    "web_search": PRIORITY_SEARCH,
+    "extract_products": PRIORITY_SEARCH,
+}
+
+# 노드별 예상 출력 토큰 수 (입력 토큰 추정치에 더해 TPM 예약에 사용)
+NODE_OUTPUT_TOKENS: Dict[str, int] = {
+    "validate_request": 300,
+    "validate_and_generate_queries": 500,
+    "generate_search_queries": 200,
+    "web_search": 1500,
+    "extract_products": 600,
+    "reflection": 300,
+    "summarize_conversation": 300,
+    "answer_generation": 2000,
+    "report_generation": 2000,
+}
+
+
+def estimate_tokens(node: str, prompt: Any) -> int:
+    """프롬프트 길이로 요청 토큰 수를 추정합니다 (한국어 기준 약 2자당 1토큰)."""
+    return count_tokens(str(prompt)) + NODE_OUTPUT_TOKENS.get(node, 500)
+
+# ========== 토큰 버킷 ==========
+
+class _ModelBucket:
+    """한 모델의 RPM / TPM 토큰 버킷과 우선순위 대기열"""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = float(rpm)
+        self.tokens = float(tpm)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.waiters: List[Tuple[int, int]] = []  # (우선순위, 도착 순서) 힙
+        self.granted = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.max_wait = 0.0
+        self.throttled = 0
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.requests = min(self.rpm, self.requests + elapsed * self.rpm / 60)
+        self.tokens = min(self.tpm, self.tokens + elapsed * self.tpm / 60)
+
+    def seconds_until(self, tokens: int) -> float:
+        """요청 1개와 `tokens` 토큰을 쓸 수 있을 때까지 남은 시간"""
+        missing_requests = max(0.0, 1 - self.requests)
+        missing_tokens = max(0.0, tokens - self.tokens)
+        paused = self.paused_until - time.monotonic()
+        return max(missing_requests * 60 / self.rpm, missing_tokens * 60 / self.tpm, paused)
+
+
+class GeminiRateLimiter:
+    """모든 그래프 노드가 함께 쓰는 모델별 Gemini 요청/토큰 한도 제한기.
+
+    Gemini 할당량은 프로젝트 단위인데 노드별 클라이언트는 각자 재시도하므로, 버스트가 오면
+    모두 429 를 받고 제각각 백오프합니다. 이 제한기는 모델별로 분당 요청 수(RPM)와 분당
+    추정 토큰 수(TPM) 버킷을 두고, 호출 전에 한도 안에서 순서대로 기다리게 합니다.
+
+    - 대기 순서는 (우선순위, 도착 순서)이며, 최종 리포트 생성이 검색/헤지보다 먼저 나갑니다.
+    - 호출이 끝나면 실제 사용 토큰으로 예약량을 보정합니다.
+    - 그래도 429 를 받으면 해당 모델 호출을 잠시 멈춰 다른 호출도 함께 기다리게 합니다.
+    - 한도가 설정되지 않은 모델은 제한하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        rpm_limits: Dict[str, int],
+        tpm_limits: Dict[str, int],
+        throttle_seconds: float = 5.0,
+        poll_interval: float = 0.05,
+    ):
+        self.rpm_limits = rpm_limits
+        self.tpm_limits = tpm_limits
+        self.throttle_seconds = throttle_seconds
+        self.poll_interval = poll_interval
+        self._buckets: Dict[str, _ModelBucket] = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    def _bucket(self, model: str) -> Optional[_ModelBucket]:
+        bucket = self._buckets.get(model)
+        if bucket is None and model in self.rpm_limits:
+            bucket = self._buckets[model] = _ModelBucket(
+                rpm=self.rpm_limits[model],
+                tpm=self.tpm_limits.get(model, 10 ** 9),
+            )
+        return bucket
+
+    async def acquire(self, model: str, tokens: int, priority: int = PRIORITY_SEARCH) -> int:
+        """한도 안에서 호출할 수 있을 때까지 기다린 뒤 예약한 토큰 수를 반환합니다."""
+        with self._lock:
+            bucket = self._bucket(model)
+            if bucket is None:
+                return 0
+            tokens = min(tokens, bucket.tpm)
+            entry = (priority, next(self._sequence))
+            heapq.heappush(bucket.waiters, entry)
+
+        start = time.monotonic()
+        granted = False
+        try:
+            while True:
+                with self._lock:
+                    bucket.refill()
+                    if bucket.waiters[0] == entry:
+                        delay = bucket.seconds_until(tokens)
+                        if delay <= 0:
+                            heapq.heappop(bucket.waiters)
+                            bucket.requests -= 1
+                            bucket.tokens -= tokens
+                            granted = True
+                            break
+                    else:
+                        delay = self.poll_interval
+                # 이벤트 루프에 묶인 동기화 객체 대신 짧은 sleep 으로 대기 (동기 실행과 공용)
+                await asyncio.sleep(min(max(delay, 0.01), 1.0))
+        finally:
+            with self._lock:
+                if not granted:
+                    bucket.waiters.remove(entry)
+                    heapq.heapify(bucket.waiters)
+
+        waited = time.monotonic() - start
+        with self._lock:
+            bucket.granted += 1
+            if waited > 0.01:
+                bucket.waited += 1
+                bucket.wait_seconds += waited
+                bucket.max_wait = max(bucket.max_wait, waited)
+        return tokens
+
+    def record_usage(self, model: str, reserved: int, actual: Optional[int]) -> None:
+        """예약한 토큰 수와 실제 사용량의 차이를 버킷에 반영합니다."""
+        if actual is None:
+            return
+        with self._lock:
+            bucket = self._buckets.get(model)
+            if bucket is not None:
+                bucket.tokens = min(bucket.tpm, bucket.tokens + reserved - actual)
+
+    def throttle(self, model: str) -> None:
+        """Gemini 429 를 받았을 때 `throttle_seconds` 동안 해당 모델의 새 호출을 멈춥니다."""
+        with self._lock:
+            bucket = self._buckets.get(model)
+            if bucket is not None:
+                bucket.paused_until = max(bucket.paused_until, time.monotonic() + self.throttle_seconds)
+                bucket.throttled += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                model: {
+                    "rpm": bucket.rpm,
+                    "tpm": bucket.tpm,
+                    "available_requests": round(bucket.requests, 2),
+                    "available_tokens": int(bucket.tokens),
+                    "queued": len(bucket.waiters),
+                    "granted": bucket.granted,
+                    "waited": bucket.waited,
+                    "avg_wait": round(bucket.wait_seconds / bucket.waited, 4) if bucket.waited else 0.0,
+                    "max_wait": round(bucket.max_wait, 4),
+                    "throttled": bucket.throttled,
+                }
+                for model, bucket in self._buckets.items()
+            }
+
+
+_rate_limiter: Optional[GeminiRateLimiter] = None
+
+
+def get_rate_limiter() -> GeminiRateLimiter:
+    """프로세스 전역 Gemini 요청 제한기를 반환합니다."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        limits = settings.gemini_rpm_limits if settings.gemini_rate_limit else {}
+        _rate_limiter = GeminiRateLimiter(
+            limits,
+            settings.gemini_tpm_limits,
+            throttle_seconds=settings.gemini_throttle_seconds,
+        )
+    return _rate_limiter
+
+# ========== 노드 호출 헬퍼 ==========
+
+def _is_rate_limit_error(error: BaseException) -> bool:
+    text = str(error)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text or "ResourceExhausted" in type(error).__name__
+
+
+class Permit:
+    """`rate_limited` 블록 안에서 실제 사용 토큰 수를 보고하는 핸들"""
+
+    def __init__(self, model: str, reserved: int):
+        self.model = model
+        self.reserved = reserved
+        self.input_tokens: Optional[int] = None
+        self.output_tokens: Optional[int] = None
+
+    @property
+    def actual(self) -> Optional[int]:
+        if self.input_tokens is None and self.output_tokens is None:
+            return None
+        return (self.input_tokens or 0) + (self.output_tokens or 0)
+
+    def record_usage(self, input_tokens: Optional[int], output_tokens: Optional[int]) -> None:
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+
+
+@asynccontextmanager
+async def rate_limited(node: str, model: str, prompt: Any, priority: Optional[int] = None) -> AsyncIterator[Permit]:
+    """`async with rate_limited(node, model, prompt):` 블록의 Gemini 호출을 한도 안에서 실행합니다.
+
+    대기 시간·호출 시간·토큰 수를 Prometheus 지표와 트레이싱 스팬으로 함께 기록합니다.
+    """
+    limiter = get_rate_limiter()
+    if priority is None:
+        speculative = is_hedge_attempt.get() or is_speculative.get()
+        priority = PRIORITY_SPECULATIVE if speculative else NODE_PRIORITY.get(node, PRIORITY_SEARCH)
+    kind = "search" if node == "web_search" else "llm"
+
+    with span(f"{kind}:{node}", kind, model=model, prompt_chars=len(str(prompt)), priority=priority) as call_span:
+        wait_start = time.perf_counter()
+        reserved = await limiter.acquire(model, estimate_tokens(node, prompt), priority)
+        call_start = time.perf_counter()
+        observe_rate_limit_wait(node, model, call_start - wait_start)
+
+        permit = Permit(model, reserved)
+        status = "error"
+        try:
+            yield permit
+            status = "ok"
+        except asyncio.CancelledError:
+            status = "cancelled"  # 정족수 도달 / 헤지 패배로 취소된 호출
+            raise
+        except Exception as e:
+            if _is_rate_limit_error(e):
+                status = "rate_limited"
+                logger.warning(f"[rate_limit] {node} - {model} 429 응답, 해당 모델 호출을 잠시 멈춥니다.")
+                limiter.throttle(model)
+            raise
+        finally:
+            call_seconds = gemini_call_seconds.get()
+            if call_seconds is not None:
+                call_seconds.append(time.perf_counter() - call_start)
+            limiter.record_usage(model, reserved, permit.actual)
+            observe_gemini_call(
+                node,
+                model,
+                kind=kind,
+                seconds=time.perf_counter() - call_start,
+                status=status,
+                input_tokens=permit.input_tokens,
+                output_tokens=permit.output_tokens,
+            )
+            if call_span is not None:
+                call_span.set(
+                    wait_ms=round((call_start - wait_start) * 1000, 3),
+                    input_tokens=permit.input_tokens,
+                    output_tokens=permit.output_tokens,
+                )
+
+
+def _record_message_usage(permit: Permit, message: Any) -> None:
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        permit.record_usage(usage.get("input_tokens"), usage.get("output_tokens"))
+
+
+async def ainvoke_llm(node: str, model: str, llm: Any, prompt: Any) -> Any:
+    """공유 제한기를 거쳐 LLM 을 호출하고 AIMessage 를 반환합니다."""
+    async with rate_limited(node, model, prompt) as permit:
+        result = await llm.ainvoke(prompt)
+        _record_message_usage(permit, result)
+        return result
+
+
+async def ainvoke_structured(node: str, model: str, llm: Any, schema: Any, prompt: Any) -> Any:
+    """공유 제한기를 거쳐 구조화 출력(`schema`)으로 LLM 을 호출합니다.
+
+    토큰 사용량을 기록할 수 있도록 원본 메시지를 함께 받고(include_raw), 파싱된 결과만
+    반환합니다. 파싱에 실패하면 기존 `with_structured_output` 과 같이 예외를 발생시킵니다.
+    """
+    structured_llm = llm.with_structured_output(schema, include_raw=True)
+    async with rate_limited(node, model, prompt) as permit:
+        result = await structured_llm.ainvoke(prompt)
+        _record_message_usage(permit, result["raw"])
+        if result.get("parsing_error"):
+            raise result["parsing_error"]
+        if result["parsed"] is None:
+            raise ValueError(f"[{node}] 구조화된 출력을 파싱하지 못했습니다.")
+        return result["parsed"]
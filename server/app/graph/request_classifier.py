@@ -0,0 +1,284 @@
+import re
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .tools_and_schemas import ValidationResult
+
+logger = logging.getLogger(__name__)
+
+# ========== 어휘 사전 ==========
+
+# 표준 카테고리명 -> 표기 변형. 공백을 뺀 문자열로 비교하므로 띄어쓰기 차이는 무시됩니다.
+CATEGORY_LEXICON: Dict[str, List[str]] = {
+    "키보드": ["키보드", "keyboard", "기계식키보드"],
+    "마우스": ["마우스", "mouse"],
+    "노트북": ["노트북", "랩탑", "laptop", "맥북"],
+    "노트북 파우치": ["노트북파우치", "노트북가방"],
+    "태블릿": ["태블릿", "아이패드", "갤럭시탭", "tablet"],
+    "태블릿 케이스": ["아이패드케이스", "태블릿케이스"],
+    "이어폰": ["이어폰", "이어버드", "에어팟", "버즈"],
+    "헤드셋": ["헤드셋", "헤드폰"],
+    "스피커": ["스피커", "블루투스스피커"],
+    "모니터": ["모니터", "휴대용모니터"],
+    "웹캠": ["웹캠", "웹카메라", "화상카메라"],
+    "스마트폰": ["스마트폰", "휴대폰", "핸드폰", "폰", "아이폰", "갤럭시"],
+    "스마트워치": ["스마트워치", "애플워치", "갤럭시워치"],
+    "프린터": ["프린터", "복합기"],
+    "TV": ["tv", "티비", "텔레비전", "스마트tv"],
+    "의자": ["의자", "게이밍체어", "사무용의자", "체어"],
+    "책상": ["책상", "데스크"],
+    "외장하드": ["외장하드", "외장ssd", "외장저장장치", "ssd", "hdd"],
+    "블랙박스": ["블랙박스"],
+    "무선충전기": ["무선충전패드", "무선충전기", "충전패드"],
+    "충전기": ["충전기", "보조배터리"],
+    "카메라": ["카메라", "미러리스", "dslr"],
+    "청소기": ["청소기", "로봇청소기", "무선청소기"],
+    "공기청정기": ["공기청정기"],
+    "가습기": ["가습기"],
+    "에어프라이어": ["에어프라이어"],
+    "커피머신": ["커피머신", "커피메이커"],
+    "냉장고": ["냉장고"],
+    "세탁기": ["세탁기", "건조기"],
+    "화장품": ["화장품", "스킨케어", "선크림", "로션", "립스틱"],
+    "주방용품": ["주방용품", "프라이팬", "냄비"],
+    "가방": ["가방", "백팩", "파우치"],
+    "케이스": ["케이스"],
+    "운동화": ["운동화", "러닝화", "신발"],
+}
+
+# 용도 / 사용자 (표준 표기 -> 변형)
+PURPOSE_LEXICON: Dict[str, List[str]] = {
+    "게이밍": ["게이밍", "게임용", "게이머", "게임"],
+    "업무": ["업무", "사무", "회사", "직장", "재택근무", "재택"],
+    "문서작업": ["문서작업", "문서용", "코딩", "개발용", "프로그래밍"],
+    "학습": ["학습", "공부", "인강", "대학생", "중고등학생", "학생용", "수험생"],
+    "영상편집": ["영상편집", "편집용", "유튜브", "디자인", "그래픽"],
+    "운동": ["운동", "러닝", "헬스", "등산"],
+    "출장/여행": ["출장", "여행", "휴대용", "캠핑"],
+    "가정용": ["가정용", "집에서", "거실", "신혼", "자취", "원룸"],
+    "차량용": ["차량용", "자동차"],
+    "선물": ["선물"],
+    "카페": ["카페"],
+}
+
+# 기능 / 사양 / 브랜드
+FEATURE_LEXICON: List[str] = [
+    "무선", "블루투스", "방수", "노이즈캔슬링", "노캔", "저소음", "기계식", "경량", "가벼운", "고성능",
+    "화질", "음질", "배터리", "충격방지", "펜지원", "펜", "컬러", "전후방", "분리형", "편한", "장시간",
+    "용량", "대용량", "친환경", "카메라성능",
+    "로지텍", "레이저", "애플", "삼성", "lg", "소니", "보스", "qcy", "샤오미", "다이슨",
+]
+
+# 예산: "10만원 이하", "100만원 이내", "200만원 대", "5 만 원"
+BUDGET_PATTERN = re.compile(
+    r"(\d+(?:[.,]\d+)?)\s*(만|천|백만|십만)?\s*원\s*(이하|이내|미만|안팎|정도|내외|까지|대|선)?"
+)
+# 예산을 숫자 없이 표현한 경우 (가격대 조건으로 취급)
+PRICE_WORDS: Dict[str, str] = {
+    "가성비": "가성비",
+    "저렴": "저렴한 가격",
+    "저가": "저렴한 가격",
+    "싼": "저렴한 가격",
+    "비싼": "고가",
+    "고가": "고가",
+    "프리미엄": "프리미엄",
+}
+# 가격 표현은 단어 첫머리에서만 매칭 ("비싼" 의 "싼", "최고가" 의 "고가" 는 제외). 긴 표현부터 시도
+PRICE_PATTERN = re.compile(
+    r"(?<![가-힣a-z0-9])(" + "|".join(sorted(PRICE_WORDS, key=len, reverse=True)) + ")"
+)
+# 제외·비교 표현. 찾는 제품이 무엇인지 사전만으로 알 수 없으므로 LLM 에 맡김
+# ("키보드 말고 마우스", "에어팟 프로 2 vs 버즈3 프로 비교")
+CONTRAST_PATTERN = re.compile(r"말고|빼고|제외|비교|(?<![a-z])vs(?![a-z])")
+# 숫자 사양: "55인치", "2TB", "11인치"
+SPEC_PATTERN = re.compile(r"\d+\s*(인치|tb|gb|mah|hz|kg|mm|w)(?![a-z])", re.IGNORECASE)
+
+# 추천 요청 상투어. 카테고리와 이 표현만 있으면 모호한 요청으로 봅니다.
+VAGUE_NGRAMS = [
+    "추천해줘", "추천해주세요", "추천좀", "추천", "알려줘", "알려주세요", "뭐가좋을까", "뭐가좋아",
+    "뭐쓸까", "뭐살까", "사고싶어", "사고싶은데", "필요해", "필요한데", "사야하는데", "사야해",
+    "좋은", "괜찮은", "좀", "요",
+]
+PARTICLES = ["이", "가", "을", "를", "은", "는", "로", "으로", "용", "하나"]
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def _compact(text: str) -> str:
+    """공백과 문장부호를 뺀 문자열 (n-gram 매칭용)"""
+    return re.sub(r"[\s\W_]+", "", text)
+
+
+def _match_lexicon(compact: str, lexicon: Dict[str, List[str]]) -> List[Tuple[str, str]]:
+    """(표준 표기, 매칭된 변형) 목록. 긴 변형부터 매칭하고 매칭된 부분은 다시 쓰지 않습니다."""
+    variants = sorted(
+        ((variant, canonical) for canonical, aliases in lexicon.items() for variant in aliases),
+        key=lambda item: -len(item[0]),
+    )
+    matches = []
+    for variant, canonical in variants:
+        if variant in compact:
+            compact = compact.replace(variant, " ")
+            if canonical not in (m[0] for m in matches):
+                matches.append((canonical, variant))
+    return matches
+
+# ========== 분류기 ==========
+
+class RequestClassification(BaseModel):
+    """로컬 분류 결과"""
+    is_specific: bool = Field(description="요청이 구체적인지 여부")
+    confidence: float = Field(description="분류 신뢰도 (0~1)")
+    extracted_requirements: Dict[str, Any] = Field(default_factory=dict, description="추출된 요구사항")
+    clarification_question: str = Field(default="", description="모호한 경우 구체화 질문")
+    reason: str = Field(default="", description="판단 근거")
+
+    def to_validation_result(self) -> ValidationResult:
+        return ValidationResult(
+            is_specific=self.is_specific,
+            clarification_question=self.clarification_question,
+            extracted_requirements=self.extracted_requirements,
+        )
+
+
+class RequestClassifier:
+    """카테고리 / 예산 / 용도 / 기능 어휘 사전 기반의 요청 구체성 분류기.
+
+    - 카테고리 + (예산·용도·기능·사양 중 하나 이상) -> 구체적
+    - 카테고리 + 추천 상투어("추천해줘", "뭐가 좋을까") 뿐 -> 모호
+    - 카테고리를 찾지 못했거나 사전에 없는 내용이 많으면 신뢰도를 낮춰 LLM 검증으로 넘깁니다.
+    """
+
+    def __init__(self):
+        self.metrics: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def classify(self, message: str) -> RequestClassification:
+        text = _normalize(message)
+        compact = _compact(text)
+
+        features = [f for f in FEATURE_LEXICON if f in compact]
+        # "카메라 성능" 처럼 기능 표현 안의 제품명은 카테고리로 보지 않음
+        product_text = compact
+        for feature in sorted(features, key=len, reverse=True):
+            product_text = product_text.replace(feature, " ")
+        categories = _match_lexicon(product_text, CATEGORY_LEXICON)
+        purposes = _match_lexicon(compact, PURPOSE_LEXICON)
+        budget = BUDGET_PATTERN.search(text)
+        price_words = PRICE_PATTERN.findall(text)
+        specs = [m.group(0).replace(" ", "") for m in SPEC_PATTERN.finditer(text)]
+        # 예산·사양이 아닌 숫자는 모델명 일부로 봄 ("아이폰 15", "갤럭시 s24")
+        models = re.findall(r"\d+", SPEC_PATTERN.sub(" ", BUDGET_PATTERN.sub(" ", text)))
+
+        # 사전으로 설명되지 않는 남은 글자 수 (많을수록 LLM 판단이 필요)
+        residual = compact
+        for variant in sorted(
+            [v for _, v in categories + purposes] + features + price_words + VAGUE_NGRAMS,
+            key=len,
+            reverse=True,
+        ):
+            residual = residual.replace(variant, "")
+        residual = re.sub(r"\d+(만|천|원|인치|tb|gb)*", "", residual)
+        for particle in PARTICLES:
+            residual = residual.replace(particle, "")
+
+        requirements: Dict[str, Any] = {}
+        if categories:
+            requirements["카테고리"] = categories[0][0]
+        if purposes:
+            requirements["용도"] = ", ".join(p for p, _ in purposes)
+        if budget:
+            requirements["예산"] = re.sub(r"\s+", "", budget.group(0)).replace("원", "원 ").strip()
+        elif price_words:
+            requirements["예산"] = PRICE_WORDS[price_words[0]]
+        if features or specs:
+            requirements["기능"] = features + specs
+        if len(categories) > 1:
+            requirements["관련 제품"] = [c for c, _ in categories[1:]]
+
+        signals = sum(bool(x) for x in (purposes, budget or price_words, features or specs or models))
+
+        # 카테고리가 여러 개거나("아이폰 케이스") 제외·비교 표현이 있으면 확신하지 않음
+        max_confidence = 1.0
+        if len(categories) > 1:
+            max_confidence = 0.8
+        if CONTRAST_PATTERN.search(text):
+            max_confidence = 0.6
+
+        if not categories:
+            return RequestClassification(
+                is_specific=signals >= 2,
+                confidence=0.5,
+                extracted_requirements=requirements,
+                reason="카테고리 없음",
+            )
+
+        category = requirements["카테고리"]
+        if signals == 0:
+            # 카테고리 + 상투어뿐이면 모호. 사전에 없는 내용이 남아 있으면 확신하지 않음
+            confidence = 0.95 if len(residual) <= 2 else 0.6
+            return RequestClassification(
+                is_specific=False,
+                confidence=min(confidence, max_confidence),
+                extracted_requirements=requirements,
+                clarification_question=(
+                    f"어떤 용도로 사용하실 {category}인가요? 예산이나 원하는 기능(브랜드, 크기 등)을 "
+                    f"알려주시면 더 정확하게 추천해드릴게요."
+                ),
+                reason=f"카테고리만 있음 (남은 글자 {len(residual)})",
+            )
+
+        requirements["intent"] = " ".join(
+            x for x in (requirements.get("예산"), requirements.get("용도"), category) if x
+        ) + " 추천"
+        confidence = 0.97 if signals >= 2 else 0.9
+        return RequestClassification(
+            is_specific=True,
+            confidence=min(confidence, max_confidence),
+            extracted_requirements=requirements,
+            reason=f"카테고리 {len(categories)}개 + 조건 {signals}개",
+        )
+
+    def decide(self, message: str, threshold: float = 0.85, multi_turn: bool = False) -> Optional[RequestClassification]:
+        """신뢰도가 threshold 이상이면 분류 결과를, 아니면 None(LLM 검증으로 넘김)을 반환합니다.
+
+        이전 대화가 있는 요청은 앞선 답변 맥락을 알 수 없으므로 항상 LLM 에 넘깁니다.
+        """
+        if multi_turn:
+            self._count("fallback_multi_turn")
+            return None
+        result = self.classify(message)
+        if result.confidence < threshold:
+            self._count("fallback_low_confidence")
+            return None
+        self._count("local_specific" if result.is_specific else "local_vague")
+        return result
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.metrics[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self.metrics)
+        local = metrics.get("local_specific", 0) + metrics.get("local_vague", 0)
+        total = local + metrics.get("fallback_multi_turn", 0) + metrics.get("fallback_low_confidence", 0)
+        return {**metrics, "local_rate": round(local / total, 4) if total else 0.0}
+
+
+_request_classifier: Optional[RequestClassifier] = None
+
+
+def get_request_classifier() -> RequestClassifier:
+    """프로세스 전역 요청 분류기를 반환합니다."""
+    global _request_classifier
+    if _request_classifier is None:
+        _request_classifier = RequestClassifier()
+    return _request_classifier
@@ -0,0 +1,130 @@
+import re
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.cache import SingleFlight, TTLCache
+from app.core.config import settings
+from .utils import SHORT_URL_PREFIX
+
+# ========== 웹 검색 결과 캐시 ==========
+
+def normalize_query(query: str) -> str:
+    """대소문자·유니코드 표기·공백·끝 문장부호 차이를 없앤 검색어 캐시 키"""
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.strip(" .,!?~")
+
+
+def rebase_search_result(result: Dict[str, Any], from_id: int, to_id: int) -> Dict[str, Any]:
+    """캐시된 검색 결과의 단축 URL을 현재 검색 브랜치 ID 기준으로 바꿉니다.
+
+    단축 URL은 `{prefix}{search_id}-{idx}` 형태라서, 다른 브랜치에서 만든 결과를 그대로
+    재사용하면 같은 실행의 다른 브랜치 출처와 충돌할 수 있습니다.
+    """
+    if from_id == to_id:
+        return result
+    old, new = f"{SHORT_URL_PREFIX}{from_id}-", f"{SHORT_URL_PREFIX}{to_id}-"
+    rebased = {
+        "web_research_result": result["web_research_result"].replace(old, new),
+        "sources_gathered": [
+            {
+                **source,
+                "short_url": source.get("short_url", "").replace(old, new, 1),
+                **({"aliases": [alias.replace(old, new, 1) for alias in source["aliases"]]} if source.get("aliases") else {}),
+            }
+            for source in result["sources_gathered"]
+        ],
+    }
+    if "candidate_products" in result:
+        rebased["candidate_products"] = [
+            {
+                **product,
+                "source_url": product.get("source_url", "").replace(old, new, 1),
+                "source_urls": [url.replace(old, new, 1) for url in product.get("source_urls", [])],
+            }
+            for product in result["candidate_products"]
+        ]
+    return rebased
+
+
+class SearchCache:
+    """(정규화된 검색어, 모델) 기준의 프로세스 전역 검색 결과 캐시.
+
+    - `web_research_result` 와 `sources_gathered` 를 TTL / 최대 개수 제한으로 보관합니다.
+    - 캐시에 없는 같은 검색어가 동시에 들어오면 Gemini 호출을 한 번만 수행합니다.
+    - 출처가 있는 성공 결과만 저장합니다.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._cache: TTLCache[Dict[str, Any]] = TTLCache(maxsize=max_entries, ttl=ttl)
+        self._flights = SingleFlight()
+
+    async def get_or_search(
+        self,
+        query: str,
+        model: str,
+        search_id: int,
+        search: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """캐시된 결과를 반환하거나, `search()` 를 (동시 요청당 한 번) 실행해 저장합니다.
+
+        `search()` 는 `search_id` 기준 단축 URL로 만든
+        {"web_research_result": str, "sources_gathered": list} 를 반환해야 합니다.
+        """
+        key = (normalize_query(query), model)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            return rebase_search_result(cached["result"], cached["search_id"], search_id)
+
+        async def _search_and_store() -> Dict[str, Any]:
+            result = await search()
+            if result["sources_gathered"]:
+                self._cache.set(key, {"result": result, "search_id": search_id})
+            return {"result": result, "search_id": search_id}
+
+        shared = await self._flights.do(key, _search_and_store)
+        return rebase_search_result(shared["result"], shared["search_id"], search_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), "singleflight": self._flights.stats()}
+
+
+_search_cache: Optional[SearchCache] = None
+
+# 배치 실행 동안만 유지되는 배치별 검색 캐시 (배치 ID -> SearchCache)
+_batch_search_caches: Dict[str, SearchCache] = {}
+
+
+def get_search_cache() -> SearchCache:
+    """프로세스 전역 검색 캐시 인스턴스를 반환합니다."""
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchCache(
+            max_entries=settings.search_cache_max_entries,
+            ttl=settings.search_cache_ttl,
+        )
+    return _search_cache
+
+
+def open_batch_search_cache(batch_id: str) -> SearchCache:
+    """배치 안의 모든 요청이 같은 검색어를 한 번만 검색하도록 배치 전용 캐시를 엽니다.
+
+    전역 검색 캐시 사용 여부와 관계없이 배치가 끝날 때까지 결과를 보관합니다.
+    """
+    cache = SearchCache(max_entries=settings.search_cache_max_entries, ttl=24 * 60 * 60)
+    _batch_search_caches[batch_id] = cache
+    return cache
+
+
+def get_batch_search_cache(batch_id: Optional[str]) -> Optional[SearchCache]:
+    return _batch_search_caches.get(batch_id) if batch_id else None
+
+
+def close_batch_search_cache(batch_id: str) -> Dict[str, Any]:
+    """배치 전용 캐시를 닫고 마지막 통계를 반환합니다."""
+    cache = _batch_search_caches.pop(batch_id, None)
+    return cache.stats() if cache else {}
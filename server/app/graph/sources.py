@@ -0,0 +1,100 @@
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# ========== URL 정규화 ==========
+
+# 같은 페이지인데 유입 경로만 다른 추적용 쿼리 파라미터 (utm_* 는 접두사로 처리)
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "igshid",
+    "mc_cid", "mc_eid", "ref", "ref_src", "srsltid", "spm", "_ga", "_gl",
+}
+
+# 모바일 / www 서브도메인은 같은 페이지로 취급 (m.blog.naver.com == blog.naver.com)
+HOST_PREFIXES = ("www.", "m.")
+
+
+def _is_tracking_param(key: str) -> bool:
+    key = key.lower()
+    return key.startswith("utm_") or key in TRACKING_PARAMS
+
+
+def canonical_url(url: str) -> str:
+    """출처 URL을 중복 판별용 정규형으로 바꿉니다.
+
+    - 스킴은 https 로, 호스트는 소문자로 통일하고 www. / m. 접두사와 기본 포트를 제거
+    - 추적용 쿼리 파라미터와 fragment 를 제거하고 나머지 파라미터는 정렬
+    - 경로 끝의 `/` 제거
+    - grounding 리다이렉트(`vertexaisearch.cloud.google.com/grounding-api-redirect/…`)는
+      경로의 토큰이 곧 대상 페이지이므로 같은 규칙으로 정규화됩니다.
+    """
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if not parts.netloc:
+        return url
+
+    host = (parts.hostname or "").lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking_param(k))
+    path = parts.path.rstrip("/")
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+# ========== sources_gathered 리듀서 ==========
+
+def _source_key(source: Dict[str, Any]) -> Optional[str]:
+    value = source.get("value")
+    if value:
+        return source.get("canonical_url") or canonical_url(value)
+    return source.get("short_url")
+
+
+def merge_sources(left: Optional[List[Dict[str, Any]]], right: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """`sources_gathered` 리듀서: 정규화한 URL 기준으로 중복 출처를 하나로 합칩니다.
+
+    - 먼저 들어온 출처의 `short_url` 을 대표로 유지하고, 같은 페이지의 다른 단축 URL은
+      `aliases` 에 모아 둡니다 (병렬 검색 결과 텍스트에 남아 있는 단축 URL도 복원되도록).
+    - 각 출처에 `canonical_url` 을 저장해 이후 병합에서 다시 정규화하지 않습니다.
+    - 입력 리스트와 dict 는 변경하지 않습니다.
+    """
+    merged: List[Dict[str, Any]] = []
+    index: Dict[str, int] = {}  # canonical_url → merged 위치
+
+    for source in [*(left or []), *(right or [])]:
+        if not isinstance(source, dict):
+            continue
+        key = _source_key(source)
+        if key is None:
+            continue
+
+        position = index.get(key)
+        if position is None:
+            entry = dict(source)
+            if entry.get("value"):
+                entry["canonical_url"] = key
+            index[key] = len(merged)
+            merged.append(entry)
+            continue
+
+        entry = merged[position]
+        known = {entry.get("short_url"), *entry.get("aliases", [])}
+        new_aliases = [
+            short_url
+            for short_url in (source.get("short_url"), *source.get("aliases", []))
+            if short_url and short_url not in known
+        ]
+        if new_aliases:
+            entry["aliases"] = [*entry.get("aliases", []), *dict.fromkeys(new_aliases)]
+
+    return merged
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.cache import TTLCache
+from .search_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# 추측 실행 작업(검색어 생성, 미리 시작한 검색) 안에서 실행 중인지 여부.
+# 요청 제한기가 헤지 요청과 같이 가장 낮은 우선순위로 처리합니다.
+is_speculative: ContextVar[bool] = ContextVar("is_speculative", default=False)
+
+# ========== 추측 실행 (speculative execution) ==========
+
+class Speculation:
+    """한 번의 그래프 실행에서 검증과 동시에 시작한 검색어 생성 / 검색 작업"""
+
+    def __init__(self, queries_task: "asyncio.Task[List[str]]"):
+        self.queries_task = queries_task
+        self.searches: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+    def cancel(self) -> int:
+        """아직 쓰이지 않은 작업을 모두 취소하고 취소한 검색 수를 반환합니다."""
+        self.queries_task.cancel()
+        for task in self.searches.values():
+            task.cancel()
+        cancelled = len(self.searches)
+        self.searches.clear()
+        return cancelled
+
+
+class Speculator:
+    """validate_request 와 동시에 검색어 생성(과 앞쪽 검색)을 미리 시작하는 실행기.
+
+    - `start` 는 검색어 생성 작업을 띄우고, 검색어가 나오면 앞의 `search_count` 개 검색도
+      바로 시작합니다. 이 작업들은 노드가 끝나도 같은 이벤트 루프에서 계속 실행됩니다.
+    - 요청이 구체화 질문(refine)이나 응답 캐시 적중으로 끝나면 `discard` 로 취소합니다.
+    - generate_search_queries / web_search 노드는 `take_queries` / `take_search` 로 결과를
+      가져가고, 없으면(다른 루프, 실패, 취소) 평소처럼 직접 호출합니다.
+    """
+
+    def __init__(self):
+        # 그래프가 중간에 실패해 정리되지 못한 항목도 남지 않도록 TTL 로 정리
+        self._speculations: TTLCache[Speculation] = TTLCache(maxsize=1024, ttl=600)
+        self.metrics: Counter = Counter()
+
+    def start(
+        self,
+        speculation_id: str,
+        generate: Callable[[], Awaitable[List[str]]],
+        search: Callable[[str, int], Awaitable[Dict[str, Any]]],
+        search_count: int = 0,
+    ) -> None:
+        """검색어 생성을 시작하고, 끝나면 앞의 search_count 개 검색어로 검색을 시작합니다."""
+
+        async def run() -> List[str]:
+            # 별도 Task 의 컨텍스트이므로 원래 요청에는 영향 없고, 여기서 띄운 검색 Task 에는 이어짐
+            is_speculative.set(True)
+            queries = await generate()
+            for idx, query in enumerate(queries[:search_count]):
+                speculation.searches[normalize_query(query)] = asyncio.ensure_future(search(query, idx))
+                self.metrics["searches_started"] += 1
+            return queries
+
+        speculation = Speculation(asyncio.ensure_future(run()))
+        self._speculations.set(speculation_id, speculation)
+        self.metrics["started"] += 1
+
+    def _get(self, speculation_id: Optional[str]) -> Optional[Speculation]:
+        speculation = self._speculations.get(speculation_id) if speculation_id else None
+        if speculation is None:
+            return None
+        # 동기 invoke 경로처럼 노드마다 루프가 다르면 이전 루프의 작업은 이미 취소됨
+        if speculation.queries_task.get_loop() is not asyncio.get_running_loop():
+            self._speculations.pop(speculation_id)
+            self.metrics["lost"] += 1
+            return None
+        return speculation
+
+    async def take_queries(self, speculation_id: Optional[str]) -> Optional[List[str]]:
+        """미리 생성한 검색어. 사용할 수 없으면 None"""
+        speculation = self._get(speculation_id)
+        if speculation is None:
+            return None
+        try:
+            await asyncio.wait({speculation.queries_task})
+        except asyncio.CancelledError:
+            self.discard(speculation_id, "cancelled")
+            raise
+
+        task = speculation.queries_task
+        if task.cancelled():
+            return None
+        if task.exception() is not None:
+            logger.warning(f"[speculation] 추측 검색어 생성 실패, 다시 생성합니다: {str(task.exception())}")
+            self.metrics["failed"] += 1
+            return None
+        self.metrics["queries_used"] += 1
+        return task.result()
+
+    def take_search(self, speculation_id: Optional[str], query: str) -> Optional["asyncio.Task[Dict[str, Any]]"]:
+        """미리 시작한 검색 작업 (검색어당 한 번만 가져갈 수 있음)"""
+        speculation = self._get(speculation_id)
+        if speculation is None:
+            return None
+        task = speculation.searches.pop(normalize_query(query), None)
+        if task is not None:
+            self.metrics["searches_used"] += 1
+        return task
+
+    def discard(self, speculation_id: Optional[str], reason: str) -> None:
+        """추측 작업을 취소하고 버립니다 (refine, 응답 캐시 적중, 검증 실패 등)."""
+        speculation = self._speculations.get(speculation_id) if speculation_id else None
+        if speculation is None:
+            return
+        self._speculations.pop(speculation_id)
+        cancelled = speculation.cancel()
+        self.metrics[f"discarded_{reason}"] += 1
+        self.metrics["searches_cancelled"] += cancelled
+        logger.info(f"[speculation] 추측 작업 폐기 ({reason}) - 취소된 검색 {cancelled}개")
+
+    def finish(self, speculation_id: Optional[str]) -> None:
+        """검색 단계가 끝난 뒤 쓰이지 않은 검색 작업을 정리합니다."""
+        speculation = self._speculations.get(speculation_id) if speculation_id else None
+        if speculation is None:
+            return
+        self._speculations.pop(speculation_id)
+        self.metrics["searches_cancelled"] += speculation.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        started = self.metrics["started"]
+        return {
+            **dict(self.metrics),
+            "pending": len(self._speculations),
+            "hit_rate": round(self.metrics["queries_used"] / started, 4) if started else 0.0,
+        }
+
+
+_speculator: Optional[Speculator] = None
+
+
+def get_speculator() -> Speculator:
+    """프로세스 전역 추측 실행기를 반환합니다."""
+    global _speculator
+    if _speculator is None:
+        _speculator = Speculator()
+    return _speculator
@@ -2,14 +2,20 @@ from typing import TypedDict, List, Annotated
 from langgraph.graph import add_messages
 import operator
 
+from .sources import merge_sources
+from .turns import append_turns
+from .products import merge_products
+
 # ========== 타입 정의 ==========
 
-class Product(TypedDict):
+class Product(TypedDict, total=False):
     name: str
     source_url: str
     purchase_link: str
     review_summary: str
     price_range: str
+    source_urls: List[str]  # 병합된 모든 출처 (단축 URL)
+    mention_count: int      # 이 제품을 언급한 검색 결과 수 (순위 기준)
 
 class ProductRecommendationState(TypedDict):
     # 대화 기록 (LangGraph 표준)
@@ -19,6 +25,25 @@ class ProductRecommendationState(TypedDict):
     # 사용자 요청 분석 결과
     is_request_specific: bool
     user_intent: str
+    extracted_requirements: dict
+    
+    # 응답 캐시 적중 여부
+    answer_cache_hit: bool
+    
+    # 제품 지식 베이스에서 찾은 이번 턴 제품 수 (app/graph/product_store.py)
+    kb_product_count: int
+    
+    # 누적 대화 요약과 요약에 반영된 메시지 수 (app/graph/conversation.py)
+    conversation_summary: str
+    summarized_message_count: int
+    
+    # 멀티턴: 현재 턴 ID 와 이전 턴 요약 (app/graph/turns.py)
+    # 검색 관련 누적 키는 턴이 시작될 때 비워지고, 이전 턴은 요약만 보관됩니다.
+    turn_id: str
+    turn_archive: Annotated[list, append_turns]
+    
+    # 검증과 동시에 시작한 추측 검색어 생성 작업 ID (app/graph/speculation.py)
+    speculation_id: str
     
     # 검색 관련 데이터 (quickstart 패턴 참고)
     search_queries: Annotated[list, operator.add]
@@ -26,8 +51,8 @@ class ProductRecommendationState(TypedDict):
     web_research_result: Annotated[list, operator.add]  # 병렬 웹 검색 결과 병합
     
     # 제품 데이터
-    candidate_products: Annotated[list, operator.add]
-    sources_gathered: Annotated[list, operator.add]  # 출처 추적
+    candidate_products: Annotated[list, merge_products]  # 검색 브랜치 간 같은 제품 병합
+    sources_gathered: Annotated[list, merge_sources]  # 출처 추적 (정규화 URL 기준 중복 병합)
     
     # reflection 관련 상태
     is_sufficient: bool
@@ -26,6 +26,11 @@ class ValidationResult(BaseModel):
                 return {"raw_text": v}
         return v if isinstance(v, dict) else {}
 
+class ValidationWithQueriesResult(ValidationResult):
+    """요청 검증 + 검색어 생성 결합 스키마 (validation_mode=combined)"""
+    queries: List[str] = Field(default_factory=list, description="생성된 검색어 목록 (is_specific 이 true 인 경우만)")
+    rationale: str = Field(default="", description="검색어 선택 이유")
+
 class SearchQueryResult(BaseModel):
     """검색어 생성 결과 스키마"""
     queries: List[str] = Field(description="생성된 검색어 목록")
@@ -37,6 +42,18 @@ class ReflectionResult(BaseModel):
     additional_queries: List[str] = Field(description="추가 검색어 목록")
     gap_analysis: str = Field(description="부족한 부분 분석")
 
+class ExtractedProduct(BaseModel):
+    """검색 결과에서 추출한 제품 하나"""
+    name: str = Field(description="정확한 제품명 (브랜드 + 모델명)")
+    price_range: str = Field(default="", description="가격 또는 가격대 (예: 5만원대, 39,000원)")
+    review_summary: str = Field(default="", description="주요 특징과 사용자 평가 요약 (한 문장)")
+    source_urls: List[str] = Field(default_factory=list, description="이 제품 정보의 출처 URL (검색 결과에 있는 URL 그대로)")
+    purchase_link: str = Field(default="", description="구매 링크 (검색 결과에 있는 경우만)")
+
+class ProductExtractionResult(BaseModel):
+    """검색 결과 제품 추출 스키마"""
+    products: List[ExtractedProduct] = Field(default_factory=list, description="추천된 제품 목록")
+
 class AnswerValidationResult(BaseModel):
     """답변 검증 결과 스키마"""
     is_valid: bool = Field(description="답변이 적절한지 여부 (true/false)")
@@ -0,0 +1,148 @@
+import re
+import uuid
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from langgraph.types import Overwrite
+
+from .context_budget import _terms, count_tokens, trim_to_tokens
+
+logger = logging.getLogger(__name__)
+
+# 새 턴이 시작될 때 비우는 누적(operator.add / merge_sources) 키
+TURN_SCOPED_KEYS = (
+    "search_queries",
+    "search_results",
+    "web_research_result",
+    "candidate_products",
+    "sources_gathered",
+    "additional_queries",
+)
+
+# 스레드마다 보관하는 이전 턴 요약 수 (오래된 것부터 버림)
+MAX_ARCHIVED_TURNS = 20
+
+# 현재 요청 단어 중 이 비율 이상이 이전 턴 요약에 있어야 프롬프트에 포함
+ARCHIVE_RELEVANCE_THRESHOLD = 0.3
+
+# 리포트에서 제품명으로 보는 번호 목록 줄 ("1. **제품명 — 태그라인**")
+_PRODUCT_LINE = re.compile(r"^\s*\d+\.\s+(.+)$", re.MULTILINE)
+_MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\s*\([^)]*\)")
+
+# ========== 턴 보관 리듀서 ==========
+
+def append_turns(left: Optional[List[Dict[str, Any]]], right: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """`turn_archive` 리듀서: 이전 턴 요약을 이어 붙이고 최근 MAX_ARCHIVED_TURNS 개만 남깁니다."""
+    return [*(left or []), *(right or [])][-MAX_ARCHIVED_TURNS:]
+
+# ========== 턴 시작 / 요약 ==========
+
+def _report_products(report: str, limit: int = 5) -> List[str]:
+    """리포트의 번호 목록 줄에서 제품명(태그라인 앞부분)을 뽑습니다."""
+    products = []
+    for line in _PRODUCT_LINE.findall(report or ""):
+        name = re.split(r"\s+[—–-]\s+", line.replace("**", "").strip(), maxsplit=1)[0].strip()
+        if name and name not in products:
+            products.append(name)
+        if len(products) >= limit:
+            break
+    return products
+
+
+def summarize_turn(state: Dict[str, Any], max_tokens: int = 300) -> Optional[Dict[str, Any]]:
+    """끝난 턴의 상태를 보관용 요약으로 만듭니다. 검색·리포트까지 가지 않은 턴이면 None"""
+    report = state.get("response_to_user") or ""
+    if not report or not state.get("is_request_specific"):
+        return None
+    # 출처 링크는 sources 에 따로 남기므로 레이블만 유지
+    report = _MARKDOWN_LINK.sub(r"\1", report)
+
+    # 리포트 형식이 달라 제품명을 못 뽑으면 이번 턴에 추출한 후보 제품으로 대신함
+    products = _report_products(report) or [
+        p["name"] for p in (state.get("candidate_products") or [])[:5] if isinstance(p, dict) and p.get("name")
+    ]
+    return {
+        "turn_id": state.get("turn_id"),
+        "request": state.get("user_intent") or "",
+        "queries": list(state.get("search_queries") or []),
+        "products": products,
+        # 제품명을 못 뽑은 리포트(형식이 다른 경우)는 앞부분만 보관
+        "summary": "" if products else trim_to_tokens(report, max_tokens),
+        "sources": [
+            {"label": s.get("label"), "value": s.get("value")}
+            for s in (state.get("sources_gathered") or [])[:10]
+            if isinstance(s, dict)
+        ],
+    }
+
+
+def start_turn_update(state: Dict[str, Any]) -> Dict[str, Any]:
+    """새 사용자 메시지로 시작하는 턴의 상태 업데이트.
+
+    - 직전 턴(검색 결과, 출처, 검색어 등)을 요약해 `turn_archive` 에 보관하고
+    - 턴 범위 누적 키는 `Overwrite([])` 로 비워 이번 턴의 결과만 쌓이게 하며
+    - 새 `turn_id` 를 발급합니다.
+    """
+    update: Dict[str, Any] = {key: Overwrite([]) for key in TURN_SCOPED_KEYS}
+    update.update({
+        "turn_id": uuid.uuid4().hex,
+        "search_loop_count": 0,
+        "answer_cache_hit": False,
+        "kb_product_count": 0,
+        "response_to_user": "",
+    })
+
+    archived = summarize_turn(state) if state.get("turn_id") else None
+    if archived is not None:
+        update["turn_archive"] = [archived]
+
+    dropped = {key: len(state.get(key) or []) for key in TURN_SCOPED_KEYS if state.get(key)}
+    if dropped or archived is not None:
+        logger.info(f"[start_turn] 이전 턴 정리 - 보관: {archived is not None}, 비운 항목: {dropped}")
+    return update
+
+# ========== 관련 턴 조회 ==========
+
+def _turn_text(turn: Dict[str, Any]) -> str:
+    return " ".join([turn.get("request", ""), *turn.get("queries", []), *turn.get("products", []), turn.get("summary", "")])
+
+
+def format_turn(turn: Dict[str, Any]) -> str:
+    lines = [f"- 이전 요청: {turn.get('request') or '-'}"]
+    if turn.get("products"):
+        lines.append(f"  추천했던 제품: {', '.join(turn['products'])}")
+    elif turn.get("summary"):
+        lines.append(f"  답변 요약: {turn['summary']}")
+    return "\n".join(lines)
+
+
+def relevant_turns(
+    archive: Optional[Sequence[Dict[str, Any]]],
+    query_texts: Sequence[str],
+    max_turns: int = 2,
+    budget_tokens: int = 800,
+) -> str:
+    """현재 요청과 관련 있는 이전 턴 요약만 골라 프롬프트용 문자열로 만듭니다.
+
+    현재 요청 단어(2글자 단위)가 이전 턴의 요청·검색어·제품명에 ARCHIVE_RELEVANCE_THRESHOLD
+    비율 이상 나타나는 턴 중 최근 턴부터 max_turns 개를 토큰 예산 안에서 사용합니다.
+    관련 있는 턴이 없으면 빈 문자열을 반환합니다.
+    """
+    query_terms = _terms(" ".join(query_texts))
+    if not archive or not query_terms or max_turns <= 0:
+        return ""
+
+    selected: List[str] = []
+    used = 0
+    for turn in reversed(archive):
+        relevance = len(query_terms & _terms(_turn_text(turn))) / len(query_terms)
+        if relevance < ARCHIVE_RELEVANCE_THRESHOLD:
+            continue
+        text = format_turn(turn)
+        if used + count_tokens(text) > budget_tokens:
+            break
+        selected.append(text)
+        used += count_tokens(text)
+        if len(selected) >= max_turns:
+            break
+    return "\n".join(reversed(selected))
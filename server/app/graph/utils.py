@@ -1,6 +1,9 @@
 from typing import Any, Dict, List
 from datetime import datetime
 
+# 토큰 절약을 위한 단축 URL 접두사 (`{prefix}{session_id}-{idx}`)
+SHORT_URL_PREFIX = "https://search.google.com/ref/"
+
 
 def get_current_date() -> str:
     """현재 날짜를 한국어 형식으로 반환"""
@@ -42,7 +45,7 @@ def resolve_urls(urls_to_resolve: List[Any], session_id: int = 0) -> Dict[str, s
     Returns:
         Dict[str, str]: 원본 URL -> 단축 URL 매핑
     """
-    prefix = f"https://search.google.com/ref/"
+    prefix = SHORT_URL_PREFIX
     urls = []
     
     # URL 추출 (다양한 형태의 input 처리)
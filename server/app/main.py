@@ -1,11 +1,34 @@
-from fastapi import FastAPI
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
 import logging
 
 from app.api.v1.chat_router import router as chat_router
+from app.api.v1.job_router import router as job_router
 from app.core.config import settings
+from app.core.admission import get_admission_controller
+from app.core.metrics import CONTENT_TYPE_LATEST, render_metrics, stats_collector
+from app.graph.clients import registry as client_registry, warmup_clients
+from app.graph.answer_cache import get_answer_cache
+from app.graph.product_store import get_product_store
+from app.graph.search_cache import get_search_cache
+from app.graph.hedging import get_search_hedger
+from app.graph.speculation import get_speculator
+from app.graph.request_classifier import get_request_classifier
+from app.graph.rate_limit import get_rate_limiter
+from app.graph.graph import graph
+from app.services.chat_service import request_flights
+from app.services.job_service import get_job_service
+from app.graph.checkpointer import (
+    setup_checkpointer,
+    close_checkpointer,
+    run_checkpointer_maintenance,
+    checkpointer_stats,
+)
 
 # 환경 변수 로드
 load_dotenv()
@@ -19,11 +42,45 @@ logging.basicConfig(
     ]
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 시작/종료 시 공용 리소스를 준비하고 정리합니다."""
+    # 첫 요청이 TLS 핸드셰이크 비용을 치르지 않도록 노드별 LLM 클라이언트를 예열
+    if settings.warmup_clients:
+        await warmup_clients({
+            "validate_request": settings.validation_model,
+            "generate_search_queries": settings.search_model,
+            "reflection": settings.analysis_model,
+            "report_generation": settings.analysis_model,
+        })
+
+    # 체크포인터 준비 (Postgres 테이블 생성) 및 만료 스레드 주기적 정리
+    await setup_checkpointer(graph.checkpointer)
+    maintenance = None
+    if graph.checkpointer is not None:
+        maintenance = asyncio.create_task(
+            run_checkpointer_maintenance(graph.checkpointer, settings.checkpoint_maintenance_interval)
+        )
+
+    # 비동기 작업(/jobs) 워커 풀 시작
+    job_service = get_job_service()
+    await job_service.start()
+
+    yield
+
+    await job_service.stop()
+    if maintenance is not None:
+        maintenance.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await maintenance
+    await close_checkpointer(graph.checkpointer)
+
 # FastAPI 앱 초기화
 app = FastAPI(
     title="Product Recommendation Agent",
     description="LangGraph 기반 제품 추천 AI 에이전트",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -37,6 +94,16 @@ app.add_middleware(
 
 # API 라우터 등록
 app.include_router(chat_router, prefix="/api/v1", tags=["chat"])
+app.include_router(job_router, prefix="/api/v1", tags=["jobs"])
+
+# /metrics 에서 스크레이프 시점에 읽을 컴포넌트 통계 (대기열 깊이, 캐시 적중률)
+stats_collector.register("admission", lambda: get_admission_controller().stats())
+stats_collector.register("jobs", lambda: get_job_service().stats())
+stats_collector.register("gemini_rate_limit", lambda: get_rate_limiter().stats())
+stats_collector.register("answer_cache", lambda: get_answer_cache().stats())
+stats_collector.register("search_cache", lambda: get_search_cache().stats())
+stats_collector.register("product_store", lambda: get_product_store().stats())
+stats_collector.register("search_hedging", lambda: get_search_hedger().stats())
 
 @app.get("/")
 async def root():
@@ -48,6 +115,29 @@ async def health_check():
     """헬스 체크"""
     return {"status": "healthy"}
 
+@app.get("/stats")
+async def stats():
+    """클라이언트 재사용 및 캐시 통계"""
+    return {
+        "clients": client_registry.stats(),
+        "answer_cache": get_answer_cache().stats(),
+        "search_cache": get_search_cache().stats(),
+        "product_store": get_product_store().stats(),
+        "search_hedging": get_search_hedger().stats(),
+        "speculation": get_speculator().stats(),
+        "request_classifier": get_request_classifier().stats(),
+        "request_coalescing": request_flights.stats(),
+        "admission": get_admission_controller().stats(),
+        "gemini_rate_limit": get_rate_limiter().stats(),
+        "jobs": get_job_service().stats(),
+        "checkpointer": await checkpointer_stats(graph.checkpointer),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 지표 (노드/Gemini 호출 지연 시간, 토큰, 실행 중 그래프 수, 대기열, 캐시 적중률)"""
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
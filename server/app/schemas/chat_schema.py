@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import AliasChoices, BaseModel, Field
+from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 
 class ChatMessage(BaseModel):
@@ -40,6 +40,7 @@ class ChatResponse(BaseModel):
     processing_time: Optional[float] = Field(None, description="처리 시간 (초)")
     search_queries_used: List[str] = Field(default=[], description="사용된 검색어 목록")
     is_clarification: bool = Field(False, description="구체화 질문 여부")
+    is_cached: bool = Field(False, description="캐시된 응답 여부")
     
     class Config:
         json_schema_extra = {
@@ -54,7 +55,38 @@ class ChatResponse(BaseModel):
                 ],
                 "processing_time": 5.23,
                 "search_queries_used": ["가성비 무선 이어폰", "무선 이어폰 추천 2024"],
-                "is_clarification": False
+                "is_clarification": False,
+                "is_cached": False
+            }
+        }
+
+class BatchChatItem(BaseModel):
+    """배치 요청 항목 (eval/test_case.json 의 {"id", "query"} 형식도 그대로 받음)"""
+    id: Optional[Union[int, str]] = Field(None, description="항목 식별자 (결과에 그대로 반환)")
+    message: str = Field(
+        ...,
+        description="사용자 메시지",
+        min_length=1,
+        validation_alias=AliasChoices("message", "query"),
+    )
+
+class BatchChatRequest(BaseModel):
+    """배치 채팅 요청 스키마"""
+    items: List[BatchChatItem] = Field(..., description="처리할 메시지 목록", min_length=1, max_length=500)
+    concurrency: Optional[int] = Field(None, description="동시에 실행할 요청 수 (클라이언트별 동시 요청 한도 이하로 제한)", ge=1, le=32)
+    
+    # 선택적 설정 오버라이드 (모든 항목에 적용)
+    max_search_queries: Optional[int] = Field(None, description="최대 검색어 수", ge=1, le=10)
+    max_search_loops: Optional[int] = Field(None, description="최대 검색 루프 수", ge=1, le=5)
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"id": 1, "message": "10만원 이하 가성비 좋은 무선 이어폰 추천해줘"},
+                    {"id": 2, "message": "운동할 때 쓸 방수 기능 있는 무선 이어폰 추천"}
+                ],
+                "concurrency": 8
             }
         }
 
@@ -0,0 +1,52 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Literal
+from datetime import datetime
+
+from app.schemas.chat_schema import ChatResponse
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+class JobProgress(BaseModel):
+    """실행 중인 작업의 부분 결과"""
+    current_node: Optional[str] = Field(None, description="현재 실행 중인 노드")
+    completed_nodes: List[str] = Field(default=[], description="완료된 노드 목록 (실행 순서)")
+    search_queries: List[str] = Field(default=[], description="생성된 검색어 목록")
+    source_count: int = Field(0, description="지금까지 수집한 출처 수")
+    partial_message: str = Field("", description="생성 중인 리포트 (토큰 스트림 누적)")
+
+class JobCreateResponse(BaseModel):
+    """작업 생성 응답 스키마"""
+    job_id: str = Field(..., description="작업 ID")
+    status: JobStatus = Field(..., description="작업 상태")
+    status_url: str = Field(..., description="상태 조회 URL")
+
+class JobResponse(BaseModel):
+    """작업 상태 조회 응답 스키마"""
+    job_id: str = Field(..., description="작업 ID")
+    status: JobStatus = Field(..., description="작업 상태 (queued, running, succeeded, failed)")
+    thread_id: str = Field(..., description="대화 스레드 ID")
+    created_at: datetime = Field(..., description="작업 생성 시간")
+    started_at: Optional[datetime] = Field(None, description="작업 시작 시간")
+    finished_at: Optional[datetime] = Field(None, description="작업 종료 시간")
+    queue_position: Optional[int] = Field(None, description="대기 중인 경우 앞선 작업 수")
+    progress: JobProgress = Field(default_factory=JobProgress, description="부분 결과")
+    result: Optional[ChatResponse] = Field(None, description="최종 응답 (succeeded)")
+    error: Optional[str] = Field(None, description="오류 메시지 (failed)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "job-3f2b9c",
+                "status": "running",
+                "thread_id": "thread-1d2e3f",
+                "created_at": "2024-12-23T07:30:00",
+                "started_at": "2024-12-23T07:30:01",
+                "progress": {
+                    "current_node": "web_search",
+                    "completed_nodes": ["validate_request", "lookup_answer_cache", "generate_search_queries"],
+                    "search_queries": ["가성비 무선 이어폰", "무선 이어폰 추천 2024"],
+                    "source_count": 0,
+                    "partial_message": ""
+                }
+            }
+        }
@@ -1,25 +1,50 @@
 import time
 import uuid
+import asyncio
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator, Hashable, Optional, Tuple
 from langchain_core.runnables import RunnableConfig
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, AIMessageChunk
 
-from app.graph.graph import graph, invoke_with_logging
-from app.schemas.chat_schema import ChatRequest, ChatResponse, SourceInfo
+from app.graph.graph import graph, ainvoke_with_logging
+from app.graph.citations import CitationRewriter
+from app.graph.search_cache import normalize_query, open_batch_search_cache, close_batch_search_cache
+from app.schemas.chat_schema import ChatRequest, ChatResponse, SourceInfo, BatchChatRequest, BatchChatItem
+from app.core.cache import SingleFlight
 from app.core.config import settings
+from app.core.admission import get_admission_controller
+from app.core.metrics import track_graph_run
+from app.core.tracing import span
 
 # 로거 설정
 logger = logging.getLogger(__name__)
 
+# 스트리밍 진행 이벤트를 보내는 노드 (web_search 는 검색어별 브랜치마다 전송)
+STREAMED_NODES = (
+    "validate_request",
+    "validate_and_generate_queries",
+    "lookup_answer_cache",
+    "retrieve_products",
+    "generate_search_queries",
+    "web_search",
+    "reflection",
+    "report_generation",
+)
+
+# 동일한 단일 턴 요청을 하나의 그래프 실행으로 합치는 프로세스 전역 singleflight
+request_flights = SingleFlight()
+
 class ChatService:
     """채팅 서비스 클래스"""
     
     def __init__(self):
         self.graph = graph
     
-    async def process_chat_request(self, request: ChatRequest) -> ChatResponse:
-        """채팅 요청을 처리하고 응답을 반환합니다."""
+    async def process_chat_request(self, request: ChatRequest, search_batch_id: Optional[str] = None) -> ChatResponse:
+        """채팅 요청을 처리하고 응답을 반환합니다.
+
+        search_batch_id 가 주어지면 같은 배치의 다른 요청과 검색 결과를 공유합니다.
+        """
         
         start_time = time.time()
         
@@ -28,10 +53,10 @@ class ChatService:
             thread_id = request.thread_id or f"thread-{uuid.uuid4()}"
             
             # 설정 구성
-            config = self._create_config(request, thread_id)
+            config = self._create_config(request, thread_id, search_batch_id)
             
-            # 그래프 실행
-            result = await self._execute_graph(request.message, config)
+            # 그래프 실행 (같은 단일 턴 요청이 실행 중이면 그 결과를 함께 사용)
+            result = await self._execute_coalesced(request, config)
 
             # 응답 구성
             processing_time = time.time() - start_time
@@ -41,7 +66,198 @@ class ChatService:
             # 에러 처리
             raise self._create_error_response(str(e), f"채팅 처리 중 오류 발생: {str(e)}")
     
-    def _create_config(self, request: ChatRequest, thread_id: str) -> RunnableConfig:
+    async def process_batch_request(
+        self,
+        batch: BatchChatRequest,
+        client_key: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """여러 메시지를 `concurrency` 개씩 동시에 처리하고 끝나는 순서대로 결과를 yield 합니다.
+
+        배치 안의 요청들은 배치 전용 검색 캐시를 공유하므로, 여러 요청이 같은 검색어를
+        생성하면 Gemini 검색은 한 번만 호출됩니다. 항목 실패는 다른 항목에 영향을 주지 않습니다.
+
+        client_key 가 주어지면 실행 중인 항목마다 수락 제어 슬롯을 따로 얻으므로 배치도
+        전역 / 클라이언트별 동시 실행 한도를 넘지 않습니다. 동시 실행 수는 클라이언트별 한도로
+        제한하고, 대기 시간 초과 등으로 거절된 항목은 error 결과로 보냅니다.
+
+        - result: {"type": "result", "index", "id", "response" | "error"}
+        - summary: 마지막 한 번, 성공/실패 수와 소요 시간, 검색 중복 제거 통계
+        """
+
+        start_time = time.time()
+        batch_id = f"batch-{uuid.uuid4()}"
+        concurrency = batch.concurrency or settings.batch_concurrency
+        admission = get_admission_controller() if client_key is not None else None
+        if admission is not None and admission.per_client_limit:
+            concurrency = min(concurrency, admission.per_client_limit)
+        semaphore = asyncio.Semaphore(concurrency)
+        open_batch_search_cache(batch_id)
+        logger.info(f"배치 처리 시작: {batch_id}, {len(batch.items)}건, 동시 실행 {concurrency}")
+
+        async def run(index: int, item: BatchChatItem) -> Dict[str, Any]:
+            result: Dict[str, Any] = {"type": "result", "index": index, "id": item.id}
+            request = ChatRequest(
+                message=item.message,
+                max_search_queries=batch.max_search_queries,
+                max_search_loops=batch.max_search_loops,
+            )
+            async with semaphore:
+                try:
+                    if admission is None:
+                        response = await self.process_chat_request(request, search_batch_id=batch_id)
+                    else:
+                        async with admission.admit(client_key):
+                            response = await self.process_chat_request(request, search_batch_id=batch_id)
+                    result["response"] = response.model_dump()
+                except Exception as e:
+                    logger.error(f"배치 항목 {index} 처리 실패: {str(e)}")
+                    result["error"] = str(e)
+            return result
+
+        tasks = [asyncio.create_task(run(i, item)) for i, item in enumerate(batch.items)]
+        succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                succeeded += "response" in result
+                yield result
+        finally:
+            # 클라이언트 연결이 끊기면 남은 항목은 취소
+            for task in tasks:
+                task.cancel()
+            search_stats = close_batch_search_cache(batch_id)
+
+        yield {
+            "type": "summary",
+            "batch_id": batch_id,
+            "total": len(tasks),
+            "succeeded": succeeded,
+            "failed": len(tasks) - succeeded,
+            "concurrency": concurrency,
+            "processing_time": time.time() - start_time,
+            "search_dedup": {
+                "searches": search_stats.get("singleflight", {}).get("calls", 0),
+                "shared": search_stats.get("singleflight", {}).get("shared", 0) + search_stats.get("hits", 0),
+            },
+        }
+
+    async def stream_chat_request(self, request: ChatRequest) -> AsyncIterator[Dict[str, Any]]:
+        """채팅 요청을 처리하면서 진행 이벤트를 순서대로 yield 합니다.
+
+        이벤트는 `{"event": 이름, "data": dict}` 형태이며 다음 순서로 전송됩니다.
+        - node_start / node_end: 각 노드(및 web_search 브랜치)의 시작과 종료
+        - token: report_generation 이 생성하는 리포트 토큰
+        - done: 최종 ChatResponse (process_chat_request 응답과 동일)
+        - error: 처리 중 오류
+        """
+
+        start_time = time.time()
+        thread_id = request.thread_id or f"thread-{uuid.uuid4()}"
+        config = self._create_config(request, thread_id)
+        initial_state = {
+            "messages": [HumanMessage(content=request.message)]
+        }
+
+        # task id -> 시작 이벤트 정보 (종료 이벤트에서 web_search 브랜치를 구분하기 위함)
+        started: Dict[str, Dict[str, Any]] = {}
+        # 리포트 토큰의 단축 URL을 원본 URL로 바꾸는 재작성기 (report_generation 시작 시 생성)
+        rewriter: Optional[CitationRewriter] = None
+
+        try:
+            with track_graph_run("stream"), span("graph_run", "run", thread_id=thread_id, mode="stream"):
+                async for mode, chunk in self.graph.astream(
+                    initial_state, config, stream_mode=["tasks", "messages"]
+                ):
+                    if mode == "tasks":
+                        if chunk.get("name") == "report_generation":
+                            if "input" in chunk:
+                                rewriter = CitationRewriter((chunk.get("input") or {}).get("sources_gathered"))
+                            elif rewriter is not None:
+                                # 청크 경계 때문에 보류했던 마지막 토큰 조각을 내보냄
+                                tail = rewriter.flush()
+                                if tail:
+                                    yield {"event": "token", "data": {"content": tail}}
+                        event = self._create_task_event(chunk, started)
+                        if event:
+                            yield event
+                    elif mode == "messages":
+                        message, metadata = chunk
+                        if (
+                            isinstance(message, AIMessageChunk)
+                            and metadata.get("langgraph_node") == "report_generation"
+                            and message.content
+                        ):
+                            content = rewriter.feed(message.content) if rewriter else message.content
+                            if content:
+                                yield {"event": "token", "data": {"content": content}}
+
+            # 스트림 종료 후 체크포인트에서 최종 상태를 읽어 응답 구성
+            snapshot = await self.graph.aget_state(config)
+            processing_time = time.time() - start_time
+            response = self._create_response(snapshot.values, thread_id, processing_time)
+            yield {"event": "done", "data": response.model_dump()}
+
+        except Exception as e:
+            logger.error(f"스트리밍 처리 중 오류 발생: {str(e)}")
+            yield {"event": "error", "data": {"detail": f"채팅 처리 중 오류 발생: {str(e)}", "thread_id": thread_id}}
+
+    def _create_task_event(self, chunk: Dict[str, Any], started: Dict[str, Dict[str, Any]]) -> Dict[str, Any] | None:
+        """LangGraph `tasks` 스트림 항목을 node_start / node_end 이벤트로 변환합니다."""
+
+        name = chunk.get("name")
+        if name not in STREAMED_NODES:
+            return None
+
+        data: Dict[str, Any] = {"node": name}
+
+        if "input" in chunk:
+            # 태스크 시작
+            task_input = chunk.get("input") or {}
+            if name == "web_search" and isinstance(task_input, dict):
+                data["search_id"] = task_input.get("id")
+                data["search_query"] = task_input.get("search_query")
+            started[chunk["id"]] = data
+            return {"event": "node_start", "data": data}
+
+        # 태스크 종료
+        data.update(started.pop(chunk["id"], {}))
+        data["error"] = str(chunk["error"]) if chunk.get("error") else None
+        result = chunk.get("result") or {}
+        if isinstance(result, dict):
+            data.update(self._summarize_node_result(name, result))
+        return {"event": "node_end", "data": data}
+
+    def _summarize_node_result(self, name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """노드 결과 중 진행 상황 표시에 필요한 요약 정보만 추출합니다."""
+
+        if name == "validate_request":
+            return {"is_request_specific": result.get("is_request_specific", False)}
+        if name == "lookup_answer_cache":
+            return {"hit": result.get("answer_cache_hit", False)}
+        if name == "retrieve_products":
+            return {"product_count": result.get("kb_product_count", 0)}
+        if name == "validate_and_generate_queries":
+            return {
+                "is_request_specific": result.get("is_request_specific", False),
+                "search_queries": result.get("search_queries", []),
+            }
+        if name == "generate_search_queries":
+            return {"search_queries": result.get("search_queries", [])}
+        if name == "web_search":
+            return {
+                "source_count": len(result.get("sources_gathered", []) or []),
+                "product_count": len(result.get("candidate_products", []) or []),
+            }
+        if name == "reflection":
+            return {"is_sufficient": result.get("is_sufficient", False)}
+        return {}
+
+    def _create_config(
+        self,
+        request: ChatRequest,
+        thread_id: str,
+        search_batch_id: Optional[str] = None,
+    ) -> RunnableConfig:
         """그래프 실행을 위한 설정을 생성합니다."""
         
         # 기본 설정에서 시작
@@ -51,8 +267,12 @@ class ChatService:
             "analysis_model": settings.analysis_model,
             "max_search_queries": request.max_search_queries or settings.max_search_queries,
             "max_search_loops": request.max_search_loops or settings.max_search_loops,
+            "required_search_results": settings.required_search_results,
+            "search_timeout": settings.search_timeout,
             "thread_id": thread_id,  # Checkpointer가 인식할 수 있도록 추가
         }
+        if search_batch_id:
+            configurable["search_batch_id"] = search_batch_id
         
         config = RunnableConfig(
             configurable=configurable,
@@ -61,6 +281,54 @@ class ChatService:
         
         return config
     
+    def _coalescing_key(self, request: ChatRequest) -> Hashable:
+        """단일 턴 요청 병합 키 (정규화된 메시지 + 설정 오버라이드)"""
+        return (
+            normalize_query(request.message),
+            request.max_search_queries or settings.max_search_queries,
+            request.max_search_loops or settings.max_search_loops,
+        )
+
+    async def _is_new_thread(self, request: ChatRequest, config: RunnableConfig) -> bool:
+        """이전 대화가 없는 스레드인지 확인합니다. 멀티턴 요청은 병합하지 않습니다."""
+        if not request.thread_id:
+            return True
+        if self.graph.checkpointer is None:
+            return False
+        snapshot = await self.graph.aget_state(config)
+        return not snapshot.values
+
+    async def _execute_coalesced(self, request: ChatRequest, config: RunnableConfig) -> Dict[str, Any]:
+        """동일한 단일 턴 요청이 실행 중이면 새로 실행하지 않고 그 결과를 기다립니다.
+
+        프론트엔드 재시도나 같은 인기 질문이 동시에 들어올 때 그래프를 한 번만 실행합니다.
+        결과를 받은 후속 요청은 자신의 스레드에 최종 상태를 기록하므로 이후 멀티턴 대화를
+        그대로 이어갈 수 있습니다.
+        """
+        if not settings.coalesce_requests or not await self._is_new_thread(request, config):
+            return await self._execute_graph(request.message, config)
+
+        thread_id = config["configurable"]["thread_id"]
+
+        async def run() -> Tuple[str, Dict[str, Any]]:
+            return thread_id, await self._execute_graph(request.message, config)
+
+        leader_thread_id, result = await request_flights.do(self._coalescing_key(request), run)
+        if leader_thread_id != thread_id:
+            logger.info(f"동일 요청 실행 결과 공유: {leader_thread_id} -> {thread_id}")
+            await self._seed_thread(config, result)
+        return result
+
+    async def _seed_thread(self, config: RunnableConfig, values: Dict[str, Any]) -> None:
+        """병합된 요청의 스레드에 공유받은 최종 상태를 report_generation 결과로 기록합니다."""
+        if self.graph.checkpointer is None:
+            return
+        try:
+            await self.graph.aupdate_state(config, values, as_node="report_generation")
+        except Exception as e:
+            # 응답은 이미 있으므로 다음 턴에서 문맥만 잃고 요청은 성공시킴
+            logger.warning(f"병합된 요청의 스레드 상태 기록 실패: {str(e)}")
+
     async def _execute_graph(self, message: str, config: RunnableConfig) -> Dict[str, Any]:
         """그래프를 실행하고 결과를 반환합니다."""
         
@@ -69,8 +337,9 @@ class ChatService:
             "messages": [HumanMessage(content=message)]
         }
         
-        # stream_log 기반 실행 (invoke_with_logging 사용)
-        result = invoke_with_logging(initial_state, config)
+        # 비동기 실행 (graph.ainvoke) - 이벤트 루프를 막지 않아 요청이 동시에 처리됩니다.
+        with track_graph_run("invoke"):
+            result = await ainvoke_with_logging(initial_state, config)
         
         return result
     
@@ -92,9 +361,10 @@ class ChatService:
         
         # 구체화 질문 여부 확인
         is_clarification = result.get("is_clarification_question", False)
+        is_cached = result.get("answer_cache_hit", False)
         
         # 출처 정보 추출
-        sources = self._extract_sources(result)
+        sources = self._extract_sources(result, last_message)
         
         # 사용된 검색어 추출
         search_queries_used = result.get("search_queries", [])
@@ -107,11 +377,16 @@ class ChatService:
             sources=sources,
             processing_time=processing_time,
             search_queries_used=search_queries_used,
-            is_clarification=is_clarification
+            is_clarification=is_clarification,
+            is_cached=is_cached
         )
     
-    def _extract_sources(self, result: Dict[str, Any]) -> List[SourceInfo]:
-        """결과에서 출처 정보를 추출합니다."""
+    def _extract_sources(self, result: Dict[str, Any], message: Optional[str] = None) -> List[SourceInfo]:
+        """결과에서 출처 정보를 추출합니다.
+
+        sources_gathered 에는 검색 단계에서 모은 출처가 모두 남아 있으므로, 최종 응답
+        메시지가 주어지면 그 메시지에 실제로 인용된 출처만 반환합니다.
+        """
         
         try:
             sources = []
@@ -122,11 +397,12 @@ class ChatService:
             
             for source in sources_gathered:
                 if isinstance(source, dict):
-                    title = source.get("title", "제목 없음")
-                    url = source.get("url", "")
+                    # 출처 형식: {"label", "short_url", "value"(원본 URL)}
+                    title = source.get("label") or "제목 없음"
+                    url = source.get("value", "")
                     short_url = source.get("short_url")
                     
-                    if url:  # URL이 있는 경우만 추가
+                    if url and (not message or url in message):  # 응답에 인용된 URL만 추가
                         sources.append(SourceInfo(
                             title=title,
                             url=url,
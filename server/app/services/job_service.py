@@ -0,0 +1,319 @@
+import json
+import time
+import uuid
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.admission import AdmissionRejected, get_admission_controller
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.chat_schema import ChatRequest
+from app.services.chat_service import ChatService
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# ========== 작업 저장소 ==========
+
+class InMemoryJobStore:
+    """프로세스 메모리 작업 저장소 (TTL + 최대 개수 제한, 재시작 시 사라짐)"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._jobs: TTLCache[Dict[str, Any]] = TTLCache(maxsize=max_entries, ttl=ttl)
+
+    async def setup(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+
+    async def put(self, job: Dict[str, Any]) -> None:
+        # 갱신할 때마다 TTL 이 다시 시작되어, 완료 시점부터 ttl 동안 보관됩니다.
+        self._jobs.set(job["job_id"], job)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self._jobs.stats()}
+
+
+class PostgresJobStore:
+    """Postgres 작업 저장소 (docker-compose 의 postgres 서비스)
+
+    서버 재시작이나 다른 인스턴스에서도 작업 상태와 결과를 조회할 수 있습니다.
+    만료 시각(expires_at)이 지난 작업은 새 작업을 만들 때 함께 정리합니다.
+    """
+
+    def __init__(self, database_url: str, ttl: float):
+        try:
+            from psycopg_pool import AsyncConnectionPool
+        except ImportError as e:
+            raise ImportError(
+                "Postgres 작업 저장소에는 psycopg[binary,pool] 패키지가 필요합니다."
+            ) from e
+
+        self.ttl = ttl
+        self._pool = AsyncConnectionPool(database_url, open=False, kwargs={"autocommit": True})
+
+    async def setup(self) -> None:
+        await self._pool.open()
+        async with self._pool.connection() as conn:
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chat_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    record JSONB NOT NULL,
+                    expires_at TIMESTAMPTZ NOT NULL
+                )
+                """
+            )
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        async with self._pool.connection() as conn:
+            cur = await conn.execute(
+                "SELECT record FROM chat_jobs WHERE job_id = %s AND expires_at > now()",
+                (job_id,),
+            )
+            row = await cur.fetchone()
+        if not row:
+            return None
+        return row[0] if isinstance(row[0], dict) else json.loads(row[0])
+
+    async def put(self, job: Dict[str, Any]) -> None:
+        async with self._pool.connection() as conn:
+            await conn.execute(
+                """
+                INSERT INTO chat_jobs (job_id, record, expires_at)
+                VALUES (%s, %s::jsonb, now() + make_interval(secs => %s))
+                ON CONFLICT (job_id) DO UPDATE SET
+                    record = EXCLUDED.record,
+                    expires_at = EXCLUDED.expires_at
+                """,
+                (job["job_id"], json.dumps(job, ensure_ascii=False, default=str), self.ttl),
+            )
+            if job["status"] == "queued":
+                await conn.execute("DELETE FROM chat_jobs WHERE expires_at <= now()")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "postgres", "ttl": self.ttl}
+
+
+def create_job_store():
+    """설정(JOB_STORE_BACKEND)에 맞는 작업 저장소를 생성합니다."""
+    if settings.job_store_backend == "postgres":
+        if not settings.database_url:
+            raise ValueError("job_store_backend=postgres 에는 DATABASE_URL/POSTGRES_URL 설정이 필요합니다.")
+        return PostgresJobStore(settings.database_url, ttl=settings.job_ttl)
+    return InMemoryJobStore(max_entries=settings.job_max_entries, ttl=settings.job_ttl)
+
+# ========== 작업 실행 ==========
+
+# 수락 제어기에서 작업 워커가 쓰는 클라이언트 키. 작업도 `/chat` 요청과 같은 전역 실행 한도를 나눠 씁니다.
+JOB_CLIENT_KEY = "jobs"
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+class JobService:
+    """오래 걸리는 추천 요청을 백그라운드 워커 풀에서 실행하는 작업 서비스.
+
+    - `submit` 은 작업을 대기열에 넣고 바로 반환합니다. 대기열이 가득 차면 503.
+    - `workers` 개의 워커가 대기열에서 작업을 꺼내 그래프를 실행합니다. 클라이언트 연결과
+      무관하게 실행되므로 연결이 끊겨도 결과는 저장소에 남습니다.
+    - 그래프 실행 전에 수락 제어 슬롯(`JOB_CLIENT_KEY`)을 얻으므로, 작업은 전역 동시 실행
+      한도 안에서만 실행되고 동시에 실행되는 작업 수는 클라이언트별 한도를 넘지 않습니다.
+    - 실행 중에는 노드 진행 상황과 생성 중인 리포트를 부분 결과로 저장합니다.
+    """
+
+    def __init__(self, store, workers: int = 4, max_queue: int = 100, progress_interval: float = 1.0):
+        self.store = store
+        self.workers = workers
+        self.max_queue = max_queue
+        self.progress_interval = progress_interval
+        self.chat_service = ChatService()
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._queued_ids: Deque[str] = deque()
+        self._requests: Dict[str, ChatRequest] = {}
+        self._running: Dict[str, Dict[str, Any]] = {}
+        self._worker_tasks: List[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+
+    # ---------- 수명 주기 ----------
+
+    async def start(self) -> None:
+        await self.store.setup()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}") for i in range(self.workers)
+        ]
+        logger.info(f"[jobs] 작업 워커 {self.workers}개 시작")
+
+    async def stop(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        for task in self._worker_tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._worker_tasks = []
+        await self.store.close()
+
+    # ---------- API ----------
+
+    async def submit(self, request: ChatRequest) -> Dict[str, Any]:
+        """작업을 만들고 대기열에 넣습니다."""
+        if len(self._queued_ids) >= self.max_queue:
+            raise AdmissionRejected(503, "작업 대기열이 가득 찼습니다.", max(1, len(self._queued_ids) // self.workers))
+
+        job_id = f"job-{uuid.uuid4()}"
+        # 클라이언트가 결과를 받은 뒤 같은 스레드로 대화를 이어갈 수 있도록 스레드 ID를 미리 정함
+        request = request.model_copy(update={"thread_id": request.thread_id or f"thread-{uuid.uuid4()}"})
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "thread_id": request.thread_id,
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "progress": {},
+            "result": None,
+            "error": None,
+        }
+        await self.store.put(job)
+        self._requests[job_id] = request
+        self._queued_ids.append(job_id)
+        self._queue.put_nowait(job_id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태를 반환합니다. 이 프로세스에서 실행 중이면 최신 부분 결과를 반환합니다."""
+        job = self._running.get(job_id) or await self.store.get(job_id)
+        if job is None:
+            return None
+        if job["status"] == "queued" and job_id in self._queued_ids:
+            job = {**job, "queue_position": self._queued_ids.index(job_id)}
+        return job
+
+    # ---------- 워커 ----------
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[jobs] 워커 {index} 작업 {job_id} 처리 중 오류: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _admit(self, admission) -> float:
+        """수락 제어 슬롯을 얻을 때까지 기다립니다 (그동안 작업은 대기 상태로 남음).
+
+        대기열 포화·대기 시간 초과로 거절되면 작업을 실패시키지 않고 Retry-After 만큼 쉬었다가 다시 시도합니다.
+        """
+        while True:
+            try:
+                return await admission.acquire(JOB_CLIENT_KEY)
+            except AdmissionRejected as e:
+                logger.info(f"[jobs] 실행 슬롯 대기 ({e.detail}), {e.retry_after}초 후 재시도")
+                await asyncio.sleep(e.retry_after)
+
+    async def _run_job(self, job_id: str) -> None:
+        admission = get_admission_controller()
+        started_at = await self._admit(admission)
+        try:
+            await self._execute_job(job_id)
+        finally:
+            admission.release(JOB_CLIENT_KEY, started_at)
+
+    async def _execute_job(self, job_id: str) -> None:
+        self._queued_ids.remove(job_id)
+        request = self._requests.pop(job_id)
+        job = await self.store.get(job_id)
+        if job is None:
+            logger.warning(f"[jobs] 만료된 작업 건너뜀: {job_id}")
+            return
+
+        job.update(status="running", started_at=_now())
+        progress = job["progress"] = {
+            "current_node": None,
+            "completed_nodes": [],
+            "search_queries": [],
+            "source_count": 0,
+            "partial_message": "",
+        }
+        self._running[job_id] = job
+        await self.store.put(job)
+        last_saved = time.monotonic()
+
+        try:
+            async for event in self.chat_service.stream_chat_request(request):
+                name, data = event["event"], event["data"]
+                if name == "node_start":
+                    progress["current_node"] = data["node"]
+                elif name == "node_end":
+                    progress["completed_nodes"].append(data["node"])
+                    progress["search_queries"].extend(data.get("search_queries", []))
+                    progress["source_count"] += data.get("source_count", 0)
+                elif name == "token":
+                    progress["partial_message"] += data["content"]
+                elif name == "done":
+                    job.update(status="succeeded", result=data)
+                elif name == "error":
+                    job.update(status="failed", error=data["detail"])
+
+                # 부분 결과는 progress_interval 마다 저장 (토큰마다 쓰지 않음)
+                if time.monotonic() - last_saved >= self.progress_interval:
+                    await self.store.put(job)
+                    last_saved = time.monotonic()
+        except asyncio.CancelledError:
+            job.update(status="failed", error="서버 종료로 작업이 중단되었습니다.")
+            raise
+        finally:
+            if job["status"] == "running":
+                job.update(status="failed", error="작업이 결과 없이 종료되었습니다.")
+            progress["current_node"] = None
+            job["finished_at"] = _now()
+            if job["status"] == "succeeded":
+                self.completed += 1
+            else:
+                self.failed += 1
+            await asyncio.shield(self.store.put(job))
+            self._running.pop(job_id, None)
+            logger.info(f"[jobs] 작업 종료: {job_id} ({job['status']})")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queued": len(self._queued_ids),
+            "running": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+            "store": self.store.stats(),
+        }
+
+
+_job_service: Optional[JobService] = None
+
+
+def get_job_service() -> JobService:
+    """프로세스 전역 작업 서비스를 반환합니다."""
+    global _job_service
+    if _job_service is None:
+        _job_service = JobService(
+            create_job_store(),
+            workers=settings.job_workers,
+            max_queue=settings.job_max_queue,
+        )
+    return _job_service
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+동시 채팅 처리 벤치마크
+
+ChatService 를 프로세스 내에서 직접 호출하여, 요청 1개를 처리하는 시간과
+N개를 동시에 처리하는 시간을 비교합니다. 그래프가 비동기(graph.ainvoke)로
+실행되므로 N개 동시 처리 시간은 1개 처리 시간과 비슷해야 합니다.
+
+Usage:
+    python benchmark_concurrency.py            # 기본 5개 동시 요청
+    python benchmark_concurrency.py -n 10
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# 프로젝트 경로 추가 (server/)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# 환경 변수 로드
+load_dotenv()
+
+from app.schemas.chat_schema import ChatRequest
+from app.services.chat_service import ChatService
+
+
+def load_queries(n: int) -> list:
+    """test_case.json 에서 앞의 n개 쿼리를 읽어옵니다."""
+    test_case_file = Path(__file__).resolve().parent / "test_case.json"
+    with open(test_case_file, "r", encoding="utf-8") as f:
+        test_cases = json.load(f)
+    return [case["query"] for case in test_cases[:n]]
+
+
+async def timed_request(service: ChatService, query: str) -> float:
+    """요청 1개를 처리하고 소요 시간(초)을 반환합니다."""
+    start = time.perf_counter()
+    await service.process_chat_request(ChatRequest(message=query))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="동시 채팅 처리 벤치마크")
+    parser.add_argument("-n", "--concurrency", type=int, default=5, help="동시 요청 수")
+    args = parser.parse_args()
+
+    service = ChatService()
+    queries = load_queries(args.concurrency)
+
+    print("🔧 동시 채팅 처리 벤치마크 시작")
+    print("=" * 60)
+
+    # 1) 단일 요청 기준 시간
+    single = await timed_request(service, queries[0])
+    print(f"⏱️  단일 요청: {single:.2f}초")
+
+    # 2) N개 동시 요청
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed_request(service, q) for q in queries))
+    wall = time.perf_counter() - start
+
+    print(f"⏱️  동시 요청 {len(queries)}개: 전체 {wall:.2f}초 "
+          f"(개별 평균 {sum(latencies) / len(latencies):.2f}초, 최대 {max(latencies):.2f}초)")
+    print(f"📊 동시 처리 배율 (전체 / 단일): {wall / single:.2f}x "
+          f"- 순차 실행이었다면 약 {len(queries):.0f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+추측 검색어 생성 지연 시간 벤치마크
+
+같은 쿼리를 순차 경로(검증 → 검색어 생성)와 추측 경로(검증과 검색어 생성 동시 시작)로
+번갈아 실행하여 전체 처리 시간을 비교합니다. 캐시 영향을 없애기 위해 응답 캐시와
+검색 캐시는 끄고, 매 실행마다 새 스레드를 사용합니다.
+
+Usage:
+    python benchmark_speculation.py                 # 기본 5개 쿼리
+    python benchmark_speculation.py -n 10 --searches 2
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# 프로젝트 경로 추가 (server/)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# 환경 변수 로드
+load_dotenv()
+
+from langchain_core.messages import HumanMessage
+
+from app.core.config import settings
+from app.graph.graph import graph
+from app.graph.speculation import get_speculator
+
+
+def load_queries(n: int) -> list:
+    """test_case.json 에서 앞의 n개 쿼리를 읽어옵니다."""
+    test_case_file = Path(__file__).resolve().parent / "test_case.json"
+    with open(test_case_file, "r", encoding="utf-8") as f:
+        test_cases = json.load(f)
+    return [case["query"] for case in test_cases[:n]]
+
+
+async def timed_run(query: str, speculative: bool, search_count: int) -> float:
+    """그래프를 한 번 실행하고 소요 시간(초)을 반환합니다."""
+    thread_id = f"bench-{uuid.uuid4()}"
+    config = {
+        "configurable": {
+            "thread_id": thread_id,
+            "validation_model": settings.validation_model,
+            "search_model": settings.search_model,
+            "analysis_model": settings.analysis_model,
+            "use_answer_cache": False,
+            "use_search_cache": False,
+            "use_speculative_queries": speculative,
+            "speculative_search_count": search_count,
+        }
+    }
+    start = time.perf_counter()
+    await graph.ainvoke({"messages": [HumanMessage(content=query)]}, config=config)
+    return time.perf_counter() - start
+
+
+def summarize(label: str, latencies: list) -> None:
+    print(f"  {label:<10} 평균 {statistics.mean(latencies):6.2f}초 | "
+          f"중앙값 {statistics.median(latencies):6.2f}초 | 최대 {max(latencies):6.2f}초")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="추측 검색어 생성 지연 시간 벤치마크")
+    parser.add_argument("-n", "--queries", type=int, default=5, help="실행할 쿼리 수")
+    parser.add_argument("--searches", type=int, default=0, help="추측 경로에서 미리 시작할 검색 수")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+
+    print("🔧 추측 검색어 생성 벤치마크 시작")
+    print("=" * 60)
+
+    serial, speculative = [], []
+    for i, query in enumerate(queries, 1):
+        # 순서에 따른 편향(레이트 리밋, 커넥션 예열)을 줄이기 위해 번갈아 먼저 실행
+        runs = [(False, serial), (True, speculative)]
+        if i % 2 == 0:
+            runs.reverse()
+        for is_speculative, latencies in runs:
+            latencies.append(await timed_run(query, is_speculative, args.searches))
+        print(f"[{i}/{len(queries)}] {query[:30]:<30} 순차 {serial[-1]:6.2f}초 / 추측 {speculative[-1]:6.2f}초")
+
+    print("=" * 60)
+    summarize("순차", serial)
+    summarize("추측", speculative)
+    saved = statistics.mean(serial) - statistics.mean(speculative)
+    print(f"📊 평균 단축: {saved:.2f}초 ({saved / statistics.mean(serial) * 100:.1f}%)")
+    print(f"📊 추측 실행 통계: {json.dumps(get_speculator().stats(), ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
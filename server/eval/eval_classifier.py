@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+로컬 요청 분류기 vs LLM 검증 일치율 평가
+
+test_case.json 의 각 쿼리를 로컬 분류기(app/graph/request_classifier.py)와
+validate_request 의 LLM 검증으로 각각 판단하여 `is_specific` 일치율을 계산합니다.
+
+- 로컬 처리율: 신뢰도가 threshold 이상이라 LLM 호출을 건너뛰는 비율
+- 로컬 처리 일치율: 로컬 처리한 요청 중 LLM 과 판단이 같은 비율 (실제 품질 지표)
+- 전체 일치율: 신뢰도와 무관하게 분류기 판단이 LLM 과 같은 비율
+
+Usage:
+    python eval_classifier.py
+    python eval_classifier.py --threshold 0.9 --output results/classifier_agreement.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# 프로젝트 경로 추가 (server/)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# 환경 변수 로드
+load_dotenv()
+
+from app.core.config import settings
+from app.graph.clients import get_node_chat_model
+from app.graph.prompts import get_validation_prompt
+from app.graph.rate_limit import ainvoke_structured
+from app.graph.request_classifier import RequestClassifier
+from app.graph.tools_and_schemas import ValidationResult
+
+
+async def llm_validate(query: str) -> bool:
+    """validate_request 노드와 같은 프롬프트/모델로 구체성을 판단합니다."""
+    llm = get_node_chat_model("validate_request", settings.validation_model)
+    result = await ainvoke_structured(
+        "validate_request", settings.validation_model, llm, ValidationResult, get_validation_prompt(query)
+    )
+    return result.is_specific
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="로컬 요청 분류기 vs LLM 검증 일치율 평가")
+    parser.add_argument("--threshold", type=float, default=0.85, help="로컬 분류 결과를 사용할 최소 신뢰도")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    test_case_file = Path(__file__).resolve().parent / "test_case.json"
+    with open(test_case_file, "r", encoding="utf-8") as f:
+        test_cases = json.load(f)
+
+    classifier = RequestClassifier()
+    llm_results = await asyncio.gather(*(llm_validate(case["query"]) for case in test_cases))
+
+    rows = []
+    for case, llm_specific in zip(test_cases, llm_results):
+        local = classifier.classify(case["query"])
+        rows.append({
+            "id": case["id"],
+            "query": case["query"],
+            "llm_is_specific": llm_specific,
+            "local_is_specific": local.is_specific,
+            "confidence": local.confidence,
+            "used_locally": local.confidence >= args.threshold,
+            "agree": local.is_specific == llm_specific,
+            "reason": local.reason,
+        })
+
+    local_rows = [r for r in rows if r["used_locally"]]
+    summary = {
+        "total": len(rows),
+        "threshold": args.threshold,
+        "local_rate": round(len(local_rows) / len(rows), 4),
+        "local_agreement": round(sum(r["agree"] for r in local_rows) / len(local_rows), 4) if local_rows else None,
+        "overall_agreement": round(sum(r["agree"] for r in rows) / len(rows), 4),
+    }
+
+    print("🔧 로컬 요청 분류기 일치율 평가")
+    print("=" * 60)
+    for r in rows:
+        mark = "✅" if r["agree"] else "❌"
+        path = "로컬" if r["used_locally"] else "LLM "
+        print(f"{mark} [{path}] LLM={r['llm_is_specific']!s:<5} 로컬={r['local_is_specific']!s:<5} "
+              f"({r['confidence']:.2f}) {r['query']}")
+    print("=" * 60)
+    print(f"📊 로컬 처리율: {summary['local_rate'] * 100:.1f}% ({len(local_rows)}/{len(rows)})")
+    if summary["local_agreement"] is not None:
+        print(f"📊 로컬 처리 일치율: {summary['local_agreement'] * 100:.1f}%")
+    print(f"📊 전체 일치율: {summary['overall_agreement'] * 100:.1f}%")
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "results": rows}, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+import asyncio
+import importlib
+
+import pytest
+
+from app.core import admission as admission_module
+from app.core.admission import AdmissionController, AdmissionRejected
+from app.schemas.chat_schema import BatchChatRequest
+
+
+async def hold(controller: AdmissionController, key: str, event: asyncio.Event):
+    async with controller.admit(key):
+        await event.wait()
+
+
+class TestAdmissionController:
+    """수락 제어 / 대기열 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_queue_then_admit_in_order(self):
+        controller = AdmissionController(max_concurrent=1, max_queue=2, per_client_limit=0)
+        release = asyncio.Event()
+        order = []
+
+        async def run(key):
+            async with controller.admit(key):
+                order.append(key)
+                await release.wait()
+
+        tasks = [asyncio.create_task(run(k)) for k in ("a", "b", "c")]
+        await asyncio.sleep(0.01)
+        assert controller.stats()["active"] == 1
+        assert controller.stats()["queued"] == 2
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b", "c"]
+        assert controller.stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_with_503(self):
+        controller = AdmissionController(max_concurrent=1, max_queue=1, per_client_limit=0)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(hold(controller, k, release)) for k in ("a", "b")]
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as e:
+            await controller.acquire("c")
+        assert e.value.status_code == 503
+        assert e.value.retry_after >= 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    @pytest.mark.asyncio
+    async def test_per_client_limit_rejects_with_429(self):
+        controller = AdmissionController(max_concurrent=10, per_client_limit=1)
+        release = asyncio.Event()
+        task = asyncio.create_task(hold(controller, "a", release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as e:
+            await controller.acquire("a")
+        assert e.value.status_code == 429
+        await controller.acquire("b")  # 다른 클라이언트는 영향 없음
+
+        release.set()
+        await task
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_frees_waiter(self):
+        controller = AdmissionController(max_concurrent=1, queue_timeout=0.05, per_client_limit=0)
+        release = asyncio.Event()
+        task = asyncio.create_task(hold(controller, "a", release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("b")
+        assert controller.stats()["queued"] == 0
+
+        release.set()
+        await task
+        assert controller.stats()["active"] == 0
+
+
+class TestBatchAdmission:
+    """배치 요청의 항목별 수락 제어 테스트"""
+
+    @pytest.fixture
+    def chat_service(self, monkeypatch):
+        # 서비스 import 시 그래프를 만들기만 하고 Gemini 는 호출하지 않으므로 임의의 키로 충분
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+        return importlib.import_module("app.services.chat_service").ChatService()
+
+    @pytest.mark.asyncio
+    async def test_batch_cannot_exceed_max_concurrent(self, chat_service, monkeypatch):
+        controller = AdmissionController(max_concurrent=2, max_queue=100, per_client_limit=0)
+        monkeypatch.setattr(admission_module, "_admission", controller)
+        running, peak = 0, 0
+
+        async def fake_process(request, search_batch_id=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running, controller.stats()["active"])
+            await asyncio.sleep(0.01)
+            running -= 1
+            raise RuntimeError("skip")
+
+        monkeypatch.setattr(chat_service, "process_chat_request", fake_process)
+        batch = BatchChatRequest(items=[{"message": f"요청 {i}"} for i in range(10)], concurrency=8)
+        results = [r async for r in chat_service.process_batch_request(batch, client_key="a")]
+
+        assert peak == 2
+        assert results[-1]["total"] == 10
+        assert controller.stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_concurrency_is_capped_by_client_limit(self, chat_service, monkeypatch):
+        controller = AdmissionController(max_concurrent=10, per_client_limit=3)
+        monkeypatch.setattr(admission_module, "_admission", controller)
+
+        async def fake_process(request, search_batch_id=None):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("skip")
+
+        monkeypatch.setattr(chat_service, "process_chat_request", fake_process)
+        batch = BatchChatRequest(items=[{"message": f"요청 {i}"} for i in range(6)], concurrency=8)
+        results = [r async for r in chat_service.process_batch_request(batch, client_key="a")]
+
+        # 한도를 넘는 항목이 429 로 실패하지 않고 순서대로 실행됨
+        assert all(r.get("error") == "skip" for r in results[:-1])
+        assert results[-1]["concurrency"] == 3
+        assert controller.stats()["rejected_client"] == 0
+
+
+class TestStreamAdmission:
+    """스트리밍 응답의 슬롯 반납 테스트"""
+
+    @pytest.fixture
+    def router_module(self, monkeypatch):
+        # 라우터 import 시 그래프를 만들기만 하고 Gemini 는 호출하지 않으므로 임의의 키로 충분
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+        return importlib.import_module("app.api.v1.chat_router")
+
+    @pytest.mark.asyncio
+    async def test_slot_released_when_client_disconnects_before_body(self, router_module):
+        controller = AdmissionController(max_concurrent=1, per_client_limit=0)
+        started_at = await controller.acquire("a")
+        release = controller.releaser("a", started_at)
+        body_started = False
+
+        async def body():
+            nonlocal body_started
+            body_started = True
+            yield "data: {}\n\n"
+
+        async def disconnected_send(message):
+            raise OSError("client disconnected")
+
+        response = router_module.AdmittedStreamingResponse(body(), release=release)
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+        with pytest.raises(Exception):
+            await response(scope, None, disconnected_send)
+
+        assert not body_started
+        assert controller.stats()["active"] == 0
+
+        release()  # 여러 경로에서 불려도 한 번만 반납
+        assert controller.stats()["active"] == 0
+        assert controller.stats()["clients"] == 0
@@ -0,0 +1,165 @@
+import time
+import importlib
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.core.cache import TTLCache
+from app.graph.answer_cache import (
+    AnswerCache,
+    InMemoryAnswerCacheBackend,
+    canonicalize_requirements,
+)
+from app.graph.embeddings import HashingEmbedder
+from app.graph.utils import SHORT_URL_PREFIX
+
+
+def make_cache(max_entries: int = 10, ttl: float = 60.0, threshold: float = 0.8) -> AnswerCache:
+    backend = InMemoryAnswerCacheBackend(max_entries=max_entries, ttl=ttl)
+    return AnswerCache(backend, HashingEmbedder(), similarity_threshold=threshold)
+
+
+class TestCanonicalizeRequirements:
+    """요구사항 정규화 테스트"""
+
+    def test_key_aliases_and_order(self):
+        a = canonicalize_requirements({"category": "무선 이어폰", "예산": "10만 원 이하"})
+        b = canonicalize_requirements({"예산": "10만원  이하", "카테고리": "무선 이어폰"})
+        assert a == b == "예산=10만원 이하|카테고리=무선 이어폰"
+
+    def test_intent_is_ignored(self):
+        a = canonicalize_requirements({"카테고리": "키보드", "intent": "게이밍 키보드 찾기"})
+        b = canonicalize_requirements({"카테고리": "키보드", "intent": "게임용 키보드 추천 요청"})
+        assert a == b
+
+    def test_empty_requirements(self):
+        assert canonicalize_requirements({}) == ""
+        assert canonicalize_requirements(None) == ""
+
+
+class TestAnswerCache:
+    """응답 캐시 테스트 (in-process 백엔드)"""
+
+    @pytest.mark.asyncio
+    async def test_exact_hit(self):
+        cache = make_cache()
+        requirements = {"카테고리": "무선 이어폰", "예산": "10만원 이하", "용도": "가성비"}
+        await cache.store(requirements, "리포트", [{"short_url": "s", "value": "v"}])
+
+        cached = await cache.lookup(dict(requirements))
+        assert cached["report"] == "리포트"
+        assert cached["sources_gathered"] == [{"short_url": "s", "value": "v"}]
+        assert cached["similarity"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_semantic_hit(self):
+        cache = make_cache()
+        await cache.store({"카테고리": "무선 이어폰", "예산": "10만원 이하", "선호": "가볍고 편한 착용감"}, "리포트", [])
+
+        cached = await cache.lookup({"카테고리": "무선이어폰", "예산": "10만원 이하", "선호": "가볍고 편안한 착용감"})
+        assert cached is not None
+        assert cached["similarity"] < 1.0
+        assert cache.stats()["semantic_hits"] == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "stored, requested",
+        [
+            ({"카테고리": "무선 이어폰"}, {"카테고리": "유선 이어폰"}),
+            ({"카테고리": "무선 이어폰"}, {"카테고리": "무선 헤드폰"}),
+            ({"카테고리": "무선 이어폰"}, {"카테고리": "무선 이어폰", "브랜드": "삼성"}),
+            ({"카테고리": "무선 이어폰", "용도": "운동"}, {"카테고리": "무선 이어폰", "용도": "게임"}),
+            ({"카테고리": "키보드", "기능": ["무선", "기계식"]}, {"카테고리": "키보드", "기능": ["무선"]}),
+        ],
+    )
+    async def test_different_categorical_field_is_miss(self, stored, requested):
+        # 유사도 임계값을 낮춰도 범주형 조건이 다르면 다른 제품에 대한 리포트를 돌려주지 않음
+        cache = make_cache(threshold=0.5)
+        await cache.store(stored, "리포트", [])
+
+        assert await cache.lookup(requested) is None
+        assert cache.stats()["semantic_hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_different_budget_is_miss(self):
+        cache = make_cache(threshold=0.5)
+        await cache.store({"카테고리": "무선 이어폰", "예산": "10만원 이하"}, "리포트", [])
+
+        assert await cache.lookup({"카테고리": "무선 이어폰", "예산": "20만원 이하"}) is None
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        cache = make_cache(ttl=0.05)
+        await cache.store({"카테고리": "키보드"}, "리포트", [])
+        time.sleep(0.1)
+
+        assert await cache.lookup({"카테고리": "키보드"}) is None
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        cache = make_cache(max_entries=2, threshold=1.1)  # 유사도 폴백 비활성화
+        await cache.store({"카테고리": "키보드"}, "키보드 리포트", [])
+        await cache.store({"카테고리": "마우스"}, "마우스 리포트", [])
+        await cache.lookup({"카테고리": "키보드"})  # 키보드를 최근 사용으로 갱신
+        await cache.store({"카테고리": "모니터"}, "모니터 리포트", [])
+
+        assert await cache.lookup({"카테고리": "키보드"}) is not None
+        assert await cache.lookup({"카테고리": "마우스"}) is None
+
+
+def test_ttl_cache_stats():
+    cache = TTLCache(maxsize=1, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+class TestReportCaching:
+    """report_generation 의 응답 캐시 저장 조건 테스트"""
+
+    @pytest.fixture
+    def graph_module(self, monkeypatch):
+        # 리포트 LLM 호출은 가짜로 바꾸므로 임의의 키로 충분
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+        module = importlib.import_module("app.graph.graph")
+        cache = make_cache()
+
+        async def fake_llm(node, model, llm, prompt):
+            return AIMessage(content=f"추천 리포트 [naver]({SHORT_URL_PREFIX}0-0)")
+
+        monkeypatch.setattr(module, "get_node_chat_model", lambda node, model: None)
+        monkeypatch.setattr(module, "ainvoke_llm", fake_llm)
+        monkeypatch.setattr(module, "get_answer_cache", lambda: cache)
+        return module, cache
+
+    def state(self, results, sources):
+        return {
+            "messages": [HumanMessage(content="10만원 이하 무선 이어폰")],
+            "extracted_requirements": {"카테고리": "무선 이어폰", "예산": "10만원 이하"},
+            "web_research_result": results,
+            "sources_gathered": sources,
+        }
+
+    @pytest.mark.asyncio
+    async def test_report_from_failed_searches_is_not_cached(self, graph_module):
+        module, cache = graph_module
+        state = self.state(["검색 오류: 무선 이어폰 - timeout", "검색 실패: 가성비 이어폰"], [])
+
+        update = await module.report_generation(state, {"configurable": {}})
+
+        assert update["response_to_user"]
+        assert await cache.lookup(state["extracted_requirements"]) is None
+
+    @pytest.mark.asyncio
+    async def test_report_with_sources_is_cached(self, graph_module):
+        module, cache = graph_module
+        sources = [{"label": "naver", "short_url": f"{SHORT_URL_PREFIX}0-0", "value": "https://blog.naver.com/a"}]
+        state = self.state([f"QCY 멜로버즈 프로 [naver]({SHORT_URL_PREFIX}0-0)"], sources)
+
+        await module.report_generation(state, {"configurable": {}})
+
+        cached = await cache.lookup(state["extracted_requirements"])
+        assert cached["report"] == "추천 리포트 [naver](https://blog.naver.com/a)"
@@ -0,0 +1,268 @@
+import json
+import asyncio
+import operator
+import importlib
+from typing import Annotated, List, TypedDict
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from app.core import admission as admission_module
+from app.core.admission import AdmissionController
+from app.graph.citations import CitationRewriter
+from app.graph.utils import SHORT_URL_PREFIX
+from app.schemas.chat_schema import ChatRequest
+
+SOURCES = [
+    {"label": "naver", "short_url": f"{SHORT_URL_PREFIX}0-0", "value": "https://blog.naver.com/a"},
+    {"label": "clien", "short_url": f"{SHORT_URL_PREFIX}1-0", "value": "https://clien.net/b"},
+]
+
+# 단축 URL 이 토큰 경계에 걸리도록 나눈 리포트 조각
+REPORT_CHUNKS = [
+    "QCY 추천 [naver](",
+    SHORT_URL_PREFIX[:12],
+    f"{SHORT_URL_PREFIX[12:]}0-0",
+    f"), 후기 [clien]({SHORT_URL_PREFIX}1-",
+    "0)",
+]
+REPORT = "QCY 추천 [naver](https://blog.naver.com/a), 후기 [clien](https://clien.net/b)"
+
+
+class FakeReportModel(BaseChatModel):
+    """정해진 조각으로 리포트를 스트리밍하는 가짜 LLM"""
+
+    chunks: List[str]
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-report"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(self.chunks)))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for content in self.chunks:
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=content))
+            if run_manager:
+                await run_manager.on_llm_new_token(content, chunk=chunk)
+            yield chunk
+
+
+class MiniState(TypedDict):
+    messages: Annotated[list, add_messages]
+    is_request_specific: bool
+    search_queries: Annotated[list, operator.add]
+    sources_gathered: list
+
+
+class MiniGraph:
+    """검증 → 검색 → 리포트 생성 노드만 있는 작은 그래프 (실제 노드 이름, 메모리 체크포인터)
+
+    report_generation 은 `gate` 가 열릴 때까지 기다리므로 동시 요청을 겹치게 만들 수 있고,
+    실행마다 그 시점의 대화 메시지 수를 `runs` 에 기록합니다.
+    """
+
+    def __init__(self, chunks: List[str]):
+        self.llm = FakeReportModel(chunks=chunks)
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.runs: List[int] = []
+
+        builder = StateGraph(MiniState)
+        builder.add_node("validate_request", self.validate_request)
+        builder.add_node("web_search", self.web_search)
+        builder.add_node("report_generation", self.report_generation)
+        builder.add_edge(START, "validate_request")
+        builder.add_edge("validate_request", "web_search")
+        builder.add_edge("web_search", "report_generation")
+        builder.add_edge("report_generation", END)
+        self.graph = builder.compile(checkpointer=InMemorySaver())
+
+    async def validate_request(self, state: MiniState) -> dict:
+        return {"is_request_specific": True}
+
+    async def web_search(self, state: MiniState) -> dict:
+        return {"search_queries": ["무선 이어폰 추천"], "sources_gathered": SOURCES}
+
+    async def report_generation(self, state: MiniState, config) -> dict:
+        self.runs.append(len(state["messages"]))
+        await self.gate.wait()
+        response = await self.llm.ainvoke(state["messages"], config)
+        report = CitationRewriter(state["sources_gathered"]).rewrite(response.content)
+        return {"messages": [AIMessage(content=report)]}
+
+
+@pytest.fixture
+def chat_module(monkeypatch):
+    # 그래프는 MiniGraph 로 대신하므로 임의의 키로 충분
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    return importlib.import_module("app.services.chat_service")
+
+
+@pytest.fixture
+def mini(chat_module, monkeypatch) -> MiniGraph:
+    mini = MiniGraph([f"QCY 추천 [naver]({SHORT_URL_PREFIX}0-0)"])
+    monkeypatch.setattr(chat_module, "ainvoke_with_logging", mini.graph.ainvoke)
+    return mini
+
+
+def make_service(chat_module, mini: MiniGraph):
+    service = chat_module.ChatService()
+    service.graph = mini.graph
+    return service
+
+
+async def run_together(service, mini: MiniGraph, *requests: ChatRequest):
+    """report_generation 에서 모든 요청이 겹치도록 잠시 막았다가 함께 완료시킵니다."""
+    mini.gate.clear()
+    tasks = [asyncio.create_task(service.process_chat_request(r)) for r in requests]
+    await asyncio.sleep(0.05)
+    mini.gate.set()
+    return await asyncio.gather(*tasks)
+
+
+class TestRequestCoalescing:
+    """동일 단일 턴 요청 병합 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_requests_share_one_run(self, chat_module, mini):
+        service = make_service(chat_module, mini)
+        a, b = await run_together(
+            service, mini, ChatRequest(message="무선 이어폰 추천해줘"), ChatRequest(message="무선 이어폰  추천해줘")
+        )
+
+        assert mini.runs == [1]
+        assert a.message == b.message == "QCY 추천 [naver](https://blog.naver.com/a)"
+        assert a.thread_id != b.thread_id
+        assert [s.url for s in b.sources] == ["https://blog.naver.com/a"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("override", [{"max_search_queries": 2}, {"max_search_loops": 1}])
+    async def test_different_settings_do_not_coalesce(self, chat_module, mini, override):
+        service = make_service(chat_module, mini)
+        await run_together(
+            service, mini, ChatRequest(message="무선 이어폰 추천해줘"), ChatRequest(message="무선 이어폰 추천해줘", **override)
+        )
+
+        assert mini.runs == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_existing_threads_never_coalesce(self, chat_module, mini):
+        service = make_service(chat_module, mini)
+        first = await service.process_chat_request(ChatRequest(message="키보드 추천해줘", thread_id="thread-a"))
+        await service.process_chat_request(ChatRequest(message="키보드 추천해줘", thread_id="thread-b"))
+        assert first.thread_id == "thread-a"
+        assert mini.runs == [1, 1]
+
+        # 같은 후속 질문이라도 스레드마다 대화 문맥이 다르므로 각각 실행
+        await run_together(
+            service,
+            mini,
+            ChatRequest(message="더 저렴한 건?", thread_id="thread-a"),
+            ChatRequest(message="더 저렴한 건?", thread_id="thread-b"),
+        )
+        assert mini.runs == [1, 1, 3, 3]
+
+    @pytest.mark.asyncio
+    async def test_seeded_follower_thread_takes_second_turn(self, chat_module, mini):
+        service = make_service(chat_module, mini)
+        leader, follower = await run_together(
+            service,
+            mini,
+            ChatRequest(message="무선 이어폰 추천해줘", thread_id="thread-leader"),
+            ChatRequest(message="무선 이어폰 추천해줘", thread_id="thread-follower"),
+        )
+        assert mini.runs == [1]
+
+        # 병합된 쪽 스레드에도 첫 턴의 최종 상태가 기록됨
+        config = {"configurable": {"thread_id": follower.thread_id}}
+        seeded = (await mini.graph.aget_state(config)).values
+        assert [m.content for m in seeded["messages"]] == ["무선 이어폰 추천해줘", follower.message]
+        assert seeded["sources_gathered"] == SOURCES
+
+        second = await service.process_chat_request(ChatRequest(message="더 저렴한 건?", thread_id=follower.thread_id))
+        assert second.thread_id == follower.thread_id
+        # 두 번째 턴은 첫 턴 질문·답변이 있는 대화에서 실행됨
+        assert mini.runs == [1, 3]
+        messages = (await mini.graph.aget_state(config)).values["messages"]
+        assert [type(m) for m in messages] == [HumanMessage, AIMessage, HumanMessage, AIMessage]
+
+
+def parse_sse(body: str) -> List[dict]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append({"event": fields["event"], "data": json.loads(fields["data"])})
+    return events
+
+
+class TestStreaming:
+    """SSE 스트리밍 이벤트 테스트 (가짜 LLM)"""
+
+    @pytest.fixture
+    def streaming(self, chat_module, monkeypatch) -> MiniGraph:
+        mini = MiniGraph(REPORT_CHUNKS)
+        monkeypatch.setattr(chat_module, "ainvoke_with_logging", mini.graph.ainvoke)
+        return mini
+
+    @pytest.mark.asyncio
+    async def test_event_order_and_rewritten_tokens(self, chat_module, streaming):
+        service = make_service(chat_module, streaming)
+        events = [e async for e in service.stream_chat_request(ChatRequest(message="무선 이어폰 추천해줘"))]
+
+        progress = [(e["event"], e["data"]["node"]) for e in events if e["event"].startswith("node_")]
+        assert progress == [
+            ("node_start", "validate_request"),
+            ("node_end", "validate_request"),
+            ("node_start", "web_search"),
+            ("node_end", "web_search"),
+            ("node_start", "report_generation"),
+            ("node_end", "report_generation"),
+        ]
+        names = [e["event"] for e in events]
+        # 토큰은 report_generation 시작과 종료 사이, done 은 마지막
+        report_start = events.index({"event": "node_start", "data": {"node": "report_generation"}})
+        token_indexes = [i for i, name in enumerate(names) if name == "token"]
+        assert report_start < token_indexes[0] and token_indexes[-1] < len(events) - 2
+        assert names[-2:] == ["node_end", "done"]
+        assert events[3]["data"]["source_count"] == 2
+
+        tokens = [e["data"]["content"] for e in events if e["event"] == "token"]
+        assert len(tokens) > 1
+        assert "".join(tokens) == REPORT
+        assert not any(SHORT_URL_PREFIX in t for t in tokens)
+
+        done = events[-1]["data"]
+        assert done["message"] == REPORT
+        assert done["search_queries_used"] == ["무선 이어폰 추천"]
+        assert [(s["title"], s["url"]) for s in done["sources"]] == [
+            ("naver", "https://blog.naver.com/a"),
+            ("clien", "https://clien.net/b"),
+        ]
+
+    def test_stream_endpoint_sends_sse(self, chat_module, streaming, monkeypatch):
+        chat_router = importlib.import_module("app.api.v1.chat_router")
+        monkeypatch.setattr(chat_router.chat_service, "graph", streaming.graph)
+        monkeypatch.setattr(admission_module, "_admission", AdmissionController(max_concurrent=1))
+        app = FastAPI()
+        app.include_router(chat_router.router, prefix="/api/v1")
+
+        response = TestClient(app).post("/api/v1/chat/stream", json={"message": "무선 이어폰 추천해줘"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        assert events[0] == {"event": "node_start", "data": {"node": "validate_request"}}
+        assert "".join(e["data"]["content"] for e in events if e["event"] == "token") == REPORT
+        assert events[-1]["event"] == "done"
+        assert len(events[-1]["data"]["sources"]) == 2
+        # 스트림이 끝나면 수락 제어 슬롯 반납
+        assert admission_module._admission.stats()["active"] == 0
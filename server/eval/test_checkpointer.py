@@ -0,0 +1,127 @@
+import operator
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.graph import StateGraph, START, END
+
+from app.graph.checkpointer import BoundedMemorySaver, create_postgres_saver
+
+
+class CounterState(TypedDict):
+    turns: Annotated[list, operator.add]
+
+
+def build_graph(checkpointer):
+    """체크포인트를 여러 번 남기도록 노드 2개짜리 그래프를 구성합니다."""
+    builder = StateGraph(CounterState)
+    builder.add_node("first", lambda state: {"turns": ["first"]})
+    builder.add_node("second", lambda state: {"turns": ["second"]})
+    builder.add_edge(START, "first")
+    builder.add_edge("first", "second")
+    builder.add_edge("second", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+class TestBoundedMemorySaver:
+    """TTL / LRU 제한 메모리 체크포인터 테스트"""
+
+    def test_state_survives_history_trimming(self):
+        saver = BoundedMemorySaver(max_checkpoints_per_thread=1)
+        graph = build_graph(saver)
+
+        graph.invoke({"turns": ["turn1"]}, config("t1"))
+        result = graph.invoke({"turns": ["turn2"]}, config("t1"))
+
+        assert result["turns"] == ["turn1", "first", "second", "turn2", "first", "second"]
+        assert saver.stats()["checkpoints"] == 1
+        assert saver.stats()["pruned_checkpoints"] > 0
+
+    def test_lru_thread_eviction(self):
+        saver = BoundedMemorySaver(max_threads=2)
+        graph = build_graph(saver)
+
+        graph.invoke({"turns": []}, config("a"))
+        graph.invoke({"turns": []}, config("b"))
+        graph.get_state(config("a"))  # a 를 최근 사용으로 갱신
+        graph.invoke({"turns": []}, config("c"))
+
+        assert saver.stats()["threads"] == 2
+        assert graph.get_state(config("a")).values != {}
+        assert graph.get_state(config("b")).values == {}
+
+    def test_thread_ttl_expiry(self):
+        saver = BoundedMemorySaver(thread_ttl=0.05)
+        graph = build_graph(saver)
+
+        graph.invoke({"turns": ["old"]}, config("t1"))
+        time.sleep(0.1)
+        result = graph.invoke({"turns": ["new"]}, config("t1"))
+
+        assert result["turns"] == ["new", "first", "second"]
+
+    def test_memory_stays_flat_under_load(self):
+        saver = BoundedMemorySaver(max_threads=10, max_checkpoints_per_thread=2)
+        graph = build_graph(saver)
+
+        for i in range(20):
+            graph.invoke({"turns": []}, config(f"warm-{i}"))
+        baseline = saver.stats()["approx_bytes"]
+        for i in range(200):
+            graph.invoke({"turns": []}, config(f"load-{i}"))
+
+        assert saver.stats()["threads"] == 10
+        assert saver.stats()["approx_bytes"] <= baseline * 1.1
+
+
+class FakePostgres:
+    """실행한 SQL 을 기록하고 미리 정한 결과를 돌려주는 가짜 커넥션 풀 (Postgres 없이 정리 로직 확인용)"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.executed = []
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        return self
+
+    async def fetchall(self):
+        return self.results.pop(0)
+
+
+class TestBoundedPostgresSaver:
+    """Postgres 체크포인터 정리 테스트 (가짜 커넥션)"""
+
+    @pytest.mark.asyncio
+    async def test_trims_to_history_per_thread(self):
+        saver = create_postgres_saver("postgresql://unused")
+        saver.max_checkpoints_per_thread = 3
+        now = datetime.now(timezone.utc)
+        saver.conn = FakePostgres([
+            [("long", now, 5), ("short", now, 2)],
+            # 삭제된 체크포인트 2개가 참조하던 채널 값 (같은 값 중복 포함)
+            [(2, "long", "", "messages", "v1"), (2, "long", "", "messages", "v1"), (2, "long", "", "turn_id", "v1")],
+        ])
+
+        await saver.maintain()
+
+        (_, _), (trim_sql, trim_params), (blob_sql, blob_params) = saver.conn.executed
+        assert "row_number()" in trim_sql and "checkpoint_writes" in trim_sql
+        assert trim_params == (["long"], 3)  # 모두 지우지 않고 최근 3개를 남김
+        assert "checkpoint_blobs" in blob_sql
+        assert sorted(zip(*blob_params)) == [("long", "", "messages", "v1"), ("long", "", "turn_id", "v1")]
+        assert saver.pruned_checkpoints == 2
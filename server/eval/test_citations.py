@@ -0,0 +1,46 @@
+from app.graph.citations import CitationRewriter
+from app.graph.utils import SHORT_URL_PREFIX
+
+SOURCES = [
+    {"label": "naver", "short_url": f"{SHORT_URL_PREFIX}0-1", "value": "https://blog.naver.com/a"},
+    {"label": "dcinside", "short_url": f"{SHORT_URL_PREFIX}0-12", "value": "https://gall.dcinside.com/b"},
+    {"label": "clien", "short_url": f"{SHORT_URL_PREFIX}1-0", "value": "https://clien.net/c"},
+]
+
+REPORT = (
+    f"QCY 추천 [naver]({SHORT_URL_PREFIX}0-1), 후기 [dcinside]({SHORT_URL_PREFIX}0-12) "
+    f"그리고 다시 [naver]({SHORT_URL_PREFIX}0-1)"
+)
+EXPECTED = (
+    "QCY 추천 [naver](https://blog.naver.com/a), 후기 [dcinside](https://gall.dcinside.com/b) "
+    "그리고 다시 [naver](https://blog.naver.com/a)"
+)
+
+
+class TestCitationRewriter:
+    """출처 링크 복원 테스트"""
+
+    def test_rewrite_in_one_pass(self):
+        rewriter = CitationRewriter(SOURCES)
+        assert rewriter.rewrite(REPORT) == EXPECTED
+        # 사용된 출처만, sources_gathered 순서대로
+        assert [s["label"] for s in rewriter.used_sources()] == ["naver", "dcinside"]
+
+    def test_streaming_matches_full_rewrite_for_any_chunk_size(self):
+        for size in (1, 2, 3, 7, 16, 31, 64):
+            rewriter = CitationRewriter(SOURCES)
+            chunks = [REPORT[i:i + size] for i in range(0, len(REPORT), size)]
+            streamed = "".join(rewriter.feed(chunk) for chunk in chunks) + rewriter.flush()
+            assert streamed == EXPECTED, size
+
+    def test_prefix_key_at_stream_end(self):
+        rewriter = CitationRewriter(SOURCES)
+        # "…/0-1" 은 "…/0-12" 의 앞부분이므로 다음 청크를 기다렸다가 교체
+        assert rewriter.feed(f"출처 {SHORT_URL_PREFIX}0-1") == "출처 "
+        assert rewriter.flush() == "https://blog.naver.com/a"
+
+    def test_without_sources(self):
+        rewriter = CitationRewriter(None)
+        assert rewriter.feed("그대로") == "그대로"
+        assert rewriter.rewrite(REPORT) == REPORT
+        assert rewriter.used_sources() == []
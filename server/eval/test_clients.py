@@ -0,0 +1,108 @@
+import asyncio
+import importlib
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from google.genai.models import AsyncModels
+
+from app.graph import clients as clients_module
+from app.graph.clients import ClientRegistry, warmup_clients
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    # 클라이언트 객체만 만들고 Gemini 는 호출하지 않으므로 임의의 키로 충분
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """모든 genai 호출(예열용 모델 메타데이터 조회)이 네트워크 오류로 실패하게 만듭니다."""
+    calls = []
+
+    async def unreachable(self, *, model, config=None):
+        calls.append(model)
+        raise httpx.ConnectError("network is unreachable")
+
+    monkeypatch.setattr(AsyncModels, "get", unreachable)
+    return calls
+
+
+class TestClientRegistry:
+    """LLM / genai 클라이언트 재사용 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_reuse_same_client(self):
+        registry = ClientRegistry()
+
+        async def request():
+            await asyncio.sleep(0)
+            return registry.chat_model("gemini-2.5-flash", temperature=0.2), registry.genai_client()
+
+        results = await asyncio.gather(*(request() for _ in range(10)))
+
+        assert len({id(model) for model, _ in results}) == 1
+        assert len({id(genai) for _, genai in results}) == 1
+        stats = registry.stats()
+        assert stats["created"] == 2
+        assert stats["reused"] == 18
+
+    @pytest.mark.asyncio
+    async def test_different_settings_get_different_clients(self):
+        registry = ClientRegistry()
+        low = registry.chat_model("gemini-2.5-flash", temperature=0.1)
+
+        assert registry.chat_model("gemini-2.5-flash", temperature=0.1) is low
+        assert registry.chat_model("gemini-2.5-flash", temperature=0.7) is not low
+        assert registry.chat_model("gemini-2.0-flash", temperature=0.1) is not low
+
+    def test_each_event_loop_gets_own_client(self):
+        registry = ClientRegistry()
+
+        async def request():
+            return registry.chat_model("gemini-2.5-flash", temperature=0.2)
+
+        # 비동기 커넥션은 루프에 묶이므로 루프가 다르면 새로 만듦
+        assert asyncio.run(request()) is not asyncio.run(request())
+        assert registry.stats()["created"] == 2
+
+
+class TestWarmup:
+    """클라이언트 예열 테스트 (네트워크 없음)"""
+
+    @pytest.mark.asyncio
+    async def test_warmup_failure_is_not_raised_and_clients_are_kept(self, offline, monkeypatch):
+        registry = ClientRegistry()
+        monkeypatch.setattr(clients_module, "registry", registry)
+
+        await warmup_clients({"validate_request": "gemini-2.5-flash", "report_generation": "gemini-2.5-flash"})
+
+        assert len(offline) == 3  # genai + 노드별 LLM 2개
+        # 예열에 실패해도 만든 클라이언트는 첫 요청에서 그대로 재사용
+        assert clients_module.get_node_chat_model("report_generation", "gemini-2.5-flash") is (
+            clients_module.get_node_chat_model("report_generation", "gemini-2.5-flash")
+        )
+        assert registry.stats()["created"] == 3
+
+    @pytest.mark.asyncio
+    async def test_warmup_times_out(self, monkeypatch):
+        async def hang(self, *, model, config=None):
+            await asyncio.sleep(10)
+
+        monkeypatch.setattr(AsyncModels, "get", hang)
+        monkeypatch.setattr(clients_module, "registry", ClientRegistry())
+
+        await asyncio.wait_for(warmup_clients({"validate_request": "gemini-2.5-flash"}, timeout=0.05), timeout=1)
+
+    def test_app_starts_without_network(self, offline, monkeypatch):
+        main = importlib.import_module("app.main")
+        registry = ClientRegistry()
+        monkeypatch.setattr(clients_module, "registry", registry)
+        monkeypatch.setattr(main.settings, "warmup_clients", True)
+
+        with TestClient(main.app) as client:
+            assert client.get("/health").status_code == 200
+
+        assert offline  # 예열을 시도했고
+        assert registry.stats()["created"] == 5  # genai + 노드별 LLM 4개는 만들어 둠
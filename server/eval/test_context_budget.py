@@ -0,0 +1,42 @@
+from app.graph.context_budget import count_tokens, fit_research_results, plan_context, trim_to_tokens
+from app.graph.utils import SHORT_URL_PREFIX
+
+
+def cited(text: str, n: int) -> str:
+    return text + "".join(f" [출처{i}]({SHORT_URL_PREFIX}0-{i})" for i in range(n))
+
+
+class TestContextBudget:
+    """검색 결과 컨텍스트 예산 테스트"""
+
+    def test_under_budget_keeps_everything_in_order(self):
+        results = ["무선 이어폰 추천 결과", "노이즈 캔슬링 이어폰 비교"]
+        text = fit_research_results(results, ["무선 이어폰"], 1000, "report_generation")
+        assert text == "\n---\n".join(results)
+
+    def test_unlimited_budget(self):
+        results = ["가" * 5000, "나" * 5000]
+        assert fit_research_results(results, ["이어폰"], 0, "report_generation") == "\n---\n".join(results)
+
+    def test_drops_least_relevant_and_failed_results(self):
+        relevant = cited("무선 이어폰 추천: 소니와 애플 무선 이어폰 비교. " * 20, 5)
+        unrelated = "냉장고 에너지 효율 등급 안내. " * 40
+        failed = "검색 오류: 무선 이어폰 - timeout"
+        plan = plan_context([unrelated, failed, relevant], ["10만원 이하 무선 이어폰 추천"], count_tokens(relevant) + 50)
+
+        actions = {entry["index"]: entry["action"] for entry in plan}
+        assert actions == {0: "dropped", 1: "dropped", 2: "kept"}
+
+    def test_trims_at_boundary_within_budget(self):
+        text = "\n".join(cited(f"{i}번째 이어폰 리뷰 문단입니다.", 1) for i in range(200))
+        trimmed = trim_to_tokens(text, 500)
+
+        assert count_tokens(trimmed) <= 500
+        assert trimmed.endswith(")")  # 출처 링크 중간에서 잘리지 않음
+        assert text.startswith(trimmed)
+
+    def test_total_stays_within_budget(self):
+        results = [cited(f"이어폰 리뷰 {i}. " * 300, 3) for i in range(6)]
+        text = fit_research_results(results, ["이어폰 리뷰"], 3000, "reflection")
+        assert count_tokens(text) <= 3000
+        assert text
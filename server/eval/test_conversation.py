@@ -0,0 +1,60 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.graph.context_budget import count_tokens
+from app.graph.conversation import build_conversation_context, fold_without_llm, messages_to_fold, render_messages
+from app.graph.state import get_recent_user_messages
+
+
+def conversation(turns: int) -> list:
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"요청 {i}"))
+        messages.append(AIMessage(content=f"답변 {i} " + "내용 " * 200))
+    return messages
+
+
+class TestConversationContext:
+    """누적 대화 요약 / 대화 맥락 테스트"""
+
+    def test_short_conversation_matches_recent_user_messages(self):
+        messages = conversation(3)
+        assert build_conversation_context(messages, "", 0, 4, 1500) == get_recent_user_messages(messages)
+
+    def test_fold_only_messages_before_recent_window(self):
+        messages = conversation(6) + [HumanMessage(content="요청 6")]
+        to_fold, cutoff = messages_to_fold(messages, 0, 4)
+        # 최근 사용자 메시지 4개(요청 3~6) 앞까지만 요약 대상
+        assert [m.content for m in to_fold if m.type == "human"] == ["요청 0", "요청 1", "요청 2"]
+        assert messages[cutoff].content == "요청 3"
+
+        # 다음 턴에는 새로 밀려난 메시지만 요약 대상
+        messages += [AIMessage(content="답변 6"), HumanMessage(content="요청 7")]
+        to_fold, next_cutoff = messages_to_fold(messages, cutoff, 4)
+        assert [m.content for m in to_fold] == ["요청 3", messages[cutoff + 1].content]
+        assert messages[next_cutoff].content == "요청 4"
+
+    def test_context_uses_summary_and_recent_messages_under_cap(self):
+        messages = conversation(10) + [HumanMessage(content="더 저렴한 걸로")]
+        _, cutoff = messages_to_fold(messages, 0, 4)
+        summary = "무선 이어폰, 예산 10만원, " * 100
+
+        context = build_conversation_context(messages, summary, cutoff, 4, 300)
+
+        assert context.startswith("이전 대화 요약: 무선 이어폰")
+        assert context.endswith("요청 8\n요청 9\n더 저렴한 걸로")
+        assert "요청 0" not in context
+        assert count_tokens(context) <= 300
+
+    def test_latest_message_is_always_kept(self):
+        messages = [HumanMessage(content="아주 긴 요청 " * 500)]
+        context = build_conversation_context(messages, "요약", 0, 4, 100)
+        assert context.startswith("아주 긴 요청") and count_tokens(context) <= 100
+
+    def test_render_and_fallback_fold(self):
+        messages = conversation(2)
+        rendered = render_messages(messages)
+        assert rendered.startswith("사용자: 요청 0\nAI: 답변 0")
+        assert count_tokens(rendered) < 250  # AI 답변은 앞부분만
+
+        assert fold_without_llm("이전 요약", messages, 100) == "이전 요약\n요청 0\n요청 1"
+        assert count_tokens(fold_without_llm("요약 " * 500, messages, 100)) <= 100
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from app.graph import rate_limit
+from app.graph.hedging import LatencyHistogram, SearchHedger
+
+
+class SlowLimiter:
+    """요청 제한기 대기가 긴 상황 (다른 요청 뒤에서 기다림)"""
+
+    async def acquire(self, model, tokens, priority):
+        await asyncio.sleep(0.3)
+        return tokens
+
+    def record_usage(self, model, reserved, actual):
+        pass
+
+
+def seed(hedger: SearchHedger, model: str, seconds: float, n: int = 50):
+    for _ in range(n):
+        hedger.histogram(model).observe(seconds)
+
+
+class TestLatencyHistogram:
+    """지연 시간 히스토그램 분위수 테스트"""
+
+    def test_quantile_follows_tail(self):
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.observe(0.1)
+        for _ in range(10):
+            histogram.observe(5.0)
+
+        assert histogram.quantile(0.5) < 0.2
+        assert histogram.quantile(0.99) >= 5.0
+
+    def test_empty_histogram(self):
+        assert LatencyHistogram().quantile(0.9) is None
+
+
+class TestSearchHedger:
+    """헤지 요청 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged(self):
+        hedger = SearchHedger(min_samples=10)
+        seed(hedger, "m", 0.05)
+        delays = iter([2.0, 0.01])
+
+        async def search():
+            await asyncio.sleep(next(delays))
+            return "ok"
+
+        assert await asyncio.wait_for(hedger.run("m", search), timeout=1.0) == "ok"
+        stats = hedger.stats()
+        assert stats["hedged"] == 1
+        assert stats["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_samples_or_when_disabled(self):
+        hedger = SearchHedger(min_samples=10)
+        calls = []
+
+        async def search():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        await hedger.run("m", search)
+        seed(hedger, "m", 0.01)
+        await hedger.run("m", search, hedge=False)
+
+        assert len(calls) == 2
+        assert hedger.stats()["hedged"] == 0
+
+    @pytest.mark.asyncio
+    async def test_budget_caps_hedges(self):
+        hedger = SearchHedger(min_samples=10, budget_ratio=0.0, budget_burst=1.0)
+        seed(hedger, "m", 0.01)
+
+        async def search():
+            await asyncio.sleep(0.1)
+            return "ok"
+
+        await asyncio.gather(*[hedger.run("m", search) for _ in range(3)])
+        stats = hedger.stats()
+        assert stats["hedged"] == 1
+        assert stats["budget_denied"] == 2
+
+    @pytest.mark.asyncio
+    async def test_hedge_covers_primary_failure(self):
+        hedger = SearchHedger(min_samples=10)
+        seed(hedger, "m", 0.01)
+        attempts = iter([(0.1, True), (0.01, False)])
+
+        async def search():
+            delay, fail = next(attempts)
+            await asyncio.sleep(delay)
+            if fail:
+                raise RuntimeError("검색 실패")
+            return "ok"
+
+        assert await hedger.run("m", search) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_latency_excludes_rate_limit_wait(self, monkeypatch):
+        monkeypatch.setattr(rate_limit, "get_rate_limiter", lambda: SlowLimiter())
+        hedger = SearchHedger(min_samples=1)
+
+        async def search():
+            async with rate_limit.rate_limited("web_search", "m", "query"):
+                await asyncio.sleep(0.01)
+            return "ok"
+
+        assert await hedger.run("m", search, hedge=False) == "ok"
+        assert hedger.histogram("m").quantile(0.5) < 0.1
@@ -0,0 +1,166 @@
+import time
+import asyncio
+import importlib
+
+import pytest
+
+from app.core import admission as admission_module
+from app.core.admission import AdmissionController, AdmissionRejected
+from app.schemas.chat_schema import ChatRequest
+
+
+@pytest.fixture
+def job_module(monkeypatch):
+    # 그래프는 가짜 스트림으로 대신하므로 임의의 키로 충분
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    return importlib.import_module("app.services.job_service")
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    controller = AdmissionController(max_concurrent=1, max_queue=10, per_client_limit=0)
+    monkeypatch.setattr(admission_module, "_admission", controller)
+    return controller
+
+
+class FakeChatService:
+    """노드 진행 → 토큰 → 완료 이벤트를 보내는 가짜 스트림. `gate` 가 열릴 때까지 토큰 뒤에서 멈춤"""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.requests = []
+
+    async def stream_chat_request(self, request):
+        self.requests.append(request)
+        yield {"event": "node_start", "data": {"node": "web_search"}}
+        yield {"event": "node_end", "data": {"node": "web_search", "search_queries": ["무선 이어폰"], "source_count": 3}}
+        yield {"event": "node_start", "data": {"node": "report_generation"}}
+        yield {"event": "token", "data": {"content": "추천 "}}
+        await self.gate.wait()
+        yield {"event": "token", "data": {"content": "리포트"}}
+        yield {"event": "done", "data": {"message": "추천 리포트", "thread_id": request.thread_id}}
+
+
+def make_service(job_module, store=None, **kwargs):
+    store = store or job_module.InMemoryJobStore(max_entries=100, ttl=60)
+    service = job_module.JobService(store, progress_interval=0, **kwargs)
+    service.chat_service = FakeChatService()
+    return service
+
+
+async def wait_for_status(service, job_id, status, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await service.get(job_id)
+        if job["status"] == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{job_id} 상태가 {status} 가 되지 않음: {job['status']}")
+
+
+class TestJobService:
+    """비동기 작업 서비스 테스트 (가짜 그래프 스트림)"""
+
+    @pytest.mark.asyncio
+    async def test_submit_and_get_result(self, job_module, admission):
+        service = make_service(job_module, workers=1)
+        service.chat_service.gate.set()
+        await service.start()
+        try:
+            job = await service.submit(ChatRequest(message="무선 이어폰 추천"))
+            assert job["status"] == "queued"
+            assert job["thread_id"].startswith("thread-")
+
+            done = await wait_for_status(service, job["job_id"], "succeeded")
+            assert done["result"]["message"] == "추천 리포트"
+            assert done["result"]["thread_id"] == job["thread_id"]
+            assert done["progress"]["completed_nodes"] == ["web_search"]
+            assert service.stats()["completed"] == 1
+        finally:
+            await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_with_503(self, job_module, admission):
+        service = make_service(job_module, workers=1, max_queue=1)  # 워커를 시작하지 않아 대기열이 비지 않음
+        first = await service.submit(ChatRequest(message="키보드 추천"))
+
+        with pytest.raises(AdmissionRejected) as e:
+            await service.submit(ChatRequest(message="마우스 추천"))
+        assert e.value.status_code == 503
+        assert e.value.retry_after >= 1
+        assert (await service.get(first["job_id"]))["queue_position"] == 0
+
+    @pytest.mark.asyncio
+    async def test_partial_progress_while_running(self, job_module, admission):
+        service = make_service(job_module, workers=1)
+        await service.start()
+        try:
+            job = await service.submit(ChatRequest(message="무선 이어폰 추천"))
+            await wait_for_status(service, job["job_id"], "running")
+            await asyncio.sleep(0.01)
+
+            running = await service.get(job["job_id"])
+            assert running["progress"]["current_node"] == "report_generation"
+            assert running["progress"]["search_queries"] == ["무선 이어폰"]
+            assert running["progress"]["source_count"] == 3
+            assert running["progress"]["partial_message"] == "추천 "
+            # progress_interval=0 이므로 부분 결과가 저장소에도 저장됨
+            assert (await service.store.get(job["job_id"]))["progress"]["partial_message"] == "추천 "
+
+            service.chat_service.gate.set()
+            done = await wait_for_status(service, job["job_id"], "succeeded")
+            assert done["progress"]["partial_message"] == "추천 리포트"
+            assert done["progress"]["current_node"] is None
+        finally:
+            await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_jobs_wait_for_admission_slot(self, job_module, admission):
+        service = make_service(job_module, workers=2)
+        await service.start()
+        release = asyncio.Event()
+
+        async def hold():
+            async with admission.admit("chat-client"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        try:
+            job = await service.submit(ChatRequest(message="무선 이어폰 추천"))
+            await asyncio.sleep(0.05)
+            # 전역 슬롯을 /chat 요청이 쓰고 있으므로 작업은 대기 상태로 남음
+            assert (await service.get(job["job_id"]))["status"] == "queued"
+            assert service.chat_service.requests == []
+            assert admission.stats()["queued"] == 1
+
+            release.set()
+            await wait_for_status(service, job["job_id"], "running")
+            assert admission.stats()["active"] == 1
+
+            service.chat_service.gate.set()
+            await wait_for_status(service, job["job_id"], "succeeded")
+            await asyncio.sleep(0.01)
+            assert admission.stats()["active"] == 0
+            assert admission.stats()["clients"] == 0
+        finally:
+            release.set()
+            await holder
+            await service.stop()
+
+    @pytest.mark.asyncio
+    async def test_result_persists_in_store_until_expiry(self, job_module, admission):
+        store = job_module.InMemoryJobStore(max_entries=100, ttl=0.2)
+        service = make_service(job_module, store=store, workers=1)
+        service.chat_service.gate.set()
+        await service.start()
+        job = await service.submit(ChatRequest(message="무선 이어폰 추천"))
+        await wait_for_status(service, job["job_id"], "succeeded")
+        await service.stop()
+
+        # 워커가 멈춘 뒤에도 (다른 서비스 인스턴스에서) 저장소로 결과를 조회
+        restarted = make_service(job_module, store=store)
+        assert (await restarted.get(job["job_id"]))["result"]["message"] == "추천 리포트"
+
+        time.sleep(0.25)
+        assert await restarted.get(job["job_id"]) is None
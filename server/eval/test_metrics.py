@@ -0,0 +1,54 @@
+import asyncio
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.graph.hedging import get_search_hedger
+from app.graph.product_store import get_product_store
+from app.graph.utils import SHORT_URL_PREFIX
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # 앱 import 시 그래프를 만들기만 하고 Gemini 는 호출하지 않으므로 임의의 키로 충분
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    return TestClient(importlib.import_module("app.main").app)
+
+
+def metric_value(text: str, name: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(f"{name} "):
+            return float(line.split()[1])
+    raise AssertionError(f"{name} 지표 없음")
+
+
+class TestMetrics:
+    """GET /metrics 스크레이프 테스트"""
+
+    def test_product_store_counters(self, client):
+        store = get_product_store()
+        before = metric_value(client.get("/metrics").text, "product_store_stored_total")
+
+        sources = [{"label": "naver", "short_url": f"{SHORT_URL_PREFIX}0-0", "value": "https://blog.naver.com/metrics"}]
+        product = {"name": "메트릭 테스트 이어폰", "source_urls": [f"{SHORT_URL_PREFIX}0-0"]}
+        asyncio.run(store.store([product], sources, {"카테고리": "무선 이어폰"}))
+        asyncio.run(store.retrieve({"카테고리": "무선 이어폰"}, "", limit=5, max_age=60))
+
+        text = client.get("/metrics").text
+        assert metric_value(text, "product_store_stored_total") == before + 1
+        assert metric_value(text, "product_store_lookups_total") >= 1
+        assert metric_value(text, "product_store_retrieved_total") >= 0
+        assert metric_value(text, "product_store_entries") >= 1
+
+    def test_search_hedge_counters(self, client):
+        before = metric_value(client.get("/metrics").text, 'search_hedge_events_total{event="requests"}')
+
+        async def search():
+            return "ok"
+
+        asyncio.run(get_search_hedger().run("gemini-2.0-flash", search, hedge=False))
+
+        text = client.get("/metrics").text
+        assert metric_value(text, 'search_hedge_events_total{event="requests"}') == before + 1
+        assert metric_value(text, 'search_hedge_events_total{event="hedge_wins"}') >= 0
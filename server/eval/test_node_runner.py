@@ -0,0 +1,29 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def graph_module(monkeypatch):
+    # 노드 래퍼만 확인하고 Gemini 는 호출하지 않으므로 임의의 키로 충분
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    return importlib.import_module("app.graph.graph")
+
+
+async def echo(state: dict, config) -> dict:
+    return {"echo": state["value"]}
+
+
+class TestAsNode:
+    """비동기 노드 래퍼(_as_node)의 sync/async 실행 테스트"""
+
+    def test_sync_invoke_outside_event_loop(self, graph_module):
+        node = graph_module._as_node(echo)
+        assert node.invoke({"value": 1}) == {"echo": 1}
+
+    @pytest.mark.asyncio
+    async def test_sync_invoke_inside_event_loop_fails_clearly(self, graph_module):
+        node = graph_module._as_node(echo)
+        with pytest.raises(RuntimeError, match="ainvoke"):
+            node.invoke({"value": 1})
+        assert await node.ainvoke({"value": 2}) == {"echo": 2}
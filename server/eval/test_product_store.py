@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from app.graph.embeddings import HashingEmbedder
+from app.graph.product_store import (
+    KB_SHORT_URL_PREFIX,
+    InMemoryProductStoreBackend,
+    ProductStore,
+    kb_candidates,
+    parse_price,
+    product_key,
+)
+from app.graph.utils import SHORT_URL_PREFIX
+
+REQUIREMENTS = {"카테고리": "무선 이어폰", "예산": "10만원 이하"}
+
+SOURCES = [
+    {"label": "naver", "short_url": f"{SHORT_URL_PREFIX}0-0", "value": "https://blog.naver.com/a"},
+    {"label": "clien", "short_url": f"{SHORT_URL_PREFIX}1-0", "value": "https://clien.net/b"},
+]
+
+
+def make_store(retention: float = 60.0) -> ProductStore:
+    backend = InMemoryProductStoreBackend(max_entries=100, retention=retention)
+    return ProductStore(backend, HashingEmbedder(), similarity_threshold=0.0)
+
+
+def product(name: str, url: str, **fields) -> dict:
+    return {"name": name, "source_url": url, "source_urls": [url], "mention_count": 1, **fields}
+
+
+class TestProductKey:
+    """제품 키 / 가격 파싱 테스트"""
+
+    def test_spacing_does_not_change_key(self):
+        assert product_key("QCY 멜로버즈프로") == product_key("qcy 멜로버즈 프로 (블랙)")
+        assert product_key("에어팟 프로") != product_key("에어팟 프로 2")
+
+    def test_parse_price(self):
+        assert parse_price("3만원대") == 30000
+        assert parse_price("약 155,000원") == 155000
+        assert parse_price("가격 미정") is None
+
+
+class TestProductStore:
+    """제품 지식 베이스 테스트 (in-process 백엔드)"""
+
+    @pytest.mark.asyncio
+    async def test_store_and_retrieve_with_original_sources(self):
+        store = make_store()
+        stored = await store.store(
+            [
+                product("QCY 멜로버즈 프로", f"{SHORT_URL_PREFIX}0-0", price_range="3만원대", review_summary="가성비 노캔"),
+                product("출처 없는 제품", "https://made.up/x"),
+            ],
+            SOURCES,
+            REQUIREMENTS,
+        )
+        assert stored == 1
+
+        [found] = await store.retrieve(REQUIREMENTS, "가성비 무선 이어폰 추천", limit=5, max_age=60)
+        assert found["name"] == "QCY 멜로버즈 프로"
+        assert found["price_range"] == "3만원대"
+        assert found["sources"] == [{"label": "naver", "value": "https://blog.naver.com/a"}]
+        assert found["updated_at"] <= time.time()
+
+    @pytest.mark.asyncio
+    async def test_store_merges_existing_product(self):
+        store = make_store()
+        await store.store([product("QCY 멜로버즈프로", f"{SHORT_URL_PREFIX}0-0", price_range="3만원대")], SOURCES, REQUIREMENTS)
+        await store.store([product("QCY 멜로버즈 프로", f"{SHORT_URL_PREFIX}1-0")], SOURCES, REQUIREMENTS)
+
+        [found] = await store.retrieve(REQUIREMENTS, "", limit=5, max_age=60)
+        assert found["mention_count"] == 2
+        assert found["price_range"] == "3만원대"  # 새 결과에 없으면 기존 값 유지
+        assert [s["value"] for s in found["sources"]] == ["https://clien.net/b", "https://blog.naver.com/a"]
+
+    @pytest.mark.asyncio
+    async def test_retrieve_filters_category_budget_and_age(self):
+        store = make_store()
+        await store.store(
+            [
+                product("QCY 멜로버즈 프로", f"{SHORT_URL_PREFIX}0-0", price_range="3만원대"),
+                product("소니 WF-1000XM5", f"{SHORT_URL_PREFIX}1-0", price_range="30만원대"),
+            ],
+            SOURCES,
+            REQUIREMENTS,
+        )
+        await store.store([product("로지텍 MX Keys", f"{SHORT_URL_PREFIX}0-0")], SOURCES, {"카테고리": "키보드"})
+
+        await store.store([product("카테고리 없는 제품", f"{SHORT_URL_PREFIX}1-0")], SOURCES, {})
+
+        found = await store.retrieve(REQUIREMENTS, "", limit=5, max_age=60)
+        assert [p["name"] for p in found] == ["QCY 멜로버즈 프로"]
+        # 카테고리 없이 저장된 제품은 카테고리를 지정하지 않은 요청에만 사용
+        assert "카테고리 없는 제품" in [p["name"] for p in await store.retrieve({}, "제품", limit=5, max_age=60)]
+        assert await store.retrieve(REQUIREMENTS, "", limit=5, max_age=0) == []
+
+    @pytest.mark.asyncio
+    async def test_kb_sources_do_not_refresh_products(self):
+        store = make_store()
+        await store.store([product("QCY 멜로버즈 프로", f"{SHORT_URL_PREFIX}0-0")], SOURCES, REQUIREMENTS)
+        entries = await store.retrieve(REQUIREMENTS, "", limit=5, max_age=60)
+
+        products, sources = kb_candidates(entries)
+        assert products[0]["source_urls"] == [f"{KB_SHORT_URL_PREFIX}0"]
+        assert sources[0]["value"] == "https://blog.naver.com/a"
+
+        # 지식 베이스에서 꺼낸 제품을 그대로 다시 저장해도 갱신되지 않음
+        assert await store.store(products, sources, REQUIREMENTS) == 0
+        assert store.stats()["stored"] == 1
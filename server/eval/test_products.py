@@ -0,0 +1,80 @@
+from app.graph.context_budget import count_tokens
+from app.graph.products import merge_products, products_from_extraction, rank_products, render_product_table, same_product
+from app.graph.search_cache import rebase_search_result
+from app.graph.tools_and_schemas import ExtractedProduct
+from app.graph.utils import SHORT_URL_PREFIX
+
+SOURCES = [
+    {"label": "naver", "short_url": f"{SHORT_URL_PREFIX}0-0", "value": "https://blog.naver.com/a"},
+    {"label": "clien", "short_url": f"{SHORT_URL_PREFIX}1-0", "value": "https://clien.net/b"},
+]
+
+
+def product(name: str, url: str, **fields) -> dict:
+    return {"name": name, "source_url": url, "source_urls": [url], "mention_count": 1, **fields}
+
+
+class TestSameProduct:
+    """제품명 유사 매칭 테스트"""
+
+    def test_same_product_variants(self):
+        assert same_product("QCY 멜로버즈 프로", "멜로버즈 프로 ANC")
+        assert same_product("QCY 멜로버즈프로", "QCY 멜로버즈 프로 (블랙)")
+        assert same_product("갤럭시 버즈3 프로", "삼성 갤럭시 버즈 3 프로")
+
+    def test_different_models_are_not_merged(self):
+        assert not same_product("QCY 멜로버즈", "QCY 멜로버즈 프로")
+        assert not same_product("에어팟 프로", "에어팟 프로 2")
+        assert not same_product("소니 WF-1000XM4", "소니 WF-1000XM5")
+        assert not same_product("사운드코어 리버티 4 NC", "QCY 멜로버즈 프로")
+
+
+class TestMergeProducts:
+    """브랜치 간 제품 병합 / 순위 테스트"""
+
+    def test_merge_across_branches(self):
+        branch0 = [product("멜로버즈 프로 ANC", f"{SHORT_URL_PREFIX}0-0", review_summary="노캔")]
+        branch1 = [
+            product("QCY 멜로버즈 프로", f"{SHORT_URL_PREFIX}1-0", price_range="3만원대"),
+            product("사운드코어 리버티 4 NC", f"{SHORT_URL_PREFIX}1-0"),
+        ]
+
+        merged = merge_products(merge_products([], branch0), branch1)
+
+        assert len(merged) == 2
+        melo = merged[0]
+        assert melo["name"] == "QCY 멜로버즈 프로"  # 브랜드가 붙은 이름을 대표로
+        assert melo["price_range"] == "3만원대" and melo["review_summary"] == "노캔"
+        assert melo["source_urls"] == [f"{SHORT_URL_PREFIX}0-0", f"{SHORT_URL_PREFIX}1-0"]
+        assert melo["mention_count"] == 2
+        assert branch0[0]["mention_count"] == 1  # 입력은 변경하지 않음
+
+        ranked = rank_products(list(reversed(merged)), 1)
+        assert [p["name"] for p in ranked] == ["QCY 멜로버즈 프로"]
+
+    def test_extraction_keeps_only_known_sources(self):
+        extracted = [
+            ExtractedProduct(name="QCY 멜로버즈 프로", source_urls=[f"{SHORT_URL_PREFIX}0-0", "https://made.up/x"]),
+            ExtractedProduct(name="멜로버즈 프로 ANC", source_urls=[f"{SHORT_URL_PREFIX}1-0"]),
+            ExtractedProduct(name=" "),
+        ]
+        [melo] = products_from_extraction(extracted, SOURCES, max_products=5)
+        assert melo["source_urls"] == [f"{SHORT_URL_PREFIX}0-0", f"{SHORT_URL_PREFIX}1-0"]
+        assert melo["mention_count"] == 1  # 한 검색 결과 안의 중복은 언급 1회
+
+    def test_table_is_compact_and_cites_short_urls(self):
+        products = [product(f"제품 {chr(65 + i)}", f"{SHORT_URL_PREFIX}0-0", review_summary="좋아요 " * 100) for i in range(10)]
+        table = render_product_table(products, SOURCES)
+        assert f"[naver]({SHORT_URL_PREFIX}0-0)" in table
+        assert len(table.splitlines()) == 12
+        assert count_tokens(table) < 1000
+
+    def test_rebase_moves_product_sources(self):
+        cached = {
+            "web_research_result": "",
+            "sources_gathered": SOURCES[:1],
+            "candidate_products": [product("QCY 멜로버즈 프로", f"{SHORT_URL_PREFIX}0-0")],
+        }
+        [rebased] = rebase_search_result(cached, 0, 3)["candidate_products"]
+        assert rebased["source_url"] == f"{SHORT_URL_PREFIX}3-0"
+        assert rebased["source_urls"] == [f"{SHORT_URL_PREFIX}3-0"]
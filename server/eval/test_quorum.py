@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import pytest
+
+from app.graph.quorum import run_with_quorum
+
+
+def make_search(delay: float, result: str, fail: bool = False):
+    async def search():
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("검색 실패")
+        return {"web_research_result": result}
+    return search
+
+
+class TestSearchQuorum:
+    """web_search 팬아웃 정족수 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_stragglers_are_dropped_after_quorum(self):
+        delays = [0.01, 0.02, 0.03, 2.0]
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            run_with_quorum(make_search(d, f"r{i}"), "batch-1", required=3, total=4, timeout=5)
+            for i, d in enumerate(delays)
+        ])
+
+        assert time.perf_counter() - start < 1.0
+        assert [r["web_research_result"] if r else None for r in results] == ["r0", "r1", "r2", None]
+
+    @pytest.mark.asyncio
+    async def test_failures_do_not_count_towards_quorum(self):
+        searches = [make_search(0.01, "r0", fail=True), make_search(0.05, "r1"), make_search(0.1, "r2")]
+        results = await asyncio.gather(
+            *[run_with_quorum(s, "batch-2", required=2, total=3, timeout=5) for s in searches],
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[0], RuntimeError)
+        assert results[1]["web_research_result"] == "r1"
+        assert results[2]["web_research_result"] == "r2"
+
+    @pytest.mark.asyncio
+    async def test_failed_placeholder_results_do_not_count_towards_quorum(self):
+        # grounding 없는 검색은 예외 대신 "검색 실패: ..." 결과(출처 없음)를 반환
+        searches = [
+            make_search(0.01, "검색 실패: 무선 이어폰"),
+            make_search(0.01, "검색 오류: 가성비 이어폰 - timeout"),
+            make_search(0.05, "r2"),
+            make_search(0.1, "r3"),
+        ]
+        results = await asyncio.gather(
+            *[run_with_quorum(s, "batch-4", required=2, total=4, timeout=5) for s in searches]
+        )
+
+        assert [r["web_research_result"] for r in results[2:]] == ["r2", "r3"]
+
+    @pytest.mark.asyncio
+    async def test_timeout_without_quorum(self):
+        result = await run_with_quorum(make_search(1.0, "slow"), None, required=3, total=3, timeout=0.05)
+        assert result is None
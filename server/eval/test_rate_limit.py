@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+import pytest
+
+from app.graph.rate_limit import (
+    GeminiRateLimiter,
+    PRIORITY_REPORT,
+    PRIORITY_SEARCH,
+    PRIORITY_SPECULATIVE,
+)
+
+
+class TestGeminiRateLimiter:
+    """공유 Gemini 요청 제한기 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_unknown_model_is_not_limited(self):
+        limiter = GeminiRateLimiter({"m": 1}, {})
+        assert await limiter.acquire("other", 100) == 0
+
+    @pytest.mark.asyncio
+    async def test_rpm_makes_callers_wait(self):
+        limiter = GeminiRateLimiter({"m": 600}, {"m": 10 ** 6})  # 초당 10개
+        limiter._bucket("m").requests = 1.0
+
+        start = time.monotonic()
+        await asyncio.gather(*[limiter.acquire("m", 10) for _ in range(3)])
+
+        assert time.monotonic() - start >= 0.15
+        assert limiter.stats()["m"]["granted"] == 3
+
+    @pytest.mark.asyncio
+    async def test_report_goes_before_speculative_work(self):
+        limiter = GeminiRateLimiter({"m": 600}, {"m": 10 ** 6})
+        limiter._bucket("m").requests = 0.0
+        order = []
+
+        async def call(name, priority):
+            await limiter.acquire("m", 10, priority)
+            order.append(name)
+
+        tasks = [
+            asyncio.create_task(call("hedge", PRIORITY_SPECULATIVE)),
+            asyncio.create_task(call("search", PRIORITY_SEARCH)),
+        ]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(call("report", PRIORITY_REPORT)))
+        await asyncio.gather(*tasks)
+
+        assert order == ["report", "search", "hedge"]
+
+    @pytest.mark.asyncio
+    async def test_tpm_reservation_is_corrected_by_usage(self):
+        limiter = GeminiRateLimiter({"m": 1000}, {"m": 1000})
+        reserved = await limiter.acquire("m", 800)
+        limiter.record_usage("m", reserved, 100)
+
+        assert limiter.stats()["m"]["available_tokens"] >= 900
+
+    @pytest.mark.asyncio
+    async def test_throttle_pauses_model(self):
+        limiter = GeminiRateLimiter({"m": 1000}, {"m": 10 ** 6}, throttle_seconds=0.1)
+        await limiter.acquire("m", 10)
+        limiter.throttle("m")
+
+        start = time.monotonic()
+        await limiter.acquire("m", 10)
+        assert time.monotonic() - start >= 0.08
@@ -0,0 +1,57 @@
+from app.graph.request_classifier import RequestClassifier
+
+
+class TestRequestClassifier:
+    """로컬 요청 분류기 테스트"""
+
+    def test_category_with_budget_and_purpose_is_specific(self):
+        result = RequestClassifier().classify("20만원 이하 게이밍 기계식 키보드 추천해줘")
+
+        assert result.is_specific
+        assert result.confidence >= 0.9
+        assert result.extracted_requirements["카테고리"] == "키보드"
+        assert result.extracted_requirements["예산"] == "20만원 이하"
+        assert result.extracted_requirements["용도"] == "게이밍"
+
+    def test_category_only_is_vague(self):
+        for message in ("키보드 추천해줘", "이어폰 뭐가 좋을까?", "헤드셋이 필요해"):
+            result = RequestClassifier().classify(message)
+            assert not result.is_specific, message
+            assert result.confidence >= 0.9, message
+            assert result.clarification_question
+
+    def test_uncertain_requests_fall_back_to_llm(self):
+        classifier = RequestClassifier()
+        # 카테고리 없음 / 사전에 없는 내용 / 카테고리 여러 개
+        for message in ("요즘 뭐 사면 좋을까", "맥북이랑 그램 중에 뭐가 나아?", "아이폰 15 케이스 추천"):
+            assert classifier.decide(message) is None, message
+        assert classifier.stats()["fallback_low_confidence"] == 3
+
+    def test_price_words_match_whole_words(self):
+        assert RequestClassifier().classify("싼 키보드 추천해줘").extracted_requirements["예산"] == "저렴한 가격"
+        # "비싼" 안의 "싼" 은 저렴한 가격이 아님
+        result = RequestClassifier().classify("비싼 키보드 추천해줘")
+        assert result.extracted_requirements["예산"] == "고가"
+
+    def test_exclusion_and_comparison_fall_back_to_llm(self):
+        classifier = RequestClassifier()
+        for message in ("키보드 말고 마우스 추천", "에어팟 프로 2 vs 버즈3 프로 비교", "삼성 빼고 무선 이어폰 추천"):
+            assert classifier.decide(message) is None, message
+        assert classifier.stats()["fallback_low_confidence"] == 3
+
+    def test_multiple_categories_without_conditions_fall_back(self):
+        result = RequestClassifier().classify("키보드 마우스 추천해줘")
+        assert not result.is_specific
+        assert result.confidence < 0.85
+
+    def test_multi_turn_falls_back(self):
+        classifier = RequestClassifier()
+        assert classifier.decide("키보드 추천해줘\n게이밍용", multi_turn=True) is None
+        assert classifier.stats()["fallback_multi_turn"] == 1
+
+    def test_validation_result_conversion(self):
+        decision = RequestClassifier().decide("운동할 때 쓸 방수 기능 있는 무선 이어폰 추천")
+        validation = decision.to_validation_result()
+
+        assert validation.is_specific
+        assert validation.extracted_requirements["intent"].endswith("추천")
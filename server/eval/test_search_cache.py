@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from app.graph.search_cache import (
+    SearchCache,
+    close_batch_search_cache,
+    get_batch_search_cache,
+    normalize_query,
+    open_batch_search_cache,
+)
+from app.graph.utils import SHORT_URL_PREFIX
+
+
+def make_result(search_id: int) -> dict:
+    short_url = f"{SHORT_URL_PREFIX}{search_id}-0"
+    return {
+        "web_research_result": f"QCY 멜로버즈 [naver]({short_url})",
+        "sources_gathered": [{"label": "naver", "short_url": short_url, "value": "https://naver.com/a"}],
+    }
+
+
+class TestSearchCache:
+    """웹 검색 결과 캐시 테스트"""
+
+    def test_normalize_query(self):
+        assert normalize_query("  가성비  무선 이어폰 추천? ") == normalize_query("가성비 무선 이어폰 추천")
+        assert normalize_query("QCY 이어폰") == normalize_query("qcy 이어폰")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_queries_call_upstream_once(self):
+        cache = SearchCache(max_entries=10, ttl=60)
+        calls = []
+
+        def searcher(search_id):
+            async def search():
+                calls.append(search_id)
+                await asyncio.sleep(0.05)
+                return make_result(search_id)
+            return search
+
+        results = await asyncio.gather(*[
+            cache.get_or_search("가성비 무선 이어폰 추천", "gemini-2.0-flash", i, searcher(i))
+            for i in range(5)
+        ])
+
+        assert len(calls) == 1
+        # 결과의 단축 URL은 각 브랜치 ID 기준으로 다시 매겨집니다.
+        for i, result in enumerate(results):
+            assert result["sources_gathered"][0]["short_url"] == f"{SHORT_URL_PREFIX}{i}-0"
+            assert f"{SHORT_URL_PREFIX}{i}-0" in result["web_research_result"]
+
+    @pytest.mark.asyncio
+    async def test_cached_by_query_and_model(self):
+        cache = SearchCache(max_entries=10, ttl=60)
+        calls = []
+
+        async def search():
+            calls.append(1)
+            return make_result(0)
+
+        await cache.get_or_search("무선 이어폰", "gemini-2.0-flash", 0, search)
+        await cache.get_or_search("무선  이어폰", "gemini-2.0-flash", 0, search)
+        await cache.get_or_search("무선 이어폰", "gemini-2.5-flash", 0, search)
+
+        assert len(calls) == 2
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_results_without_sources_are_not_cached(self):
+        cache = SearchCache(max_entries=10, ttl=60)
+        calls = []
+
+        async def search():
+            calls.append(1)
+            return {"web_research_result": "검색 실패", "sources_gathered": []}
+
+        await cache.get_or_search("무선 이어폰", "gemini-2.0-flash", 0, search)
+        await cache.get_or_search("무선 이어폰", "gemini-2.0-flash", 0, search)
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_cache_lives_for_the_batch(self):
+        open_batch_search_cache("batch-1")
+        calls = []
+
+        async def search():
+            calls.append(1)
+            return make_result(0)
+
+        for search_id in range(3):
+            await get_batch_search_cache("batch-1").get_or_search("무선 이어폰", "gemini-2.0-flash", search_id, search)
+
+        assert len(calls) == 1
+        assert close_batch_search_cache("batch-1")["hits"] == 2
+        assert get_batch_search_cache("batch-1") is None
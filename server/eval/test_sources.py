@@ -0,0 +1,66 @@
+from app.graph.citations import CitationRewriter
+from app.graph.search_cache import rebase_search_result
+from app.graph.sources import canonical_url, merge_sources
+from app.graph.utils import SHORT_URL_PREFIX
+
+
+def _source(label: str, search_id: int, idx: int, value: str) -> dict:
+    return {"label": label, "short_url": f"{SHORT_URL_PREFIX}{search_id}-{idx}", "value": value}
+
+
+class TestCanonicalUrl:
+    """출처 URL 정규화 테스트"""
+
+    def test_strips_tracking_params_fragment_and_host_variants(self):
+        expected = "https://blog.naver.com/user/123"
+        assert canonical_url("https://blog.naver.com/user/123") == expected
+        assert canonical_url("http://m.blog.naver.com/user/123/?utm_source=google&fbclid=x#comment") == expected
+        assert canonical_url("https://WWW.Blog.Naver.com:443/user/123") == expected
+
+    def test_keeps_meaningful_query_sorted(self):
+        a = canonical_url("https://gall.dcinside.com/board/view?no=5&id=earphone&gclid=abc")
+        b = canonical_url("https://gall.dcinside.com/board/view?id=earphone&no=5")
+        assert a == b == "https://gall.dcinside.com/board/view?id=earphone&no=5"
+        assert canonical_url("https://shop.com/item?id=1") != canonical_url("https://shop.com/item?id=2")
+
+    def test_grounding_redirect_keeps_token(self):
+        base = "https://vertexaisearch.cloud.google.com/grounding-api-redirect/AbC123"
+        assert canonical_url(base + "?utm_medium=x") == base
+        assert canonical_url(base) != canonical_url(base.replace("AbC123", "XyZ789"))
+
+
+class TestMergeSources:
+    """sources_gathered 리듀서 테스트"""
+
+    def test_parallel_branches_citing_same_page_are_merged(self):
+        branch0 = [_source("naver", 0, 0, "https://blog.naver.com/a"), _source("naver", 0, 0, "https://blog.naver.com/a")]
+        branch1 = [_source("naver", 1, 3, "https://m.blog.naver.com/a?utm_source=x"), _source("clien", 1, 4, "https://clien.net/c")]
+
+        merged = merge_sources(merge_sources([], branch0), branch1)
+
+        assert [s["label"] for s in merged] == ["naver", "clien"]
+        assert merged[0]["short_url"] == f"{SHORT_URL_PREFIX}0-0"
+        assert merged[0]["aliases"] == [f"{SHORT_URL_PREFIX}1-3"]
+        assert merged[0]["canonical_url"] == "https://blog.naver.com/a"
+        # 입력은 변경하지 않음
+        assert "aliases" not in branch0[0] and "canonical_url" not in branch1[0]
+
+    def test_merge_is_idempotent(self):
+        merged = merge_sources([], [_source("a", 0, 0, "https://a.com/x"), _source("a", 1, 0, "https://a.com/x/")])
+        # report_generation 이 사용된 출처를 다시 반환해도 늘어나지 않음
+        assert merge_sources(merged, merged[:1]) == merged
+
+    def test_rewriter_restores_merged_aliases(self):
+        merged = merge_sources([], [_source("a", 0, 0, "https://a.com/x"), _source("a", 1, 2, "https://a.com/x?fbclid=1")])
+        rewriter = CitationRewriter(merged)
+        text = f"[a]({SHORT_URL_PREFIX}0-0) [a]({SHORT_URL_PREFIX}1-2)"
+        assert rewriter.rewrite(text) == "[a](https://a.com/x) [a](https://a.com/x)"
+        assert len(rewriter.used_sources()) == 1
+
+    def test_rebase_moves_aliases_to_new_branch(self):
+        cached = {
+            "web_research_result": f"[a]({SHORT_URL_PREFIX}0-0)",
+            "sources_gathered": [{**_source("a", 0, 0, "https://a.com"), "aliases": [f"{SHORT_URL_PREFIX}0-1"]}],
+        }
+        rebased = rebase_search_result(cached, 0, 2)
+        assert rebased["sources_gathered"][0]["aliases"] == [f"{SHORT_URL_PREFIX}2-1"]
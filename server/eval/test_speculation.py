@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from app.graph import rate_limit
+from app.graph.rate_limit import PRIORITY_SEARCH, PRIORITY_SPECULATIVE
+from app.graph.speculation import Speculator, is_speculative
+
+
+class RecordingLimiter:
+    """요청 제한기 대신 우선순위만 기록"""
+
+    def __init__(self):
+        self.priorities = []
+
+    async def acquire(self, model, tokens, priority):
+        self.priorities.append(priority)
+        return tokens
+
+    def record_usage(self, model, reserved, actual):
+        pass
+
+
+class TestSpeculator:
+    """추측 검색어 생성 / 검색 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_queries_and_searches_are_reused(self):
+        speculator = Speculator()
+        searched = []
+
+        async def generate():
+            await asyncio.sleep(0.01)
+            return ["무선 이어폰 추천", "노이즈 캔슬링 이어폰"]
+
+        async def search(query, search_id):
+            searched.append((query, search_id))
+            return {"web_research_result": query, "sources_gathered": []}
+
+        speculator.start("s1", generate, search, search_count=1)
+        assert await speculator.take_queries("s1") == ["무선 이어폰 추천", "노이즈 캔슬링 이어폰"]
+
+        task = speculator.take_search("s1", "무선 이어폰 추천 ")  # 정규화된 검색어로 매칭
+        assert (await task)["web_research_result"] == "무선 이어폰 추천"
+        assert speculator.take_search("s1", "무선 이어폰 추천") is None  # 한 번만 가져갈 수 있음
+        assert speculator.take_search("s1", "노이즈 캔슬링 이어폰") is None  # search_count=1
+        assert searched == [("무선 이어폰 추천", 0)]
+
+    @pytest.mark.asyncio
+    async def test_discard_cancels_pending_work(self):
+        speculator = Speculator()
+        started = asyncio.Event()
+
+        async def generate():
+            started.set()
+            await asyncio.sleep(10)
+            return ["q"]
+
+        speculator.start("s2", generate, None)
+        await started.wait()
+        speculator.discard("s2", "refine")
+
+        assert await speculator.take_queries("s2") is None
+        assert speculator.stats()["discarded_refine"] == 1
+        assert speculator.stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_generation_falls_back(self):
+        speculator = Speculator()
+
+        async def generate():
+            raise RuntimeError("429")
+
+        speculator.start("s3", generate, None)
+        assert await speculator.take_queries("s3") is None
+        assert await speculator.take_queries(None) is None
+        assert speculator.stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_speculative_work_runs_at_speculative_priority(self, monkeypatch):
+        limiter = RecordingLimiter()
+        monkeypatch.setattr(rate_limit, "get_rate_limiter", lambda: limiter)
+        speculator = Speculator()
+
+        async def call(node):
+            async with rate_limit.rate_limited(node, "gemini-2.0-flash", "prompt"):
+                return is_speculative.get()
+
+        async def generate():
+            assert await call("generate_search_queries")
+            return ["무선 이어폰 추천"]
+
+        async def search(query, search_id):
+            assert await call("web_search")
+            return {"web_research_result": query, "sources_gathered": []}
+
+        speculator.start("s1", generate, search, search_count=1)
+        await speculator.take_queries("s1")
+        await speculator.take_search("s1", "무선 이어폰 추천")
+
+        # 추측 작업은 가장 낮은 우선순위, 원래 요청의 호출은 노드 우선순위
+        assert not await call("web_search")
+        assert limiter.priorities == [PRIORITY_SPECULATIVE, PRIORITY_SPECULATIVE, PRIORITY_SEARCH]
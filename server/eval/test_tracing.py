@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.tracing import load_spans, render_waterfall, span, trace_files
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "trace_enabled", True)
+    monkeypatch.setattr(settings, "trace_file", str(path))
+    monkeypatch.setattr(tracing, "_trace_logger", None)
+    yield path
+    for handler in list(tracing._get_trace_logger().handlers):
+        handler.close()
+        tracing._get_trace_logger().removeHandler(handler)
+
+
+class TestSpan:
+    """스팬 기록 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_child_spans_share_trace(self, trace_file):
+        async def node(name):
+            with span(name, "node"):
+                with span(f"llm:{name}", "llm", model="m") as call:
+                    await asyncio.sleep(0.01)
+                    call.set(input_tokens=10, output_tokens=5)
+
+        with span("graph_run", "run", thread_id="t1"):
+            await asyncio.gather(node("a"), node("b"))
+
+        spans = load_spans(trace_files(str(trace_file)), thread_id="t1")
+        by_name = {s["name"]: s for s in spans}
+        assert len(spans) == 5
+        assert len({s["trace_id"] for s in spans}) == 1
+        assert by_name["a"]["parent_id"] == by_name["graph_run"]["span_id"]
+        assert by_name["llm:b"]["parent_id"] == by_name["b"]["span_id"]
+        assert by_name["llm:a"]["attrs"]["input_tokens"] == 10
+
+        waterfall = render_waterfall(spans)
+        assert "thread=t1" in waterfall
+        assert "    llm:a" in waterfall
+
+    def test_error_status(self, trace_file):
+        with pytest.raises(ValueError):
+            with span("graph_run", "run", thread_id="t2"):
+                raise ValueError("boom")
+
+        [record] = load_spans(trace_files(str(trace_file)), thread_id="t2")
+        assert record["status"] == "error"
+        assert record["attrs"]["error"] == "boom"
+
+    def test_disabled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "trace_enabled", False)
+        with span("graph_run") as s:
+            assert s is None
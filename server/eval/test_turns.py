@@ -0,0 +1,82 @@
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import StateGraph, START, END
+
+from app.graph.state import ProductRecommendationState
+from app.graph.turns import relevant_turns, start_turn_update, summarize_turn
+from app.graph.utils import SHORT_URL_PREFIX
+
+REPORT = """"무선 이어폰 TOP 2"
+
+1. **QCY 멜로버즈 프로 — 가성비 노이즈캔슬링** [네이버 블로그](https://blog.naver.com/a)
+2. **사운드코어 리버티 4 NC — 통화 품질까지** [클리앙](https://clien.net/b)
+"""
+
+
+def search_node(state: dict) -> dict:
+    """검색 결과와 리포트를 남기는 가짜 검색·리포트 노드"""
+    query = state["messages"][-1].content
+    return {
+        "is_request_specific": True,
+        "user_intent": f"{query} 추천",
+        "search_queries": [query],
+        "web_research_result": [f"{query} 결과"],
+        "sources_gathered": [{"label": "naver", "short_url": f"{SHORT_URL_PREFIX}0-0", "value": f"https://a.com/{query}"}],
+        "response_to_user": REPORT,
+    }
+
+
+def build_graph():
+    builder = StateGraph(ProductRecommendationState)
+    builder.add_node("start_turn", start_turn_update)
+    builder.add_node("search", search_node)
+    builder.add_edge(START, "start_turn")
+    builder.add_edge("start_turn", "search")
+    builder.add_edge("search", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+class TestTurnScoping:
+    """멀티턴 턴 범위 상태 테스트"""
+
+    def test_new_turn_resets_search_state_and_archives_previous(self):
+        graph = build_graph()
+        config = {"configurable": {"thread_id": "t1"}}
+
+        first = graph.invoke({"messages": [HumanMessage(content="무선 이어폰")]}, config)
+        second = graph.invoke({"messages": [HumanMessage(content="더 저렴한 이어폰")]}, config)
+
+        # 이번 턴 검색 결과만 남음
+        assert second["search_queries"] == ["더 저렴한 이어폰"]
+        assert second["web_research_result"] == ["더 저렴한 이어폰 결과"]
+        assert [s["value"] for s in second["sources_gathered"]] == ["https://a.com/더 저렴한 이어폰"]
+        assert second["turn_id"] != first["turn_id"]
+
+        # 이전 턴은 요약으로 보관
+        [archived] = second["turn_archive"]
+        assert archived["turn_id"] == first["turn_id"]
+        assert archived["queries"] == ["무선 이어폰"]
+        assert archived["products"] == ["QCY 멜로버즈 프로", "사운드코어 리버티 4 NC"]
+
+    def test_clarification_turn_is_not_archived(self):
+        state = {"turn_id": "x", "is_request_specific": False, "response_to_user": "예산이 어떻게 되시나요?"}
+        assert summarize_turn(state) is None
+        assert "turn_archive" not in start_turn_update(state)
+
+
+class TestRelevantTurns:
+    """이전 턴 요약 선택 테스트"""
+
+    ARCHIVE = [
+        {"request": "50만원 이하 노트북 추천", "queries": ["가성비 노트북"], "products": ["레노버 IdeaPad"], "summary": ""},
+        {"request": "10만원 이하 무선 이어폰 추천", "queries": ["무선 이어폰"], "products": ["QCY 멜로버즈 프로"], "summary": ""},
+    ]
+
+    def test_only_related_turns_are_included(self):
+        text = relevant_turns(self.ARCHIVE, ["5만원 이하 무선 이어폰", "더 저렴한 이어폰"])
+        assert "QCY 멜로버즈 프로" in text
+        assert "노트북" not in text
+
+    def test_unrelated_request_gets_nothing(self):
+        assert relevant_turns(self.ARCHIVE, ["캠핑 의자"]) == ""
+        assert relevant_turns(self.ARCHIVE, ["무선 이어폰"], max_turns=0) == ""
@@ -0,0 +1,50 @@
+import importlib
+
+import pytest
+from langgraph.graph import END
+from langgraph.types import Send
+
+from app.graph.tools_and_schemas import ValidationWithQueriesResult
+
+
+@pytest.fixture
+def graph_module(monkeypatch):
+    # 그래프 생성만 하고 Gemini 는 호출하지 않으므로 임의의 키로 충분
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    return importlib.import_module("app.graph.graph")
+
+
+def config(mode: str) -> dict:
+    return {"configurable": {"validation_mode": mode}}
+
+
+class TestValidationMode:
+    """검증 + 검색어 생성 결합 모드 테스트"""
+
+    def test_schema_accepts_requirements_string(self):
+        result = ValidationWithQueriesResult(
+            is_specific=True,
+            extracted_requirements='{"카테고리": "키보드", "예산": "10만원"}',
+            queries=["게이밍 키보드 추천"],
+        )
+        assert result.extracted_requirements == {"카테고리": "키보드", "예산": "10만원"}
+        assert ValidationWithQueriesResult(is_specific=False).queries == []
+
+    def test_graph_has_both_validation_nodes(self, graph_module):
+        nodes = graph_module.graph.get_graph().nodes
+        assert "validate_request" in nodes
+        assert "validate_and_generate_queries" in nodes
+
+    def test_route_validation(self, graph_module):
+        assert graph_module.route_validation({}, config("separate")) == "validate_request"
+        assert graph_module.route_validation({}, config("combined")) == "validate_and_generate_queries"
+
+    def test_combined_mode_skips_query_generation(self, graph_module):
+        state = {"answer_cache_hit": False, "search_queries": ["q1", "q2"]}
+
+        assert graph_module.route_after_answer_cache(state, config("separate")) == "generate_search_queries"
+        sends = graph_module.route_after_answer_cache(state, config("combined"))
+        assert all(isinstance(s, Send) and s.node == "web_search" for s in sends)
+        assert [s.arg["search_query"] for s in sends] == ["q1", "q2"]
+
+        assert graph_module.route_after_answer_cache({"answer_cache_hit": True}, config("combined")) == END
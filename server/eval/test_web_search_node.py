@@ -8,6 +8,7 @@ Usage:
 
 import os
 import sys
+import asyncio
 import time
 import json
 from pathlib import Path
@@ -83,7 +84,7 @@ def test_web_search_node():
         try:
             # 웹 검색 노드 실행
             print(f"\n⏳ 웹 검색 노드 실행 중...")
-            output_state = web_search(input_state, config)
+            output_state = asyncio.run(web_search(input_state, config))
             
             # 실행 시간 계산
             elapsed_time = time.time() - start_time
@@ -196,7 +197,7 @@ def test_single_query(query: str, search_id: int = 0):
     start_time = time.time()
     
     try:
-        result = web_search(input_state, config)
+        result = asyncio.run(web_search(input_state, config))
         elapsed_time = time.time() - start_time
         
         print(f"✅ 완료 ({elapsed_time:.2f}초)")
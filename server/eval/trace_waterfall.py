@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+그래프 실행 트레이스 워터폴 출력
+
+TRACE_ENABLED=true 로 서버를 실행하면 노드 / LLM·검색 호출 스팬이 JSONL 파일
+(TRACE_FILE, 기본 logs/traces.jsonl)에 기록됩니다. 이 스크립트는 스레드 하나의
+스팬을 읽어 실행 순서와 구간별 시간을 워터폴로 보여줍니다.
+
+Usage:
+    python trace_waterfall.py <thread_id>
+    python trace_waterfall.py <thread_id> --file logs/traces.jsonl --width 80
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 프로젝트 경로 추가 (server/)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.tracing import load_spans, render_waterfall, trace_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="그래프 실행 트레이스 워터폴 출력")
+    parser.add_argument("thread_id", help="대화 스레드 ID")
+    parser.add_argument("--file", default=None, help="트레이스 JSONL 파일 (기본: 설정의 TRACE_FILE)")
+    parser.add_argument("--width", type=int, default=50, help="시간 막대 너비")
+    args = parser.parse_args()
+
+    spans = load_spans(trace_files(args.file), thread_id=args.thread_id)
+    if not spans:
+        print(f"❌ '{args.thread_id}' 스레드의 스팬이 없습니다. TRACE_ENABLED=true 로 실행했는지 확인하세요.")
+        sys.exit(1)
+
+    print(render_waterfall(spans, width=args.width))
+
+
+if __name__ == "__main__":
+    main()